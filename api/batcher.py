@@ -0,0 +1,126 @@
+"""
+Micro-batching de requests individuales
+
+Las requests concurrentes de /predict/churn, /predict/risk_score y
+/predict/both se acumulan durante una ventana corta (o hasta un máximo de
+filas) y se evalúan con UN forward pass por modelo, en el pool de
+inferencia si se configura uno. Cada request recibe su resultado a través de
+un future.
+
+Un micro-batch solo junta filas codificadas para los mismos modelos: si se
+recargan modelos mientras hay filas pendientes, esas filas se evalúan antes
+de encolar las nuevas.
+"""
+
+import asyncio
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Acumula filas ya codificadas y las evalúa juntas.
+
+    Args:
+        predict_fn: Función (matriz, churn, risk, modelos) -> (probs_churn, probs_riesgo),
+            por ejemplo predict.predict_probabilities
+        max_wait_ms: Tiempo máximo que espera la primera fila antes de evaluar
+        max_rows: Cantidad de filas que dispara la evaluación inmediata
+        pool: InferencePool donde ejecutar el forward pass (None = en el event loop)
+    """
+
+    def __init__(self, predict_fn, max_wait_ms: float = 2.0, max_rows: int = 256, pool=None):
+        self._predict_fn = predict_fn
+        self.max_wait = max_wait_ms / 1000
+        self.max_rows = max_rows
+        self._pool = pool
+        self._tasks = set()
+
+        self._rows = []
+        self._futures = []
+        self._needs_churn = False
+        self._needs_risk = False
+        self._models = None
+        self._timer = None
+
+    async def submit(self, row: np.ndarray, churn: bool = True, risk: bool = True, models=None) -> tuple:
+        """
+        Encola una fila (35,) y espera su resultado
+
+        Args:
+            models: Modelos con cuyo encoder se codificó la fila (None = los activos)
+
+        Returns:
+            (prob_churn, prob_riesgo); None para el modelo no solicitado
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if self._rows and models is not self._models:
+            self._flush()
+
+        self._models = models
+        self._rows.append(row)
+        self._futures.append((future, churn, risk))
+        self._needs_churn |= churn
+        self._needs_risk |= risk
+
+        if len(self._rows) >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _take_pending(self) -> tuple:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending = (self._rows, self._futures, self._needs_churn, self._needs_risk, self._models)
+        self._rows, self._futures = [], []
+        self._needs_churn = self._needs_risk = False
+        self._models = None
+        return pending
+
+    def _flush(self):
+        pending = self._take_pending()
+        if not pending[0]:
+            return
+
+        # Se guarda la referencia para que el task no sea recolectado a mitad de camino
+        task = asyncio.ensure_future(self._process(*pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, rows: list, futures: list, needs_churn: bool, needs_risk: bool, models):
+        logger.debug("Micro-batch de %d filas", len(rows))
+        try:
+            input_data = np.stack(rows)
+            if self._pool is None:
+                churn_probs, risk_probs = self._predict_fn(input_data, needs_churn, needs_risk, models)
+            else:
+                churn_probs, risk_probs = await self._pool.run(
+                    self._predict_fn, input_data, needs_churn, needs_risk, models
+                )
+        except Exception as e:
+            for future, _, _ in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._resolve(futures, churn_probs, risk_probs)
+
+    @staticmethod
+    def _resolve(futures: list, churn_probs, risk_probs):
+        for i, (future, churn, risk) in enumerate(futures):
+            # El cliente pudo haber cancelado la request mientras esperaba
+            if future.done():
+                continue
+            future.set_result((
+                float(churn_probs[i]) if churn else None,
+                float(risk_probs[i]) if risk else None,
+            ))
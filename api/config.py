@@ -10,6 +10,14 @@ hacer un get y ver caracteristica de la variable
 
 """
 
+import json
+import os
+import re
+
+import numpy as np
+
+from encoder import FeatureEncoder
+
 # =====================================================
 # CAMPOS DEL DATASET ORIGINAL
 # =====================================================
@@ -154,92 +162,237 @@ EXAMPLE_REQUEST = {
     "TotalCharges": 151.65
 }
 
-# Estadísticas para normalización (StandardScaler)
-# Calculadas del dataset completo antes del split
+# Máximo de clientes aceptados por request en /predict/batch
+BATCH_MAX_SIZE = 10000
+
+# Micro-batching de requests individuales: se acumulan hasta WINDOW_MS
+# milisegundos o MAX_ROWS filas y se evalúan con un solo forward pass
+MICROBATCH_ENABLED = os.getenv('CHURN_MICROBATCH', '1') == '1'
+MICROBATCH_WINDOW_MS = float(os.getenv('CHURN_MICROBATCH_WINDOW_MS', '2'))
+MICROBATCH_MAX_ROWS = int(os.getenv('CHURN_MICROBATCH_MAX_ROWS', '256'))
+
+# Pool de inferencia: threads dedicados y cola acotada. Con la cola llena
+# las requests se rechazan con 503 y Retry-After
+INFERENCE_WORKERS = int(os.getenv('CHURN_INFERENCE_WORKERS', '4'))
+INFERENCE_QUEUE_SIZE = int(os.getenv('CHURN_INFERENCE_QUEUE_SIZE', '64'))
+RETRY_AFTER_SECONDS = 1
+
+# Cache LRU de predicciones por vector de features (0 desactiva el cache).
+# TTL en segundos; 0 = las entradas solo se invalidan al recargar modelos
+CACHE_MAX_SIZE = int(os.getenv('CHURN_CACHE_SIZE', '100000'))
+CACHE_TTL_SECONDS = float(os.getenv('CHURN_CACHE_TTL_SECONDS', '0')) or None
+
+# Token requerido en el header X-Admin-Token para /admin/*; sin token los
+# endpoints de administración quedan deshabilitados (404)
+ADMIN_TOKEN = os.getenv('CHURN_ADMIN_TOKEN', '')
+
+# Backend de inferencia: 'keras' (TensorFlow), 'numpy' (.npz), 'onnx'
+# (onnxruntime) o 'tflite' (TensorFlow Lite); los artefactos livianos se
+# generan con export_models.py
+INFERENCE_BACKEND = os.getenv('CHURN_INFERENCE_BACKEND', 'keras')
+
+# Threads por llamada de los backends onnx/tflite (el paralelismo entre
+# requests lo da el pool de inferencia)
+INFERENCE_THREADS = int(os.getenv('CHURN_INFERENCE_THREADS', '1'))
+
+# Evaluar /predict/both (y los lotes) con un solo modelo de dos salidas
+# (ver fused.py); solo aplica a los backends keras y numpy
+FUSED_MODELS = os.getenv('CHURN_FUSED_MODELS', '1') == '1'
+
+# Precisión del modelo servido con el backend tflite: 'float32', 'float16' o
+# 'int8' (variantes generadas con quantize_models.py)
+MODEL_PRECISION = os.getenv('CHURN_MODEL_PRECISION', 'float32')
+PRECISION_SUFFIXES = {'float32': '', 'float16': '.fp16', 'int8': '.int8'}
+
+# Logging: nivel, formato ('json' o 'texto') y muestreo del log por
+# predicción (nivel DEBUG): se registra 1 de cada LOG_SAMPLE_RATE
+LOG_LEVEL = os.getenv('CHURN_LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('CHURN_LOG_FORMAT', 'json')
+LOG_SAMPLE_RATE = max(1, int(os.getenv('CHURN_LOG_SAMPLE_RATE', '100')))
+
+# Umbrales de decisión servidos: prob > CHURN_THRESHOLD es churn y RISK_BINS
+# separa los niveles Bajo/Medio/Alto. roi.py --guardar los optimiza por
+# ganancia esperada y los escribe en THRESHOLDS_FILE, que se lee al iniciar
+THRESHOLDS_FILE = os.getenv(
+    'CHURN_THRESHOLDS_FILE',
+    os.path.join(os.path.dirname(__file__), '..', 'models', 'umbrales.json')
+)
+DEFAULT_CHURN_THRESHOLD = 0.5
+DEFAULT_RISK_BINS = (0.33, 0.66)
+
+
+def load_thresholds(path: str) -> tuple:
+    """
+    (umbral de churn, bins de riesgo) desde un JSON con 'churn_threshold' y
+    'risk_bins'; los valores por defecto si el archivo no existe
+
+    Raises:
+        ValueError: Si los umbrales no están en [0, 1] o los bins no son crecientes
+    """
+    if not os.path.exists(path):
+        return DEFAULT_CHURN_THRESHOLD, DEFAULT_RISK_BINS
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    threshold = float(data.get('churn_threshold', DEFAULT_CHURN_THRESHOLD))
+    bins = tuple(float(b) for b in data.get('risk_bins', DEFAULT_RISK_BINS))
+
+    if not 0 <= threshold <= 1:
+        raise ValueError(f"{path}: churn_threshold debe estar entre 0 y 1")
+    if len(bins) != 2 or not 0 <= bins[0] <= bins[1] <= 1:
+        raise ValueError(f"{path}: risk_bins debe ser [bajo_medio, medio_alto] creciente entre 0 y 1")
+    return threshold, bins
+
+
+CHURN_THRESHOLD, RISK_BINS = load_thresholds(THRESHOLDS_FILE)
+
+# Estadísticas del encoder histórico (StandardScaler), calculadas del
+# dataset completo antes del split. Solo se usan con modelos que no traen
+# su artefacto model.encoder.json (ver encoder.py)
 SCALER_STATS = {
     'tenure': {'mean': 32.4218, 'std': 24.5453},
     'TotalCharges': {'mean': 2283.3004, 'std': 2266.7714}
 }
 
 
-def normalize_numeric(value: float, mean: float, std: float) -> float:
-    """Normaliza un valor usando StandardScaler: (x - mean) / std"""
-    return (value - mean) / std
+def transform_to_features(data: dict) -> np.ndarray:
+    """
+    Transforma los datos del CSV original a la fila de features numéricas
+    que alimenta al modelo, con el encoder activo (el del pipeline con el que
+    se entrenaron los modelos cargados, ver set_encoder).
+
+    Args:
+        data: Diccionario con los datos en formato original del CSV
+
+    Returns:
+        Fila float32 (35,) como np.ndarray (antes del encoder exportado era
+        una lista de floats), en el orden de las columnas de X_train
+
+    Raises:
+        ValueError: Si una categórica trae un valor desconocido
+    """
+    return encoder.transform_row(data)
+
+
+# =====================================================
+# ENCODER COLUMNAR (VECTORIZADO)
+# =====================================================
+
+# Orden en que entran las variables al ColumnTransformer de data_prep:
+# primero las numéricas (StandardScaler) y luego las categóricas (OneHotEncoder)
+NUMERIC_FEATURES = ['tenure', 'TotalCharges']
+CATEGORICAL_FEATURES = [
+    'gender', 'PhoneService', 'MultipleLines', 'InternetService',
+    'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport',
+    'StreamingTV', 'StreamingMovies', 'Contract', 'PaymentMethod'
+]
 
 
-def transform_to_features(data: dict) -> list:
+def _build_legacy_encoder() -> FeatureEncoder:
     """
-    Transforma los datos del CSV original a un array de features numéricas
-    para alimentar al modelo.
+    Encoder histórico, derivado de SCALER_STATS y FIELD_DESCRIPTIONS.
 
-    NOTA: El orden de las features debe coincidir EXACTAMENTE con el orden
-    en que fueron entrenados los modelos (columnas de X_train).
+    Replica OneHotEncoder(drop='if_binary'): las categorías van en orden
+    alfabético y en las variables binarias solo se conserva la segunda.
+    """
+    numeric = [
+        (field, column, SCALER_STATS[field]['mean'], SCALER_STATS[field]['std'])
+        for column, field in enumerate(NUMERIC_FEATURES)
+    ]
+    categorical, feature_names = [], [f'num__{field}' for field in NUMERIC_FEATURES]
+    column = len(NUMERIC_FEATURES)
+    for field in CATEGORICAL_FEATURES:
+        categories = sorted(FIELD_DESCRIPTIONS[field]['valores_validos'])
+        kept = categories[1:] if len(categories) == 2 else categories
+        columns = [None] * (len(categories) - len(kept)) + list(range(column, column + len(kept)))
+        categorical.append((field, categories, columns))
+        feature_names.extend(f'cat__{field}_{category}' for category in kept)
+        column += len(kept)
+    return FeatureEncoder(feature_names, numeric, categorical)
 
-    Esta función asume que el preprocesamiento incluyó one-hot encoding
-    con pd.get_dummies(df, drop_first=True)
 
-    Args:
-        data: Diccionario con los datos en formato original del CSV
+LEGACY_ENCODER = _build_legacy_encoder()
 
-    Returns:
-        Lista de valores numéricos para el modelo
+# Nombres de salida tal como los genera el pipeline (get_feature_names_out)
+FEATURE_NAMES = LEGACY_ENCODER.feature_names
+N_FEATURES = LEGACY_ENCODER.n_features
+
+# Encoder activo; predict.py lo reemplaza por el artefacto de los modelos cargados
+encoder = LEGACY_ENCODER
+
+
+def check_encoder(candidate: FeatureEncoder):
     """
-    features = []
+    Verifica que un encoder reciba los mismos campos y categorías que acepta
+    la API y devuelva las mismas columnas que esperan los modelos
 
-    features.append(normalize_numeric(
-        float(data['tenure']),
-        SCALER_STATS['tenure']['mean'],
-        SCALER_STATS['tenure']['std']
-    ))
-    features.append(normalize_numeric(
-        float(data['TotalCharges']),
-        SCALER_STATS['TotalCharges']['mean'],
-        SCALER_STATS['TotalCharges']['std']
-    ))
+    Raises:
+        ValueError: Si no coincide con FIELD_DESCRIPTIONS o FEATURE_NAMES
+    """
+    if sorted(candidate.fields) != sorted(NUMERIC_FEATURES + CATEGORICAL_FEATURES):
+        raise ValueError(f"El encoder espera otros campos: {candidate.fields}")
+    for field in CATEGORICAL_FEATURES:
+        if set(candidate.categories(field)) != set(FIELD_DESCRIPTIONS[field]['valores_validos']):
+            raise ValueError(f"El encoder tiene otras categorías para '{field}': {candidate.categories(field)}")
+    if candidate.feature_names != FEATURE_NAMES:
+        raise ValueError("El encoder devuelve las columnas en otro orden que FEATURE_NAMES")
 
-    features.append(1 if data['gender'] == 'Male' else 0)
 
-    features.append(1 if data['PhoneService'] == 'Yes' else 0)
+def set_encoder(candidate: FeatureEncoder):
+    """Reemplaza el encoder activo (la asignación es atómica)"""
+    global encoder
+    check_encoder(candidate)
+    encoder = candidate
 
-    features.append(1 if data['MultipleLines'] == 'No' else 0)
-    features.append(1 if data['MultipleLines'] == 'No phone service' else 0)
-    features.append(1 if data['MultipleLines'] == 'Yes' else 0)
 
-    features.append(1 if data['InternetService'] == 'DSL' else 0)
-    features.append(1 if data['InternetService'] == 'Fiber optic' else 0)
-    features.append(1 if data['InternetService'] == 'No' else 0)
+def records_to_columns(records: list) -> dict:
+    """
+    Convierte una lista de diccionarios (filas) a un diccionario de columnas
+    con solo los campos que usa el modelo.
+    """
+    return {
+        field: [record[field] for record in records]
+        for field in NUMERIC_FEATURES + CATEGORICAL_FEATURES
+    }
 
-    features.append(1 if data['OnlineSecurity'] == 'No' else 0)
-    features.append(1 if data['OnlineSecurity'] == 'No internet service' else 0)
-    features.append(1 if data['OnlineSecurity'] == 'Yes' else 0)
 
-    features.append(1 if data['OnlineBackup'] == 'No' else 0)
-    features.append(1 if data['OnlineBackup'] == 'No internet service' else 0)
-    features.append(1 if data['OnlineBackup'] == 'Yes' else 0)
+def transform_to_feature_matrix(data, dtype=np.float32) -> np.ndarray:
+    """
+    Versión columnar de transform_to_features para muchos clientes a la vez,
+    con el mismo encoder activo (FeatureEncoder.transform en lugar de
+    transform_row; los dos reproducen pipeline.transform, ver encoder.py).
 
-    features.append(1 if data['DeviceProtection'] == 'No' else 0)
-    features.append(1 if data['DeviceProtection'] == 'No internet service' else 0)
-    features.append(1 if data['DeviceProtection'] == 'Yes' else 0)
+    Args:
+        data: DataFrame o diccionario {campo: array} en formato original del CSV
+        dtype: Tipo de la matriz de salida
 
-    features.append(1 if data['TechSupport'] == 'No' else 0)
-    features.append(1 if data['TechSupport'] == 'No internet service' else 0)
-    features.append(1 if data['TechSupport'] == 'Yes' else 0)
+    Returns:
+        Matriz (N, 35) lista para alimentar al modelo
+
+    Raises:
+        ValueError: Si una categórica trae un valor desconocido
+    """
+    return encoder.transform(data, dtype)
 
-    features.append(1 if data['StreamingTV'] == 'No' else 0)
-    features.append(1 if data['StreamingTV'] == 'No internet service' else 0)
-    features.append(1 if data['StreamingTV'] == 'Yes' else 0)
 
-    features.append(1 if data['StreamingMovies'] == 'No' else 0)
-    features.append(1 if data['StreamingMovies'] == 'No internet service' else 0)
-    features.append(1 if data['StreamingMovies'] == 'Yes' else 0)
+def sample_customers(n_rows: int, seed: int = None) -> dict:
+    """
+    Genera clientes sintéticos válidos a partir de FIELD_DESCRIPTIONS
+    (valores válidos para categóricas, rango uniforme para numéricas).
 
-    features.append(1 if data['Contract'] == 'Month-to-month' else 0)
-    features.append(1 if data['Contract'] == 'One year' else 0)
-    features.append(1 if data['Contract'] == 'Two year' else 0)
+    Returns:
+        Diccionario {campo: array} listo para transform_to_feature_matrix
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for field in CATEGORICAL_FEATURES:
+        columns[field] = rng.choice(FIELD_DESCRIPTIONS[field]['valores_validos'], size=n_rows)
 
-    features.append(1 if data['PaymentMethod'] == 'Bank transfer (automatic)' else 0)
-    features.append(1 if data['PaymentMethod'] == 'Credit card (automatic)' else 0)
-    features.append(1 if data['PaymentMethod'] == 'Electronic check' else 0)
-    features.append(1 if data['PaymentMethod'] == 'Mailed check' else 0)
+    for field in NUMERIC_FEATURES:
+        low, high = (float(v) for v in re.findall(r'[\d.]+', FIELD_DESCRIPTIONS[field]['rango']))
+        if isinstance(FIELD_DESCRIPTIONS[field]['ejemplo'], int):
+            columns[field] = rng.integers(int(low), int(high), endpoint=True, size=n_rows)
+        else:
+            columns[field] = np.round(rng.uniform(low, high, size=n_rows), 2)
 
-    return features
\ No newline at end of file
+    return columns
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+Encoder de features compilado a partir del pipeline de data_prep.preprocesar
+
+El ColumnTransformer ajustado (StandardScaler + OneHotEncoder) se exporta a
+un artefacto JSON chico que se guarda junto a cada modelo
+(models/<modelo>/<version>/model.encoder.json, ver registry.py):
+
+    {
+      "format": 1,
+      "feature_names": ["num__tenure", ..., "cat__PaymentMethod_Mailed check"],
+      "numeric": [{"field": "tenure", "column": 0, "mean": 32.37, "scale": 24.56}, ...],
+      "categorical": [{"field": "gender", "categories": ["Female", "Male"],
+                       "columns": [null, 2]}, ...]
+    }
+
+"columns" indica la columna de salida de cada categoría (null para la
+categoría descartada por drop='if_binary'). FeatureEncoder lee el artefacto,
+precompila las tablas de lookup y codifica una fila o un lote entero sin
+sklearn. El resultado es idéntico (bit a bit) a pipeline.transform(X) en
+float64 convertido a float32.
+"""
+
+import json
+import os
+
+import numpy as np
+
+ENCODER_FORMAT = 1
+ENCODER_ARTIFACT = '.encoder.json'
+
+# Columnas de salida en las tablas de transform(). Una categoría descartada
+# por drop='if_binary' apunta más allá de la matriz y termina en la celda de
+# descarte; un valor desconocido es negativo
+_DROPPED = np.iinfo(np.intp).max // 2
+_INVALID = -1
+
+
+class FeatureEncoder:
+    """
+    StandardScaler + OneHotEncoder(handle_unknown='error') evaluados con NumPy
+
+    Args:
+        feature_names: Nombres de las columnas de salida, en orden
+        numeric: [(campo, columna, media, escala)]
+        categorical: [(campo, categorias, columnas)]; columnas[i] es la
+            columna de salida de categorias[i] o None si se descarta
+    """
+
+    def __init__(self, feature_names: list, numeric: list, categorical: list):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.numeric = [(field, int(column), float(mean), float(scale)) for field, column, mean, scale in numeric]
+        self.categorical = [
+            (field, list(categories), [None if c is None else int(c) for c in columns])
+            for field, categories, columns in categorical
+        ]
+
+        used = [column for _, column, _, _ in self.numeric]
+        for field, categories, columns in self.categorical:
+            if len(categories) != len(columns):
+                raise ValueError(f"'{field}': categorías y columnas no tienen el mismo largo")
+            used.extend(c for c in columns if c is not None)
+        if sorted(used) != list(range(self.n_features)):
+            raise ValueError("Las columnas del encoder no cubren exactamente feature_names")
+
+        # Fila a fila: {valor: columna o None}; en lote: {valor: columna o _DROPPED}
+        self.lookups = {
+            field: dict(zip(categories, columns))
+            for field, categories, columns in self.categorical
+        }
+        self._column_tables = {
+            field: {category: _DROPPED if c is None else c for category, c in zip(categories, columns)}
+            for field, categories, columns in self.categorical
+        }
+
+    @property
+    def fields(self) -> list:
+        """Campos de entrada: numéricos y luego categóricos"""
+        return [field for field, _, _, _ in self.numeric] + [field for field, _, _ in self.categorical]
+
+    def categories(self, field: str) -> list:
+        for name, categories, _ in self.categorical:
+            if name == field:
+                return categories
+        raise KeyError(field)
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> 'FeatureEncoder':
+        """
+        Compila un Pipeline (o ColumnTransformer) ajustado con StandardScaler
+        y OneHotEncoder, como el de data_prep.preprocesar
+
+        Raises:
+            ValueError: Si el pipeline tiene transformaciones no soportadas
+        """
+        transformer = pipeline
+        if hasattr(pipeline, 'steps'):
+            transformer = pipeline.steps[-1][1]
+        if not hasattr(transformer, 'transformers_'):
+            raise ValueError("Se esperaba un ColumnTransformer ajustado")
+
+        numeric, categorical = [], []
+        column = 0
+        for name, step, fields in transformer.transformers_:
+            if isinstance(step, str) and step == 'drop' or len(fields) == 0:
+                continue
+            kind = type(step).__name__
+            if kind == 'StandardScaler':
+                means = step.mean_ if step.mean_ is not None else np.zeros(len(fields))
+                scales = step.scale_ if step.scale_ is not None else np.ones(len(fields))
+                for field, mean, scale in zip(fields, means, scales):
+                    numeric.append((field, column, mean, scale))
+                    column += 1
+            elif kind == 'OneHotEncoder':
+                if step.handle_unknown != 'error' or step.min_frequency is not None or step.max_categories is not None:
+                    raise ValueError("OneHotEncoder solo se soporta con handle_unknown='error' y sin categorías infrecuentes")
+                drop_idx = step.drop_idx_ if step.drop_idx_ is not None else [None] * len(fields)
+                for field, categories, drop in zip(fields, step.categories_, drop_idx):
+                    columns = []
+                    for i in range(len(categories)):
+                        if drop is not None and i == drop:
+                            columns.append(None)
+                        else:
+                            columns.append(column)
+                            column += 1
+                    categorical.append((field, [c.item() if hasattr(c, 'item') else c for c in categories], columns))
+            else:
+                raise ValueError(f"Transformación no soportada en el encoder: {kind}")
+
+        return cls(list(transformer.get_feature_names_out()), numeric, categorical)
+
+    def to_dict(self) -> dict:
+        return {
+            'format': ENCODER_FORMAT,
+            'feature_names': self.feature_names,
+            'numeric': [
+                {'field': field, 'column': column, 'mean': mean, 'scale': scale}
+                for field, column, mean, scale in self.numeric
+            ],
+            'categorical': [
+                {'field': field, 'categories': categories, 'columns': columns}
+                for field, categories, columns in self.categorical
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FeatureEncoder':
+        if data.get('format') != ENCODER_FORMAT:
+            raise ValueError(f"Formato de encoder no soportado: {data.get('format')}")
+        return cls(
+            data['feature_names'],
+            [(n['field'], n['column'], n['mean'], n['scale']) for n in data['numeric']],
+            [(c['field'], c['categories'], c['columns']) for c in data['categorical']],
+        )
+
+    def save(self, path: str):
+        # repr de float64 en JSON es exacto: la media y la escala no cambian al releer
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=1, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'FeatureEncoder':
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FeatureEncoder) and self.to_dict() == other.to_dict()
+
+    def transform_row(self, data: dict) -> np.ndarray:
+        """
+        Codifica un cliente (diccionario en formato del CSV original)
+
+        Raises:
+            ValueError: Si una categórica trae un valor desconocido
+        """
+        row = np.zeros(self.n_features, dtype=np.float32)
+        for field, column, mean, scale in self.numeric:
+            row[column] = (float(data[field]) - mean) / scale
+
+        for field, lookup in self.lookups.items():
+            try:
+                column = lookup[data[field]]
+            except (KeyError, TypeError):
+                raise ValueError(f"Valor no válido para '{field}': {data[field]!r}") from None
+            if column is not None:
+                row[column] = 1
+        return row
+
+    def _output_columns(self, field: str, values) -> np.ndarray:
+        """Columna de salida de cada valor de una categórica (_DROPPED o _INVALID si no tiene)"""
+        # pandas se importa aquí para no sumarlo al arranque de la API
+        import pandas as pd
+
+        table = self._column_tables[field]
+        if isinstance(values, (list, tuple)):
+            # Listas de objetos (JSON): un lookup por valor, sin armar arrays intermedios
+            try:
+                return np.fromiter(map(table.__getitem__, values), dtype=np.intp, count=len(values))
+            except KeyError:
+                return np.fromiter((table.get(v, _INVALID) for v in values), dtype=np.intp, count=len(values))
+
+        if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            # Ya viene codificada: solo se traducen sus categorías
+            codes = values.cat.codes if isinstance(values, pd.Series) else values.codes
+            uniques = values.dtype.categories
+        else:
+            codes, uniques = pd.factorize(values)
+
+        # El código -1 (NaN) toma el último elemento: _INVALID
+        lookup = [table.get(u, _INVALID) for u in uniques] + [_INVALID]
+        return np.array(lookup, dtype=np.intp)[np.asarray(codes)]
+
+    def transform(self, data, dtype=np.float32) -> np.ndarray:
+        """
+        Codifica muchos clientes a la vez
+
+        Las categóricas se traducen a columnas de salida con una tabla por
+        campo (dict por valor en listas, códigos de pandas en arrays y
+        columnas category) y los unos se escriben con un único índice plano,
+        en orden de filas.
+
+        Args:
+            data: DataFrame o diccionario {campo: array} en formato del CSV original
+            dtype: Tipo de la matriz de salida
+
+        Raises:
+            ValueError: Si una categórica trae un valor desconocido
+        """
+        n_rows = len(data[self.numeric[0][0]] if self.numeric else data[self.categorical[0][0]])
+        size = n_rows * self.n_features
+        # Una celda extra al final recibe los unos de las categorías descartadas
+        flat = np.zeros(size + 1, dtype=dtype)
+        features = flat[:size].reshape(n_rows, self.n_features)
+
+        for field, column, mean, scale in self.numeric:
+            values = np.asarray(data[field], dtype=np.float64)
+            features[:, column] = (values - mean) / scale
+
+        if not self.categorical or n_rows == 0:
+            return features
+
+        offsets = np.arange(0, size, self.n_features, dtype=np.intp)
+        indices = np.empty((n_rows, len(self.categorical)), dtype=np.intp)
+        for i, (field, _, _) in enumerate(self.categorical):
+            columns = self._output_columns(field, data[field])
+            if columns.min() < 0:
+                value = np.asarray(data[field], dtype=object)[columns == _INVALID][0]
+                raise ValueError(f"Valor no válido para '{field}': {value!r}")
+            np.add(offsets, columns, out=indices[:, i])
+
+        np.minimum(indices, size, out=indices)
+        flat[indices.reshape(-1)] = 1
+        return features
@@ -0,0 +1,248 @@
+"""
+Exporta los modelos .keras a formatos livianos para servir sin TensorFlow
+
+Formatos:
+- npz: pesos de las capas Dense para el backend NumPy (numpy_backend.py)
+- onnx: grafo ONNX para onnxruntime (onnx_backend.py), requiere tf2onnx
+- tflite: flatbuffer de TensorFlow Lite (tflite_backend.py)
+
+Los artefactos se guardan junto al .keras de la versión (ver registry.py).
+Cada uno se exporta primero a un archivo temporal y se verifica la paridad
+contra Keras sobre el set de test procesado (data/processed/test-Modelo-1.csv)
+o, si no existe, con clientes sintéticos generados a partir de
+FIELD_DESCRIPTIONS; solo si la pasa reemplaza al artefacto que lee la API.
+
+Con --pipeline se exporta además el encoder (model.encoder.json, ver
+encoder.py) a partir del pipeline de preprocesar() guardado con joblib, y se
+verifica que codifique igual que sklearn.
+
+Ejecutar desde api/: python export_models.py [--formatos onnx tflite] [--version v2]
+                     [--pipeline ../models/Pipe_RiskScore.pkl]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+import config
+import predict
+from encoder import ENCODER_ARTIFACT, FeatureEncoder
+from numpy_backend import NumpyModel
+from onnx_backend import OnnxModel
+from registry import MODEL_NAMES
+from tflite_backend import TFLiteModel
+
+# Tolerancia máxima de diferencia absoluta en la probabilidad
+PARITY_ATOL = 1e-5
+PARITY_SAMPLES = 5000
+
+FORMATS = ('npz', 'onnx', 'tflite')
+
+# Ambos modelos usan el mismo split de preprocesar() (random_state=7), así
+# que el test del Modelo 1 sirve para los dos (el notebook del Modelo 2
+# guarda su test sobre train-Modelo-2.csv)
+PROCESSED_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed')
+PARITY_FILE = 'test-Modelo-1.csv'
+
+
+def keras_to_numpy(keras_model) -> NumpyModel:
+    """
+    Extrae los pesos de un Sequential de Keras. Las capas Dropout se omiten
+    porque en inferencia son la identidad.
+    """
+    weights, biases, activations = [], [], []
+    for layer in keras_model.layers:
+        layer_type = type(layer).__name__
+        if layer_type == 'Dropout':
+            continue
+        if layer_type != 'Dense':
+            raise ValueError(f"Capa no soportada por el backend NumPy: {layer_type}")
+
+        w, b = layer.get_weights()
+        weights.append(w)
+        biases.append(b)
+        activations.append(layer.get_config()['activation'])
+
+    return NumpyModel(weights, biases, activations)
+
+
+def load_processed_features(filename: str):
+    """
+    Matriz de features (N, 35) de un CSV de data/processed, en el orden de
+    config.FEATURE_NAMES. Devuelve None si el archivo no existe.
+    """
+    path = os.path.join(PROCESSED_DIR, filename)
+    if not os.path.exists(path):
+        return None
+
+    import pandas as pd
+    data = pd.read_csv(path, usecols=config.FEATURE_NAMES)
+    return data[config.FEATURE_NAMES].to_numpy(dtype=np.float32)
+
+
+def parity_data() -> tuple:
+    """
+    Returns:
+        (matriz de features, descripción del origen)
+    """
+    input_data = load_processed_features(PARITY_FILE)
+    if input_data is not None:
+        return input_data, PARITY_FILE
+    synthetic = config.transform_to_feature_matrix(config.sample_customers(PARITY_SAMPLES, seed=7))
+    return synthetic, f"{PARITY_SAMPLES} clientes sintéticos"
+
+
+def check_parity(keras_model, exported_model, input_data: np.ndarray) -> float:
+    """
+    Compara el modelo exportado contra Keras
+
+    Returns:
+        Diferencia absoluta máxima entre las probabilidades
+    """
+    expected = np.asarray(keras_model.predict_on_batch(input_data))
+    actual = np.asarray(exported_model.predict_on_batch(input_data))
+    return float(np.max(np.abs(expected - actual)))
+
+
+def export_npz(keras_model, path: str) -> NumpyModel:
+    numpy_model = keras_to_numpy(keras_model)
+    numpy_model.save(path)
+    return NumpyModel.load(path)
+
+
+def export_onnx(keras_model, path: str) -> OnnxModel:
+    import tensorflow as tf
+    import tf2onnx
+
+    n_features = keras_model.input_shape[1]
+    signature = (tf.TensorSpec((None, n_features), tf.float32, name='features'),)
+    tf2onnx.convert.from_keras(keras_model, input_signature=signature, opset=13, output_path=path)
+    return OnnxModel.load(path)
+
+
+def export_tflite(keras_model, path: str) -> TFLiteModel:
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    return TFLiteModel.load(path)
+
+
+EXPORTERS = {
+    'npz': export_npz,
+    'onnx': export_onnx,
+    'tflite': export_tflite,
+}
+
+
+def export_model(name: str, formats: list, version: str = None) -> bool:
+    """
+    Exporta una versión de un modelo a los formatos pedidos y verifica la
+    paridad de cada uno contra Keras
+    """
+    import tensorflow as tf
+
+    model_version = predict.registry.resolve(name, version)
+    keras_path = model_version.artifact('.keras')
+    if not os.path.exists(keras_path):
+        print(f"❌ {name}: no encontrado en {keras_path}")
+        return False
+
+    keras_model = tf.keras.models.load_model(keras_path)
+    input_data, source = parity_data()
+
+    ok = True
+    for fmt in formats:
+        path = model_version.artifact(f'.{fmt}')
+        # Mismo directorio (os.replace atómico) y misma extensión que el destino
+        temporal = os.path.join(os.path.dirname(path), f'.tmp-{os.path.basename(path)}')
+        try:
+            exported_model = EXPORTERS[fmt](keras_model, temporal)
+            max_diff = check_parity(keras_model, exported_model, input_data)
+            if max_diff <= PARITY_ATOL:
+                os.replace(temporal, path)
+        except ImportError as e:
+            print(f"❌ {name} [{fmt}]: falta una dependencia ({e.name})")
+            ok = False
+            continue
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+        if max_diff > PARITY_ATOL:
+            print(f"❌ {name} [{fmt}]: diferencia máxima {max_diff:.2e} supera la tolerancia {PARITY_ATOL:.0e}; "
+                  f"no se reemplazó {path}")
+            ok = False
+            continue
+
+        print(f"✓ {name} [{fmt}]: exportado a {path} (diferencia máxima vs Keras en {source}: {max_diff:.2e})")
+
+    return ok
+
+
+def encoder_parity(encoder: FeatureEncoder, pipeline, n_rows: int = PARITY_SAMPLES) -> float:
+    """
+    Compara el encoder contra pipeline.transform sobre clientes sintéticos
+
+    Returns:
+        Diferencia absoluta máxima (0.0 si la codificación es idéntica)
+    """
+    import pandas as pd
+
+    transformer = pipeline.steps[-1][1] if hasattr(pipeline, 'steps') else pipeline
+    customers = pd.DataFrame(config.sample_customers(n_rows, seed=7))
+    numeric = [field for field, _, _, _ in encoder.numeric]
+    customers[numeric] = customers[numeric].astype(np.float64)
+    customers = customers[list(transformer.feature_names_in_)]
+
+    expected = np.asarray(pipeline.transform(customers), dtype=np.float64).astype(np.float32)
+    actual = encoder.transform(customers)
+    return float(np.max(np.abs(expected - actual)))
+
+
+def export_encoder(pipeline, name: str, version: str = None) -> bool:
+    """
+    Compila el pipeline ajustado a model.encoder.json de una versión y
+    verifica que codifique igual que sklearn
+    """
+    model_version = predict.registry.resolve(name, version)
+    encoder = FeatureEncoder.from_pipeline(pipeline)
+    try:
+        config.check_encoder(encoder)
+    except ValueError as e:
+        print(f"❌ {name} [encoder]: {e}")
+        return False
+
+    max_diff = encoder_parity(encoder, pipeline)
+    if max_diff > 0:
+        print(f"❌ {name} [encoder]: difiere de sklearn (diferencia máxima {max_diff:.2e})")
+        return False
+
+    path = model_version.artifact(ENCODER_ARTIFACT)
+    encoder.save(path)
+    print(f"✓ {name} [encoder]: exportado a {path} (idéntico a sklearn en {PARITY_SAMPLES} clientes sintéticos)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta los modelos .keras para servir sin TensorFlow")
+    parser.add_argument('--modelos', nargs='+', choices=MODEL_NAMES, default=list(MODEL_NAMES))
+    parser.add_argument('--formatos', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--version', default=None, help="Versión a exportar (default: la más nueva)")
+    parser.add_argument('--pipeline', default=None,
+                        help="Pipeline de preprocesar() guardado con joblib para exportar el encoder")
+    args = parser.parse_args()
+
+    results = [export_model(name, args.formatos, args.version) for name in args.modelos]
+    if args.pipeline:
+        import joblib
+        pipeline = joblib.load(args.pipeline)
+        results += [export_encoder(pipeline, name, args.version) for name in args.modelos]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Lectura rápida del body de /predict/*
+
+Valida el JSON crudo y lo convierte directamente en la fila (o matriz) de
+features, sin instanciar CustomerData ni armar diccionarios intermedios. Las
+tablas de validación se precompilan una sola vez a partir de
+CustomerData.model_fields (valores de cada Literal y límites ge/le), y las
+de codificación a partir del encoder con que se va a predecir (por defecto el
+activo, config.encoder), que se recompilan si cambia.
+
+El camino rápido solo acepta lo que Pydantic aceptaría sin conversiones
+(str exactos en las categóricas, int/float en las numéricas dentro de rango).
+Cualquier otra entrada se valida con Pydantic, así que los valores aceptados
+y los errores 422 son exactamente los mismos que con el body tipado.
+"""
+
+import email.message
+import json
+import typing
+
+import annotated_types
+import numpy as np
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+import config
+from schemas import BatchPredictionRequest, CustomerData
+
+
+class _NotFastPath(Exception):
+    """La entrada no es trivialmente válida; se valida con Pydantic"""
+
+
+def _compile_numeric_limits() -> dict:
+    """{campo: (tipos aceptados, mínimo, máximo)} según CustomerData"""
+    limits = {}
+    for field in config.NUMERIC_FEATURES:
+        info = CustomerData.model_fields[field]
+        low, high = float('-inf'), float('inf')
+        for constraint in info.metadata:
+            if isinstance(constraint, annotated_types.Ge):
+                low = constraint.ge
+            elif isinstance(constraint, annotated_types.Le):
+                high = constraint.le
+        types = (int,) if info.annotation is int else (int, float)
+        limits[field] = (types, low, high)
+    return limits
+
+
+def _check_categorical():
+    """Los Literal de CustomerData son los valores válidos de FIELD_DESCRIPTIONS"""
+    for field in config.CATEGORICAL_FEATURES:
+        allowed = set(typing.get_args(CustomerData.model_fields[field].annotation))
+        if allowed != set(config.FIELD_DESCRIPTIONS[field]['valores_validos']):
+            raise RuntimeError(f"CustomerData y FIELD_DESCRIPTIONS no coinciden en '{field}'")
+
+
+_LIMITS = _compile_numeric_limits()
+_check_categorical()
+
+# (encoder, numéricas, categóricas) compilados para el último encoder usado
+_compiled = (None, None, None)
+
+
+def _compile(encoder) -> tuple:
+    """
+    Tablas del camino rápido para un encoder (ver encoder.py):
+
+    - numéricas: [(campo, columna, media, escala, tipos aceptados, mínimo, máximo)]
+    - categóricas: [(campo, {valor: columna que se pone en 1, o None})]; la
+      categoría descartada en variables binarias mapea a None
+    """
+    numeric = [
+        (field, column, mean, scale, *_LIMITS[field])
+        for field, column, mean, scale in encoder.numeric
+    ]
+    return encoder, numeric, list(encoder.lookups.items())
+
+
+def _tables(encoder) -> tuple:
+    """Tablas del encoder; se recompilan si predict.py lo reemplazó"""
+    global _compiled
+    compiled = _compiled
+    if compiled[0] is not encoder:
+        compiled = _compiled = _compile(encoder)
+    return compiled
+
+
+def _validate_or_raise(model: typing.Type[BaseModel], data) -> BaseModel:
+    """Valida con Pydantic; si falla, levanta el 422 con el mismo formato que FastAPI"""
+    try:
+        return model.model_validate(data, from_attributes=True)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, 'loc': ('body',) + tuple(error['loc'])} for error in e.errors()],
+            body=data
+        )
+
+
+def _missing_body_error() -> RequestValidationError:
+    error = ValidationError.from_exception_data(
+        "Field required", [{'type': 'missing', 'loc': ('body',), 'input': {}}]
+    ).errors()[0]
+    error['input'] = None
+    return RequestValidationError([error])
+
+
+async def read_json_body(request: Request):
+    """
+    Lee el body igual que FastAPI: JSON si el content-type lo indica (o si
+    falta), bytes en otro caso, None si viene vacío
+    """
+    body = await request.body()
+    if not body:
+        return None
+
+    content_type = request.headers.get('content-type')
+    if content_type:
+        message = email.message.Message()
+        message['content-type'] = content_type
+        subtype = message.get_content_subtype()
+        if message.get_content_maintype() != 'application' or not (
+            subtype == 'json' or subtype.endswith('+json')
+        ):
+            return body
+
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError as e:
+        raise RequestValidationError([{
+            'type': 'json_invalid',
+            'loc': ('body', e.pos),
+            'msg': 'JSON decode error',
+            'input': {},
+            'ctx': {'error': e.msg},
+        }], body=e.doc) from e
+
+
+def _encode_customer_fast(data, encoder) -> np.ndarray:
+    if type(data) is not dict:
+        raise _NotFastPath
+
+    encoder, numeric, categorical = _tables(encoder)
+    row = np.zeros(encoder.n_features, dtype=np.float32)
+    for field, column, mean, scale, types, low, high in numeric:
+        value = data[field]
+        if type(value) not in types or not low <= value <= high:
+            raise _NotFastPath
+        row[column] = (float(value) - mean) / scale
+
+    for field, lookup in categorical:
+        column = lookup[data[field]]
+        if column is not None:
+            row[column] = 1
+
+    return row
+
+
+def encode_customer(data, encoder=None) -> np.ndarray:
+    """
+    Valida un cliente (JSON ya parseado) y devuelve su fila codificada (35,)
+
+    Cada fila es idéntica a encoder.transform_row(...) del mismo cliente
+
+    Args:
+        encoder: Encoder con que se codifica (default: el activo)
+
+    Raises:
+        RequestValidationError: Con los mismos errores que CustomerData
+    """
+    encoder = encoder or config.encoder
+    if data is None:
+        raise _missing_body_error()
+    try:
+        return _encode_customer_fast(data, encoder)
+    except (_NotFastPath, KeyError, TypeError, OverflowError):
+        # OverflowError: enteros JSON que no entran en un float; Pydantic los rechaza
+        pass
+
+    customer = _validate_or_raise(CustomerData, data)
+    return encoder.transform_row(customer.model_dump())
+
+
+def _encode_batch_fast(data, encoder) -> np.ndarray:
+    if type(data) is not dict:
+        raise _NotFastPath
+    records = data['clientes']
+    if type(records) is not list or not 1 <= len(records) <= config.BATCH_MAX_SIZE:
+        raise _NotFastPath
+
+    # Validación por columna: un chequeo vectorizado por campo
+    columns = config.records_to_columns(records)
+    for field, (types, low, high) in _LIMITS.items():
+        values = np.asarray(columns[field])
+        if values.dtype.kind not in ('iub' if types == (int,) else 'iubf'):
+            raise _NotFastPath
+        if not ((values >= low) & (values <= high)).all():
+            raise _NotFastPath
+
+    # Las categorías inválidas (o no-str) hacen fallar al encoder con ValueError
+    return encoder.transform(columns)
+
+
+def encode_batch(data, encoder=None) -> np.ndarray:
+    """
+    Valida un lote {'clientes': [...]} columna por columna y devuelve la
+    matriz codificada (N, 35)
+
+    Args:
+        encoder: Encoder con que se codifica (default: el activo)
+
+    Raises:
+        RequestValidationError: Con los mismos errores que BatchPredictionRequest
+    """
+    encoder = encoder or config.encoder
+    if data is None:
+        raise _missing_body_error()
+    try:
+        return _encode_batch_fast(data, encoder)
+    except (_NotFastPath, KeyError, TypeError, ValueError):
+        pass
+
+    batch = _validate_or_raise(BatchPredictionRequest, data)
+    customers = [customer.model_dump() for customer in batch.clientes]
+    return encoder.transform(config.records_to_columns(customers))
+
+
+def _inline_refs(schema, definitions: dict):
+    if isinstance(schema, dict):
+        ref = schema.get('$ref', '')
+        if ref.startswith('#/$defs/'):
+            return _inline_refs(definitions[ref.split('/')[-1]], definitions)
+        return {key: _inline_refs(value, definitions) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_inline_refs(value, definitions) for value in schema]
+    return schema
+
+
+def openapi_body(model: typing.Type[BaseModel]) -> dict:
+    """
+    openapi_extra para documentar el body de un endpoint que lo lee a mano,
+    con el mismo schema (y ejemplo) que tendría el parámetro tipado
+    """
+    schema = model.model_json_schema()
+    definitions = schema.pop('$defs', {})
+    return {
+        'requestBody': {
+            'content': {'application/json': {'schema': _inline_refs(schema, definitions)}},
+            'required': True,
+        }
+    }
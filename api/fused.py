@@ -0,0 +1,75 @@
+"""
+Modelo fusionado para /predict/both
+
+Ambos modelos reciben la misma fila codificada, así que se pueden evaluar en
+UNA sola llamada con un modelo de dos salidas (N, 35) -> (N, 2):
+
+- NumPy: pesos apilados. La primera capa concatena las matrices de ambas
+  torres (entrada compartida) y las siguientes son diagonales por bloques,
+  de modo que cada torre solo ve sus propias activaciones.
+- Keras: modelo funcional con la entrada compartida y ambas redes como
+  torres independientes, concatenadas a la salida.
+
+Los demás backends (onnx, tflite) siguen evaluando los modelos por separado.
+"""
+
+import sys
+
+import numpy as np
+
+from numpy_backend import NumpyModel
+
+
+def _block_diagonal(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    out = np.zeros((a.shape[0] + b.shape[0], a.shape[1] + b.shape[1]), dtype=a.dtype)
+    out[:a.shape[0], :a.shape[1]] = a
+    out[a.shape[0]:, a.shape[1]:] = b
+    return out
+
+
+def fuse_numpy(model1: NumpyModel, model2: NumpyModel) -> NumpyModel:
+    """
+    Apila los pesos de dos redes densas con la misma arquitectura
+
+    Raises:
+        ValueError: Si las redes no tienen la misma cantidad de capas y
+            activaciones
+    """
+    if model1.activations != model2.activations:
+        raise ValueError("Los modelos deben tener las mismas capas y activaciones para fusionarse")
+
+    weights = [np.hstack([model1.weights[0], model2.weights[0]])]
+    for w1, w2 in zip(model1.weights[1:], model2.weights[1:]):
+        weights.append(_block_diagonal(w1, w2))
+    biases = [np.concatenate([b1, b2]) for b1, b2 in zip(model1.biases, model2.biases)]
+
+    return NumpyModel(weights, biases, model1.activations)
+
+
+def fuse_keras(model1, model2):
+    """Modelo funcional de Keras con entrada compartida y dos torres"""
+    import tensorflow as tf
+
+    inputs = tf.keras.Input(shape=(model1.input_shape[1],), name='features')
+    outputs = tf.keras.layers.Concatenate(name='probabilidades')([model1(inputs), model2(inputs)])
+    return tf.keras.Model(inputs, outputs, name='churn_fusionado')
+
+
+def _is_keras(model) -> bool:
+    # Si TensorFlow no se importó, el modelo no puede ser de Keras
+    if 'tensorflow' not in sys.modules:
+        return False
+    import tensorflow as tf
+    return isinstance(model, tf.keras.Model)
+
+
+def fuse_models(model1, model2):
+    """
+    Modelo (N, 35) -> (N, 2) con [prob_churn, prob_riesgo] por fila, o None
+    si el backend de los modelos no se puede fusionar
+    """
+    if isinstance(model1, NumpyModel) and isinstance(model2, NumpyModel):
+        return fuse_numpy(model1, model2)
+    if _is_keras(model1) and _is_keras(model2):
+        return fuse_keras(model1, model2)
+    return None
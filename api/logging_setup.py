@@ -0,0 +1,108 @@
+"""
+Logging asíncrono y estructurado
+
+Los handlers de la aplicación solo encolan el LogRecord (QueueHandler); un
+thread en segundo plano (QueueListener) lo formatea y lo escribe. Así el
+event loop y los workers de inferencia nunca esperan a stdout.
+
+El formato 'json' emite una línea por evento con los campos pasados en
+extra={'campos': {...}}. Los logs por predicción se muestrean con Sampler
+para no escribir una línea por request.
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que no formatea en el thread que loguea: la cola es en
+    memoria (no hay que serializar el registro), así que el mensaje con %
+    y la traza de la excepción se arman recién en el listener
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        campos = getattr(record, 'campos', None)
+        if campos:
+            payload.update(campos)
+        if record.exc_info:
+            payload['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class Sampler:
+    """
+    Devuelve True 1 de cada `rate` llamadas (rate=1 registra todo)
+
+    itertools.count es atómico bajo el GIL, así que se puede compartir entre
+    threads sin lock.
+    """
+
+    def __init__(self, rate: int):
+        self.rate = max(1, int(rate))
+        self._counter = itertools.count()
+
+    def __call__(self) -> bool:
+        return next(self._counter) % self.rate == 0
+
+
+def setup_logging(level: str = 'INFO', log_format: str = 'json'):
+    """
+    Configura el logger raíz con un QueueHandler y arranca el listener que
+    escribe a stderr. Reemplaza a logging.basicConfig; llamarla de nuevo
+    reinicia la configuración.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    stream_handler = logging.StreamHandler()
+    if log_format == 'json':
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Vacía la cola y detiene el thread de escritura"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -1,15 +1,32 @@
-from fastapi import FastAPI, HTTPException
+from typing import Literal, Optional
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+import hmac
 import logging
+import os
+import numpy as np
 import config
+import fast_parse
+import metrics
 import predict
-from schemas import CustomerData, ChurnPredictionResponse, RiskScoreResponse, CombinedPredictionResponse
-
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from batcher import MicroBatcher
+from logging_setup import setup_logging, stop_logging
+from workers import InferencePool, PoolSaturatedError
+from schemas import (
+    CustomerData,
+    ChurnPredictionResponse,
+    RiskScoreResponse,
+    CombinedPredictionResponse,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+    RoiRequest,
+    RoiResponse,
 )
+import roi
+
+# Configurar logging: los registros se encolan y los escribe un thread aparte
+setup_logging(config.LOG_LEVEL, config.LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
 # Crear interfaz
@@ -28,16 +45,113 @@ app = FastAPI(
     - `POST /predict/churn` - Predice si habrá churn
     - `POST /predict/risk_score` - Calcula nivel de riesgo
     - `POST /predict/both` - Ambas predicciones en una llamada
+    - `POST /predict/batch` - Ambas predicciones para un lote de clientes
     - `GET /fields/info` - Ver descripción de todos los campos
     - `GET /fields/example` - Ver ejemplo de request válido
+    - `GET /health/live` - El proceso está vivo
+    - `GET /health/ready` - Los modelos están cargados (503 mientras cargan)
+    - `GET /health/pool` - Estado de la cola de inferencia
+    - `GET /admin/models` - Versiones de cada modelo
+    - `POST /admin/models/{modelo}/reload` - Cargar otra versión sin reiniciar
+    - `POST /admin/models/{modelo}/rollback` - Volver a la versión anterior
+    - `POST /admin/models/reload` - Cargar juntos ambos modelos (reentrenados)
+    - `POST /admin/models/rollback` - Volver a la versión anterior de ambos
+    - `GET /health/cache` - Estadísticas del cache de predicciones
+    - `GET /metrics` - Métricas en formato Prometheus
     """
 )
 
+# Todas las rutas registran duración, status y tiempo de validación en /metrics
+app.router.route_class = metrics.MetricsRoute
+
+
+# La inferencia corre en threads dedicados para no bloquear el event loop
+pool = InferencePool(
+    max_workers=config.INFERENCE_WORKERS,
+    max_queue=config.INFERENCE_QUEUE_SIZE
+)
+
+# Acumula requests concurrentes y las evalúa en un solo forward pass por modelo
+batcher = MicroBatcher(
+    predict.predict_probabilities,
+    max_wait_ms=config.MICROBATCH_WINDOW_MS,
+    max_rows=config.MICROBATCH_MAX_ROWS,
+    pool=pool
+) if config.MICROBATCH_ENABLED else None
+
+
+def service_unavailable(e: Exception) -> HTTPException:
+    """503 con Retry-After cuando la cola está llena o los modelos se están cargando"""
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(config.RETRY_AFTER_SECONDS)}
+    )
+
+
+async def customer_row(request: Request) -> tuple:
+    """
+    Body de /predict/churn, /risk_score y /both validado y codificado en un
+    solo paso (ver fast_parse); mismos errores 422 que CustomerData
+
+    Returns:
+        (fila (35,), modelos con cuyo encoder se codificó)
+    """
+    data = await fast_parse.read_json_body(request)
+    models = predict.serving()
+    with metrics.STAGE_DURATION.time(etapa='validacion'):
+        return fast_parse.encode_customer(data, models.encoder), models
+
 
-# Carga de modelos al iniciar
+async def batch_matrix(request: Request) -> tuple:
+    """Body de /predict/batch validado por columnas y codificado: ((N, 35), modelos)"""
+    data = await fast_parse.read_json_body(request)
+    models = predict.serving()
+    with metrics.STAGE_DURATION.time(etapa='validacion'):
+        return fast_parse.encode_batch(data, models.encoder), models
+
+
+async def predict_row(encoded: tuple, churn: bool, risk: bool) -> tuple:
+    """
+    Evalúa un cliente ya codificado consultando primero el cache y luego el
+    micro-batcher (si está habilitado)
+
+    Args:
+        encoded: (fila, modelos) de customer_row; se predice con esos modelos
+            aunque entretanto se haya recargado alguno
+
+    Returns:
+        (prob_churn, prob_riesgo); None para el modelo no solicitado
+    """
+    row, models = encoded
+    predict.check_models(churn, risk, models)
+
+    cache = predict.prediction_cache
+    key = cache.key(row)
+    result = cache.get(key, churn, risk, models.generation)
+    if result is None:
+        if batcher is None:
+            result = await pool.run(predict.predict_single, row, churn, risk, models)
+        else:
+            run_churn, run_risk = predict.models_to_run(churn, risk, models)
+            result = await batcher.submit(row, churn=run_churn, risk=run_risk, models=models)
+            cache.put(key, *result, generation=models.generation)
+
+    predict.log_prediction('api', *result)
+    return result
+
+
+# Carga de modelos al iniciar, en segundo plano: / y /fields/* responden de
+# inmediato y /health/ready indica cuándo se puede enrutar tráfico
 @app.on_event("startup")
 async def startup_event():
-    predict.load_models()
+    predict.load_models_in_background()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    pool.shutdown()
+    stop_logging()
 
 
 # ENDPOINTS con fines de presentacion
@@ -54,8 +168,17 @@ async def root():
             "POST /predict/churn": "Predice si habrá churn (Yes/No)",
             "POST /predict/risk_score": "Calcula nivel de riesgo (Bajo/Medio/Alto)",
             "POST /predict/both": "Ambas predicciones combinadas",
+            "POST /predict/batch": "Ambas predicciones para un lote de clientes",
+            "POST /roi/optimize": "Umbral y bins de riesgo de máxima ganancia para un conjunto de scores",
+            "GET /roi/thresholds": "Umbrales de decisión en uso",
             "GET /fields/info": "Ver descripción de todos los campos",
-            "GET /fields/example": "Ver ejemplo de request válido"
+            "GET /fields/example": "Ver ejemplo de request válido",
+            "GET /health/live": "El proceso está vivo",
+            "GET /health/ready": "Los modelos están cargados y se puede enrutar tráfico",
+            "GET /health/pool": "Estado de la cola de inferencia",
+            "GET /admin/models": "Versiones disponibles, activa y anterior de cada modelo",
+            "GET /health/cache": "Estadísticas del cache de predicciones",
+            "GET /metrics": "Métricas en formato Prometheus"
         },
         "documentacion": {
             "swagger": "/docs",
@@ -87,26 +210,166 @@ async def fields_example():
     }
 
 
+@app.get("/health/live", tags=["Salud"])
+async def health_live():
+    """
+    Liveness: responde mientras el proceso esté en pie
+    """
+    return {"estado": "ok"}
+
+
+@app.get("/health/ready", tags=["Salud"])
+async def health_ready():
+    """
+    Readiness: 200 solo cuando ambos modelos están cargados, con el estado
+    y la duración de carga de cada uno
+    """
+    ready = predict.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "listo": ready,
+            "backend": config.INFERENCE_BACKEND,
+            "modelos": {name: dict(status) for name, status in predict.model_status.items()}
+        }
+    )
+
+
+@app.get("/health/pool", tags=["Salud"])
+async def health_pool():
+    """
+    Profundidad de la cola y tiempos de espera del pool de inferencia
+    """
+    return pool.stats()
+
+
+@app.get("/health/cache", tags=["Salud"])
+async def health_cache():
+    """
+    Hits, misses y ocupación del cache de predicciones
+    """
+    return predict.prediction_cache.stats()
+
+
+@app.get("/metrics", tags=["Salud"], response_class=Response)
+async def metrics_endpoint():
+    """
+    Latencia por etapa, requests por endpoint/status, resultados de los
+    modelos y versiones activas, en formato de texto de Prometheus
+    """
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+# ENDPOINTS DE ADMINISTRACION
+
+def check_admin_token(token: Optional[str]):
+    """
+    Sin CHURN_ADMIN_TOKEN los endpoints de administración no existen (404);
+    con él, el header X-Admin-Token tiene que coincidir (401)
+    """
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Administración deshabilitada (definir CHURN_ADMIN_TOKEN)")
+    if token is None or not hmac.compare_digest(token.encode(), config.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Token de administración inválido")
+
+
+@app.get("/admin/models", tags=["Administración"])
+async def admin_models(x_admin_token: Optional[str] = Header(None)):
+    """
+    Versiones disponibles, activa y anterior de cada modelo
+    """
+    check_admin_token(x_admin_token)
+    return predict.models_info()
+
+
+@app.post("/admin/models/{modelo}/reload", status_code=202, tags=["Administración"])
+async def admin_reload(
+    modelo: Literal['model1', 'model2'],
+    version: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Carga una versión (por defecto la más nueva) en segundo plano, la calienta
+    y la pone en servicio sin cortar el tráfico. El progreso se ve en GET /admin/models
+    """
+    check_admin_token(x_admin_token)
+    try:
+        version = predict.reload_model_in_background(modelo, version)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"modelo": modelo, "version": version, "estado": "cargando"}
+
+
+@app.post("/admin/models/reload", status_code=202, tags=["Administración"])
+async def admin_reload_both(
+    model1: Optional[str] = None,
+    model2: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Carga una versión de ambos modelos (por defecto la más nueva de cada uno)
+    y los pone en servicio juntos, con su encoder. Es la forma de activar
+    modelos reentrenados, cuyo encoder no coincide con el de los anteriores
+    """
+    check_admin_token(x_admin_token)
+    try:
+        versions = predict.reload_models_in_background({'model1': model1, 'model2': model2})
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"versiones": versions, "estado": "cargando"}
+
+
+@app.post("/admin/models/rollback", tags=["Administración"])
+async def admin_rollback_both(x_admin_token: Optional[str] = Header(None)):
+    """
+    Vuelve de inmediato a la versión anterior de ambos modelos, juntos
+    """
+    check_admin_token(x_admin_token)
+    try:
+        versions = predict.rollback_models()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"versiones": versions, "estado": "listo"}
+
+
+@app.post("/admin/models/{modelo}/rollback", tags=["Administración"])
+async def admin_rollback(modelo: Literal['model1', 'model2'], x_admin_token: Optional[str] = Header(None)):
+    """
+    Vuelve de inmediato a la versión anterior del modelo
+    """
+    check_admin_token(x_admin_token)
+    try:
+        version = predict.rollback_model(modelo)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"modelo": modelo, "version": version, "estado": "listo"}
+
+
 # ENDPOINTS DE PREDICCION
 
+# El body se lee y valida en customer_row/batch_matrix; se documenta aparte
+CUSTOMER_BODY = fast_parse.openapi_body(CustomerData)
+BATCH_BODY = fast_parse.openapi_body(BatchPredictionRequest)
+
+
 @app.post(
     "/predict/churn",
     response_model=ChurnPredictionResponse,
     tags=["Predicciones"],
-    summary="Predecir Churn (Modelo 1)"
+    summary="Predecir Churn (Modelo 1)",
+    openapi_extra=CUSTOMER_BODY
 )
-async def predict_churn(customer: CustomerData):
+async def predict_churn(encoded: tuple = Depends(customer_row)):
     try:
-        # Convertir Pydantic model a dict
-        customer_dict = customer.dict()
-
-        # Ejecutar predicción
-        return predict.get_churn_prediction(customer_dict)
+        churn_prob, _ = await predict_row(encoded, churn=True, risk=False)
+        return predict.build_churn_response(churn_prob)
 
+    except (PoolSaturatedError, predict.ModelNotReadyError) as e:
+        raise service_unavailable(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error en /predict/churn: {str(e)}")
+        logger.error("Error en /predict/churn: %s", e)
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
 
@@ -114,17 +377,20 @@ async def predict_churn(customer: CustomerData):
     "/predict/risk_score",
     response_model=RiskScoreResponse,
     tags=["Predicciones"],
-    summary="Calcular Score de Riesgo (Modelo 2)"
+    summary="Calcular Score de Riesgo (Modelo 2)",
+    openapi_extra=CUSTOMER_BODY
 )
-async def predict_risk_score(customer: CustomerData):
+async def predict_risk_score(encoded: tuple = Depends(customer_row)):
     try:
-        customer_dict = customer.dict()
-        return predict.get_risk_score_prediction(customer_dict)
+        _, risk_prob = await predict_row(encoded, churn=False, risk=True)
+        return predict.build_risk_response(risk_prob)
 
+    except (PoolSaturatedError, predict.ModelNotReadyError) as e:
+        raise service_unavailable(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error en /predict/risk_score: {str(e)}")
+        logger.error("Error en /predict/risk_score: %s", e)
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
 
@@ -132,19 +398,87 @@ async def predict_risk_score(customer: CustomerData):
     "/predict/both",
     response_model=CombinedPredictionResponse,
     tags=["Predicciones"],
-    summary="Predicción Completa (Ambos Modelos)"
+    summary="Predicción Completa (Ambos Modelos)",
+    openapi_extra=CUSTOMER_BODY
 )
-async def predict_both(customer: CustomerData):
+async def predict_both(encoded: tuple = Depends(customer_row)):
     try:
-        customer_dict = customer.dict()
-        return predict.get_combined_prediction(customer_dict)
+        churn_prob, risk_prob = await predict_row(encoded, churn=True, risk=True)
+        return CombinedPredictionResponse(
+            churn=predict.build_churn_response(churn_prob),
+            risk_score=predict.build_risk_response(risk_prob)
+        )
 
+    except (PoolSaturatedError, predict.ModelNotReadyError) as e:
+        raise service_unavailable(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error en /predict/both: {str(e)}")
+        logger.error("Error en /predict/both: %s", e)
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
+
+@app.post(
+    "/predict/batch",
+    response_model=BatchPredictionResponse,
+    tags=["Predicciones"],
+    summary="Predicción por Lotes (Ambos Modelos)",
+    openapi_extra=BATCH_BODY
+)
+async def predict_batch(encoded: tuple = Depends(batch_matrix)):
+    try:
+        return await pool.run(predict.predict_batch, *encoded)
+
+    except (PoolSaturatedError, predict.ModelNotReadyError) as e:
+        raise service_unavailable(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error en /predict/batch: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+
+# ENDPOINTS DE ROI
+
+def optimize_roi(request: RoiRequest) -> dict:
+    return roi.optimize(
+        np.asarray(request.probabilidades, dtype=np.float64),
+        None if request.etiquetas is None else np.asarray(request.etiquetas, dtype=np.int8),
+        ltv=request.ltv,
+        retention_cost=request.costo_retencion,
+        success_rate=request.tasa_exito,
+        followup_cost=request.costo_seguimiento,
+        followup_success_rate=request.tasa_exito_seguimiento
+    )
+
+
+@app.post("/roi/optimize", response_model=RoiResponse, tags=["ROI"], summary="Optimizar Umbrales por Ganancia")
+async def roi_optimize(request: RoiRequest):
+    """
+    Ganancia esperada para todos los umbrales posibles (orden + sumas
+    acumuladas) y el umbral de churn y bins de riesgo que la maximizan.
+    El resultado se puede poner en servicio con roi.py --guardar
+    """
+    try:
+        return await pool.run(optimize_roi, request)
+
+    except PoolSaturatedError as e:
+        raise service_unavailable(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/roi/thresholds", tags=["ROI"])
+async def roi_thresholds():
+    """
+    Umbral de churn y bins de riesgo que usa /predict/*
+    """
+    return {
+        "umbral_churn": predict.CHURN_THRESHOLD,
+        "bins_riesgo": list(predict.RISK_BINS),
+        "archivo": config.THRESHOLDS_FILE if os.path.exists(config.THRESHOLDS_FILE) else None
+    }
+
 # EJECUTAR SERVIDOR
 
 if __name__ == "__main__":
@@ -0,0 +1,264 @@
+"""
+Métricas de la API en formato de texto de Prometheus
+
+Contadores, gauges e histogramas mínimos (thread-safe) sin dependencias
+externas; GET /metrics devuelve render(). Las etapas de una predicción
+(validación, modelo 1, modelo 2, o ambos modelos fusionados) se registran
+por separado en churn_etapa_duracion_segundos para ver cuál domina la
+latencia. En /predict/* el body se valida y codifica en un solo paso
+(fast_parse), que se registra como 'validacion'; el resto de las rutas no
+aporta a ese histograma.
+"""
+
+import asyncio
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
+
+# Starlette agrega '; charset=utf-8'
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+# Desde 100 µs (codificación de una fila) hasta segundos (lotes grandes)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> list:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+
+
+class Counter(_Metric):
+    """Contador monotónico por combinación de labels"""
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Valor que sube y baja. Con callback, el valor se calcula al renderizar:
+    callback() -> {(valores de labels): valor}
+    """
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> list:
+        if self._callback is not None:
+            items = sorted(self._callback().items())
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return self.header() + [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Histograma con buckets fijos (límite superior inclusivo)"""
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [conteo por bucket (+Inf al final), suma]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+        lines = self.header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+STAGE_DURATION = registry.register(Histogram(
+    'churn_etapa_duracion_segundos',
+    'Duración de cada etapa de una predicción (validacion, model1, model2, fusionado)',
+    ('etapa',)
+))
+REQUEST_DURATION = registry.register(Histogram(
+    'churn_request_duracion_segundos', 'Duración total de la request', ('endpoint',)
+))
+REQUESTS = registry.register(Counter(
+    'churn_requests_total', 'Requests atendidas por endpoint y status', ('endpoint', 'metodo', 'status')
+))
+IN_FLIGHT = registry.register(Gauge(
+    'churn_requests_en_curso', 'Requests en curso'
+))
+IN_FLIGHT.inc(0)
+CHURN_PREDICTIONS = registry.register(Counter(
+    'churn_predicciones_total', 'Predicciones del Modelo 1 por resultado', ('churn',)
+))
+RISK_PREDICTIONS = registry.register(Counter(
+    'churn_nivel_riesgo_total', 'Predicciones del Modelo 2 por nivel de riesgo', ('nivel_riesgo',)
+))
+
+
+def register_model_versions(callback):
+    """
+    Gauge churn_modelo_version{modelo, version} = 1 para la versión activa.
+    callback() -> {(modelo, version): 1}
+    """
+    registry.register(Gauge(
+        'churn_modelo_version', 'Versión activa de cada modelo', ('modelo', 'version'), callback=callback
+    ))
+
+
+def render() -> str:
+    return registry.render()
+
+
+# Inicio de la request en curso; la validación es el tiempo hasta que se
+# ejecuta el endpoint (lectura del body + Pydantic) en las rutas de predicción
+# con body tipado
+_request_start = contextvars.ContextVar('request_start', default=None)
+
+
+class MetricsRoute(APIRoute):
+    """
+    APIRoute que registra duración, status y requests en curso, y el tiempo
+    de validación del body en las rutas de /predict/* que lo reciben tipado
+    (el de otras rutas, como /roi/optimize, no es una etapa de predicción)
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            super().__init__(path, endpoint, **kwargs)
+            return
+
+        has_body = False
+
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kw):
+            start = _request_start.get()
+            if has_body and start is not None:
+                STAGE_DURATION.observe(time.perf_counter() - start, etapa='validacion')
+            return await endpoint(*args, **kw)
+
+        super().__init__(path, timed_endpoint, **kwargs)
+        has_body = self.body_field is not None and path.startswith('/predict/')
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        path = self.path
+
+        async def timed_handler(request):
+            start = time.perf_counter()
+            token = _request_start.set(start)
+            IN_FLIGHT.inc()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                IN_FLIGHT.dec()
+                _request_start.reset(token)
+                REQUEST_DURATION.observe(time.perf_counter() - start, endpoint=path)
+                REQUESTS.inc(endpoint=path, metodo=request.method, status=status)
+
+        return timed_handler
@@ -0,0 +1,90 @@
+"""
+Motor de inferencia en NumPy para las redes densas de churn
+
+Ambos modelos son MLP Sequential pequeños (Dense 35 -> Dense 17 -> sigmoid).
+Las capas Dropout solo actúan durante el entrenamiento, así que en inferencia
+la red se reduce a multiplicaciones de matrices + activaciones y no hace falta
+cargar TensorFlow.
+
+Los pesos se exportan desde los .keras a un .npz con export_models.py
+"""
+
+import numpy as np
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # exp(-x) desborda a inf para x muy negativos, lo que da 0.0 igual que Keras
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-x))
+
+
+def _linear(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+ACTIVATIONS = {
+    'relu': _relu,
+    'sigmoid': _sigmoid,
+    'linear': _linear,
+}
+
+
+class NumpyModel:
+    """
+    Red densa evaluada con NumPy.
+
+    Expone predict / predict_on_batch / input_shape igual que un modelo de
+    Keras, para que predict.py pueda usar cualquiera de los dos backends.
+    """
+
+    def __init__(self, weights: list, biases: list, activations: list):
+        if not (len(weights) == len(biases) == len(activations)):
+            raise ValueError("weights, biases y activations deben tener el mismo largo")
+
+        for activation in activations:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Activación no soportada: {activation}")
+
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+
+    @property
+    def input_shape(self) -> tuple:
+        return (None, self.weights[0].shape[0])
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyModel':
+        """Carga un modelo exportado con save()"""
+        with np.load(path, allow_pickle=False) as data:
+            n_layers = int(data['n_layers'])
+            weights = [data[f'W{i}'] for i in range(n_layers)]
+            biases = [data[f'b{i}'] for i in range(n_layers)]
+            activations = [str(a) for a in data['activations']]
+        return cls(weights, biases, activations)
+
+    def save(self, path: str) -> None:
+        """Guarda los pesos en un .npz comprimido"""
+        arrays = {'n_layers': np.array(len(self.weights))}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f'W{i}'] = w
+            arrays[f'b{i}'] = b
+        arrays['activations'] = np.array(self.activations)
+        np.savez_compressed(path, **arrays)
+
+    def predict_on_batch(self, x) -> np.ndarray:
+        """Forward pass completo; devuelve un array (N, salidas)"""
+        output = np.asarray(x, dtype=np.float32)
+        for w, b, activation in zip(self.weights, self.biases, self.activations):
+            output = output @ w
+            output += b
+            output = ACTIVATIONS[activation](output)
+        return output
+
+    def predict(self, x, verbose=0, **kwargs) -> np.ndarray:
+        """Compatible con Model.predict de Keras (verbose y demás se ignoran)"""
+        return self.predict_on_batch(x)
@@ -0,0 +1,52 @@
+"""
+Motor de inferencia con onnxruntime
+
+Carga el .onnx exportado con export_models.py. onnxruntime pesa mucho menos
+que TensorFlow y tiene muy poco overhead por llamada, lo que favorece la
+inferencia de una sola fila.
+"""
+
+import numpy as np
+
+
+class OnnxModel:
+    """
+    Sesión de onnxruntime con la interfaz de un modelo de Keras
+    (predict / predict_on_batch / input_shape).
+
+    Args:
+        path: Archivo .onnx
+        threads: Threads intra-op por llamada; con el pool de inferencia ya
+            hay varias llamadas en paralelo, así que por defecto 1
+    """
+
+    def __init__(self, path: str, threads: int = 1):
+        # onnxruntime solo se importa si se elige este backend
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._n_features = model_input.shape[1]
+
+    @property
+    def input_shape(self) -> tuple:
+        return (None, self._n_features)
+
+    @classmethod
+    def load(cls, path: str, threads: int = 1) -> 'OnnxModel':
+        return cls(path, threads)
+
+    def predict_on_batch(self, x) -> np.ndarray:
+        """Forward pass completo; devuelve un array (N, salidas)"""
+        # InferenceSession.run es thread-safe
+        input_data = np.ascontiguousarray(x, dtype=np.float32)
+        return self._session.run(None, {self._input_name: input_data})[0]
+
+    def predict(self, x, verbose=0, **kwargs) -> np.ndarray:
+        """Compatible con Model.predict de Keras (verbose y demás se ignoran)"""
+        return self.predict_on_batch(x)
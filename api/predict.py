@@ -1,181 +1,755 @@
-import tensorflow as tf
 import numpy as np
 import os
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
 import config
-from schemas import ChurnPredictionResponse, RiskScoreResponse, CombinedPredictionResponse
+import metrics
+from encoder import ENCODER_ARTIFACT, FeatureEncoder
+from logging_setup import Sampler
+from fused import fuse_models
+from numpy_backend import NumpyModel
+from onnx_backend import OnnxModel
+from tflite_backend import TFLiteModel
+from registry import MODEL_NAMES, ModelRegistry, ModelVersion
+from schemas import (
+    ChurnPredictionResponse,
+    RiskScoreResponse,
+    CombinedPredictionResponse,
+    BatchPredictionResponse,
+)
 
 logger = logging.getLogger(__name__)
 
-# Rutas de los modelos
+# Log estructurado por predicción: nivel DEBUG y 1 de cada LOG_SAMPLE_RATE
+prediction_logger = logging.getLogger('predicciones')
+_prediction_sampler = Sampler(config.LOG_SAMPLE_RATE)
+
+# Rutas de los modelos: models/<modelo>/<version>/ o los archivos planos
+# models/model1.keras, models/model1.npz (ver registry.py)
 MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
-MODEL1_PATH = os.path.join(MODEL_DIR, 'model1.keras')
-MODEL2_PATH = os.path.join(MODEL_DIR, 'model2.keras')
+registry = ModelRegistry(MODEL_DIR)
 
-# Variables globales
-churn_model = None  # Modelo 1: Clasificación de Churn (Yes/No)
-risk_score_model = None  # Modelo 2: Score de riesgo (Bajo/Medio/Alto)
+# Umbral de clasificación del Modelo 1 y bins de riesgo del Modelo 2
+# (configurables con models/umbrales.json, ver config.load_thresholds)
+CHURN_THRESHOLD = config.CHURN_THRESHOLD
+RISK_BINS = config.RISK_BINS
+RISK_LEVELS = ('Bajo', 'Medio', 'Alto')
 
 
-def load_models():
+class ServingModels(NamedTuple):
     """
-    Carga los modelos de ML al iniciar la aplicación
+    Encoder y modelos que se sirven juntos. Se reemplaza entero, en una sola
+    asignación: una request toma una instancia al empezar y codifica y evalúa
+    con ella aunque en el medio se recargue un modelo.
+
+    generation es la del cache de predicciones al instalarla; las entradas
+    de otra generación no le sirven.
     """
-    global churn_model, risk_score_model
-#Valida si todos los mdelos fueron cargados correctamente
+    encoder: FeatureEncoder
+    model1: object  # Modelo 1: Clasificación de Churn (Yes/No)
+    model2: object  # Modelo 2: Score de riesgo (Bajo/Medio/Alto)
+    generation: int = 0
+
+    def get(self, name: str):
+        return self.model1 if name == 'model1' else self.model2
+
+
+_serving = ServingModels(config.LEGACY_ENCODER, None, None)
+
+# (modelo fusionado, modelo 1, modelo 2 con los que se armó); se descarta si
+# cualquiera de los dos modelos cambia
+_fused = None
+
+# Encoder de cada modelo activo: el de su versión o LEGACY_ENCODER si no trae
+# model.encoder.json (None si el modelo no está cargado)
+_encoders = {name: None for name in MODEL_NAMES}
+
+# Estado de carga de cada modelo: pendiente, cargando, listo, no_encontrado o error
+model_status = {
+    name: {'estado': 'pendiente', 'version': None, 'duracion_s': None, 'error': None}
+    for name in MODEL_NAMES
+}
+
+# Recargas en caliente en curso y (versión, modelo, encoder) anteriores de
+# cada modelo (para rollback)
+reload_status = {name: None for name in MODEL_NAMES}
+_previous_models = {}
+_swap_lock = threading.Lock()
+
+
+class ModelNotReadyError(ValueError):
+    """Los modelos todavía se están cargando"""
+
+
+class PredictionCache:
+    """
+    Cache LRU de probabilidades (churn, riesgo) por vector de features codificado.
+
+    La clave son los bytes de la fila float32 (el dict usa su hash), así que
+    dos clientes con la misma codificación comparten entrada. Se guardan las
+    salidas de ambos modelos para que /predict/both se sirva sin forward pass.
+
+    Args:
+        max_size: Máximo de entradas (0 desactiva el cache)
+        ttl_seconds: Vida de cada entrada en segundos (None = sin vencimiento)
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(row: np.ndarray) -> bytes:
+        return np.ascontiguousarray(row, dtype=np.float32).tobytes()
+
+    @property
+    def generation(self) -> int:
+        """Cambia con cada clear(); put() descarta valores de generaciones viejas"""
+        return self._generation
+
+    def get(self, key: bytes, churn: bool = True, risk: bool = True, generation: int = None):
+        """
+        Args:
+            generation: Generación de los modelos con que se codificó la fila;
+                si ya no es la actual, las entradas son de otros modelos
+
+        Returns:
+            (prob_churn, prob_riesgo) si están en cache las salidas pedidas, si no None
+        """
+        with self._lock:
+            entry = self._entries.get(key) if generation in (None, self._generation) else None
+            if entry is not None:
+                expires_at, churn_prob, risk_prob = entry
+                if expires_at is not None and expires_at < time.monotonic():
+                    del self._entries[key]
+                elif (not churn or churn_prob is not None) and (not risk or risk_prob is not None):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return churn_prob, risk_prob
+            self.misses += 1
+            return None
+
+    def put(self, key: bytes, churn_prob, risk_prob, generation: int = None):
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            # Resultado calculado con modelos que ya fueron reemplazados
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (expires_at, churn_prob, risk_prob)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entradas': len(self._entries),
+                'capacidad': self.max_size,
+                'ttl_segundos': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+prediction_cache = PredictionCache(config.CACHE_MAX_SIZE, config.CACHE_TTL_SECONDS)
+
+
+# Artefacto que carga cada backend (ver export_models.py)
+BACKEND_ARTIFACTS = {
+    'keras': '.keras',
+    'numpy': '.npz',
+    'onnx': '.onnx',
+    'tflite': '.tflite',
+}
+
+
+def _load_model(model_version: ModelVersion):
+    """
+    Carga un modelo con el backend configurado en config.INFERENCE_BACKEND.
+    Devuelve None si el archivo no existe.
+    """
+    backend = config.INFERENCE_BACKEND
+    if backend not in BACKEND_ARTIFACTS:
+        raise ValueError(f"Backend de inferencia no soportado: {backend}")
+
+    precision = config.MODEL_PRECISION
+    if precision not in config.PRECISION_SUFFIXES:
+        raise ValueError(f"Precisión no soportada: {precision}")
+    if precision != 'float32' and backend != 'tflite':
+        raise ValueError(f"La precisión {precision} solo está disponible con el backend tflite")
+
+    path = model_version.artifact(config.PRECISION_SUFFIXES[precision] + BACKEND_ARTIFACTS[backend])
+    if not os.path.exists(path):
+        logger.warning(f"Modelo ({backend}) no encontrado en: {path}")
+        return None
+
+    if backend == 'numpy':
+        return NumpyModel.load(path)
+    if backend == 'onnx':
+        return OnnxModel.load(path, config.INFERENCE_THREADS)
+    if backend == 'tflite':
+        return TFLiteModel.load(path, config.INFERENCE_THREADS)
+
+    # TensorFlow solo se importa si realmente se usa
+    import tensorflow as tf
+    return tf.keras.models.load_model(path)
+
+
+def _load_encoder(model_version: ModelVersion) -> FeatureEncoder:
+    """
+    Encoder con el que se entrenó una versión (ver encoder.py). Si la versión
+    no lo trae se asume el histórico (config.LEGACY_ENCODER), nunca el del
+    otro modelo.
+
+    Raises:
+        ValueError: Si el encoder no es compatible con la API
+    """
+    path = model_version.artifact(ENCODER_ARTIFACT)
+    if not os.path.exists(path):
+        logger.warning(f"{model_version.name} {model_version.version}: sin {os.path.basename(path)}, "
+                       f"se usa el encoder histórico de config.py")
+        return config.LEGACY_ENCODER
+    encoder = FeatureEncoder.load(path)
+    config.check_encoder(encoder)
+    return encoder
+
+
+def _resolve_encoder(encoders: dict) -> FeatureEncoder:
+    """
+    Encoder a servir: ambos modelos reciben la misma fila codificada, así
+    que sus encoders tienen que ser iguales
+
+    Args:
+        encoders: Encoder de cada modelo cargado (None si no está cargado)
+
+    Raises:
+        ValueError: Si los modelos se entrenaron con encoders distintos
+    """
+    available = [encoder for encoder in encoders.values() if encoder is not None]
+    if not available:
+        return config.LEGACY_ENCODER
+    if any(encoder != available[0] for encoder in available[1:]):
+        raise ValueError("Los modelos se entrenaron con encoders distintos (model.encoder.json)")
+    return available[0]
+
+
+def _load_and_track(name: str) -> tuple:
+    """
+    Carga la versión más nueva de un modelo (y su encoder) registrando su
+    estado y duración en model_status
+
+    Returns:
+        (modelo, encoder)
+    """
+    status = model_status[name]
+    status.update(estado='cargando', version=None, duracion_s=None, error=None)
+    start = time.perf_counter()
     try:
-        logger.info("Iniciando carga de modelos...")
+        model_version = registry.resolve(name)
+        status['version'] = model_version.version
+        model = _load_model(model_version)
+        encoder = _load_encoder(model_version) if model is not None else None
+    except Exception as e:
+        status.update(estado='error', error=str(e))
+        raise
+    finally:
+        status['duracion_s'] = round(time.perf_counter() - start, 3)
 
-        # Cargar Modelo 1
-        if os.path.exists(MODEL1_PATH):
-            churn_model = tf.keras.models.load_model(MODEL1_PATH)
-            logger.info(f"Modelo 1 (Churn) cargado exitosamente")
-            logger.info(f"Input shape esperado: {churn_model.input_shape}")
-        else:
-            logger.warning(f"Modelo 1 no encontrado en: {MODEL1_PATH}")
+    status['estado'] = 'listo' if model is not None else 'no_encontrado'
+    return model, encoder
 
-        # Cargar Modelo 2
-        if os.path.exists(MODEL2_PATH):
-            risk_score_model = tf.keras.models.load_model(MODEL2_PATH)
-            logger.info(f"Modelo 2 (Risk Score) cargado exitosamente")
-            logger.info(f"Input shape esperado: {risk_score_model.input_shape}")
-        else:
-            logger.warning(f"Modelo 2 no encontrado en: {MODEL2_PATH}")
 
-        if churn_model and risk_score_model:
+def load_models():
+    """
+    Carga los modelos de ML al iniciar la aplicación (ambos en paralelo)
+    """
+#Valida si todos los mdelos fueron cargados correctamente
+    try:
+        logger.info(f"Iniciando carga de modelos (backend: {config.INFERENCE_BACKEND})...")
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='carga-modelo') as executor:
+            churn_future = executor.submit(_load_and_track, 'model1')
+            risk_future = executor.submit(_load_and_track, 'model2')
+
+        (model1, encoder1), (model2, encoder2) = churn_future.result(), risk_future.result()
+        try:
+            encoder = _resolve_encoder({'model1': encoder1, 'model2': encoder2})
+        except ValueError as e:
+            for status in model_status.values():
+                status.update(estado='error', error=str(e))
+            raise
+
+        with _swap_lock:
+            _encoders.update(model1=encoder1, model2=encoder2)
+            _install(encoder, model1, model2)
+            _previous_models.clear()
+
+        # Modelo 1
+        if model1 is not None:
+            logger.info(f"Modelo 1 (Churn) cargado exitosamente en {model_status['model1']['duracion_s']}s")
+            logger.info(f"Input shape esperado: {model1.input_shape}")
+
+        # Modelo 2
+        if model2 is not None:
+            logger.info(f"Modelo 2 (Risk Score) cargado exitosamente en {model_status['model2']['duracion_s']}s")
+            logger.info(f"Input shape esperado: {model2.input_shape}")
+
+        if model1 and model2:
             logger.info("Todos los modelos cargados correctamente")
         else:
             logger.warning("Algunos modelos no están disponibles")
 
+        _refresh_fused()
+
     except Exception as e:
         logger.error(f"Error al cargar modelos: {str(e)}")
         raise
 
 
-def get_churn_prediction(customer_data: dict) -> ChurnPredictionResponse:
+def load_models_in_background() -> threading.Thread:
     """
-    Predicion churn
+    Lanza load_models en un thread para que la API acepte tráfico de inmediato.
+    El progreso se consulta en model_status / is_ready().
     """
-    if churn_model is None:
-        raise ValueError("Modelo 1 (Churn) no está disponible")
+    def run():
+        try:
+            load_models()
+        except Exception:
+            pass  # ya queda registrado en el log y en model_status
+
+    thread = threading.Thread(target=run, name='carga-modelos', daemon=True)
+    thread.start()
+    return thread
+
+
+def serving() -> ServingModels:
+    """Encoder y modelos activos, para codificar y evaluar una request con los mismos"""
+    return _serving
+
+
+def get_model(name: str):
+    """Modelo activo por nombre ('model1' o 'model2')"""
+    return _serving.get(name)
+
+
+def _install(encoder: FeatureEncoder, model1, model2):
+    """
+    Pone en servicio encoder y modelos en una sola asignación (con
+    _swap_lock tomado). El cache se invalida porque sus valores son de los
+    modelos anteriores; config.encoder acompaña para los usos fuera de una
+    request (scoring masivo, dashboard).
+    """
+    global _serving
+    config.check_encoder(encoder)
+    prediction_cache.clear()
+    _serving = ServingModels(encoder, model1, model2, prediction_cache.generation)
+    config.set_encoder(encoder)
+
+
+def _swap_models(updates: dict):
+    """
+    Reemplaza uno o ambos modelos activos junto con sus encoders, en una sola
+    asignación. Las requests en curso terminan con el encoder y los modelos
+    que ya tenían (ServingModels) y las nuevas usan los nuevos.
+
+    Args:
+        updates: {nombre: (modelo, versión, encoder)}
+
+    Raises:
+        ValueError: Si los encoders de los modelos resultantes no coinciden
+    """
+    with _swap_lock:
+        current = _serving
+        encoders = {**_encoders, **{name: encoder for name, (_, _, encoder) in updates.items()}}
+        resolved = _resolve_encoder(encoders)
+        models = {name: current.get(name) for name in MODEL_NAMES}
+        for name, (model, _, _) in updates.items():
+            _previous_models[name] = (model_status[name]['version'], models[name], _encoders[name])
+            models[name] = model
+        _encoders.update(encoders)
+        _install(resolved, models['model1'], models['model2'])
+        for name, (_, version, _) in updates.items():
+            model_status[name].update(estado='listo', version=version)
+
+    _refresh_fused()
+
+
+def _refresh_fused():
+    """
+    Arma (y calienta) el modelo fusionado con los modelos activos, si el
+    backend lo permite y config.FUSED_MODELS está habilitado
+    """
+    global _fused
+    model1, model2 = _serving.model1, _serving.model2
+    if not config.FUSED_MODELS or model1 is None or model2 is None:
+        _fused = None
+        return
 
     try:
-        # Transformar datos del CSV a features numéricas
-        features = config.transform_to_features(customer_data)
+        fused = fuse_models(model1, model2)
+    except ValueError as e:
+        logger.warning(f"No se pudieron fusionar los modelos: {str(e)}")
+        fused = None
 
-        # Convertir a numpy array con shape correcto
-        input_data = np.array(features).reshape(1, -1)
+    if fused is not None:
+        warm_up(fused)
+        logger.info("Modelo fusionado listo para predicciones combinadas")
+    _fused = (fused, model1, model2) if fused is not None else None
 
-        logger.info(f"Input shape: {input_data.shape}, Features: {len(features)}")
 
-        # Predicción con el modelo
-        probability = float(churn_model.predict(input_data, verbose=0)[0][0])
+def warm_up(model, batch_sizes: tuple = (1, 32, 256)):
+    """
+    Ejecuta algunos lotes de clientes sintéticos para que la primera request
+    real no pague la inicialización (trazado del grafo en Keras, caches, etc.)
+    """
+    for n_rows in batch_sizes:
+        model.predict_on_batch(config.transform_to_feature_matrix(config.sample_customers(n_rows, seed=n_rows)))
 
-        # Clasificación binaria (threshold 0.5)
-        prediction_class = int(probability > 0.5)
-        churn_label = "Yes" if prediction_class == 1 else "No"
 
-        #mostrar resultados redondeados en 4 decimales
-        logger.info(f"Modelo 1 - Churn: {churn_label} (prob: {probability:.4f})")
+def reload_models(versions: dict) -> dict:
+    """
+    Carga una versión de uno o ambos modelos, los calienta y los pone en
+    servicio juntos. El modelo actual sigue atendiendo tráfico hasta el
+    momento del swap.
+
+    Recargar ambos a la vez es la forma de poner en servicio modelos
+    reentrenados: el encoder cambia con cada entrenamiento, así que una
+    versión nueva de un solo modelo no coincide con el encoder del otro.
 
-        return ChurnPredictionResponse(
-            prediction=prediction_class,
-            probability=round(probability, 4),
-            churn=churn_label,
-            mensaje=f"Cliente {'con riesgo de' if churn_label == 'Yes' else 'sin riesgo de'} churn"
-        )
+    Args:
+        versions: {nombre: versión}; None = la más nueva
 
+    Returns:
+        {nombre: versión que quedó activa}
+    """
+    model_versions = {name: registry.resolve(name, version) for name, version in versions.items()}
+    for name, model_version in model_versions.items():
+        reload_status[name] = {'estado': 'cargando', 'version': model_version.version, 'error': None}
+    start = time.perf_counter()
+    try:
+        updates = {}
+        for name, model_version in model_versions.items():
+            model = _load_model(model_version)
+            if model is None:
+                raise FileNotFoundError(f"No hay artefactos de {name} {model_version.version} para el backend {config.INFERENCE_BACKEND}")
+            encoder = _load_encoder(model_version)
+            warm_up(model)
+            updates[name] = (model, model_version.version, encoder)
+        _swap_models(updates)
     except Exception as e:
-        logger.error(f"Error en predicción de churn: {str(e)}")
+        for name, model_version in model_versions.items():
+            reload_status[name].update(estado='error', error=str(e))
+            logger.error(f"Error al recargar {name} {model_version.version}: {str(e)}")
         raise
 
+    duration = round(time.perf_counter() - start, 3)
+    for name, model_version in model_versions.items():
+        reload_status[name].update(estado='listo', duracion_s=duration)
+        logger.info(f"{name} actualizado a la versión {model_version.version} en {duration}s")
+    return {name: model_version.version for name, model_version in model_versions.items()}
+
+
+def reload_model(name: str, version: str = None) -> str:
+    """
+    Recarga un solo modelo (ver reload_models)
+
+    Returns:
+        Versión que quedó activa
+    """
+    return reload_models({name: version})[name]
+
+
+def reload_models_in_background(versions: dict) -> dict:
+    """
+    Igual que reload_models pero en un thread; valida las versiones antes de lanzarlo
+
+    Returns:
+        {nombre: versión que se está cargando}
+
+    Raises:
+        ValueError: Si una versión no existe o ya hay una recarga en curso
+    """
+    resolved = {name: registry.resolve(name, version).version for name, version in versions.items()}
+    with _swap_lock:
+        for name in resolved:
+            current = reload_status[name]
+            if current is not None and current['estado'] == 'cargando':
+                raise ValueError(f"Ya hay una recarga de {name} en curso ({current['version']})")
+        for name, version in resolved.items():
+            reload_status[name] = {'estado': 'cargando', 'version': version, 'error': None}
+
+    def run():
+        try:
+            reload_models(resolved)
+        except Exception:
+            pass  # ya queda registrado en el log y en reload_status
+
+    threading.Thread(target=run, name=f"recarga-{'-'.join(resolved)}", daemon=True).start()
+    return resolved
+
+
+def reload_model_in_background(name: str, version: str = None) -> str:
+    """
+    Recarga un solo modelo en un thread (ver reload_models_in_background)
+
+    Returns:
+        Versión que se está cargando
+    """
+    return reload_models_in_background({name: version})[name]
+
+
+def rollback_models(names: tuple = MODEL_NAMES) -> dict:
+    """
+    Vuelve de inmediato a la versión anterior (que sigue en memoria) de los
+    modelos indicados, juntos
+
+    Returns:
+        {nombre: versión que quedó activa}
+    """
+    missing = [name for name in names if name not in _previous_models]
+    if missing:
+        raise ValueError(f"No hay una versión anterior de {', '.join(missing)} para volver")
+
+    updates = {}
+    for name in names:
+        version, model, encoder = _previous_models[name]
+        updates[name] = (model, version, encoder)
+    _swap_models(updates)
+    for name, (_, version, _) in updates.items():
+        logger.info(f"{name} revertido a la versión {version}")
+    return {name: version for name, (_, version, _) in updates.items()}
 
-def get_risk_score_prediction(customer_data: dict) -> RiskScoreResponse:
+
+def rollback_model(name: str) -> str:
+    """
+    Vuelve a la versión anterior de un solo modelo (ver rollback_models)
+
+    Returns:
+        Versión que quedó activa
+    """
+    return rollback_models((name,))[name]
+
+
+def models_info() -> dict:
+    """Versiones disponibles, activa y anterior de cada modelo"""
+    return {
+        name: {
+            'activa': model_status[name]['version'],
+            'anterior': _previous_models[name][0] if name in _previous_models else None,
+            'disponibles': registry.list_versions(name),
+            'recarga': reload_status[name],
+        }
+        for name in MODEL_NAMES
+    }
+
+
+def active_versions() -> dict:
+    """{(modelo, version): 1} de los modelos cargados, para /metrics"""
+    return {
+        (name, status['version']): 1
+        for name, status in model_status.items()
+        if status['version'] is not None
+    }
+
+
+metrics.register_model_versions(active_versions)
+
+
+def is_ready() -> bool:
+    """True cuando ambos modelos están cargados"""
+    return all(status['estado'] == 'listo' for status in model_status.values())
+
+
+def check_models(churn: bool = True, risk: bool = True, models: ServingModels = None):
     """
-    Predicion el nivel de riesgo
+    Valida que los modelos solicitados estén cargados
     """
-    if risk_score_model is None:
+    models = models or _serving
+    for name, requested, model in (('model1', churn, models.model1), ('model2', risk, models.model2)):
+        if requested and model is None and model_status[name]['estado'] in ('pendiente', 'cargando'):
+            raise ModelNotReadyError("Los modelos se están cargando, reintente en unos segundos")
+
+    if churn and models.model1 is None:
+        raise ValueError("Modelo 1 (Churn) no está disponible")
+    if risk and models.model2 is None:
         raise ValueError("Modelo 2 (Risk Score) no está disponible")
 
-    try:
-        # Transformar datos del CSV a features numéricas
-        features = config.transform_to_features(customer_data)
 
-        # Convertir a numpy array
-        input_data = np.array(features).reshape(1, -1)
+def predict_probabilities(input_data: np.ndarray, churn: bool = True, risk: bool = True,
+                          models: ServingModels = None) -> tuple:
+    """
+    Forward pass de un lote ya codificado (N, 35), con UNA llamada por modelo
+
+    Args:
+        models: Modelos con cuyo encoder se codificó el lote (default: los activos)
 
-        # Predicción de probabilidad
-        probabilidad_churn = float(risk_score_model.predict(input_data, verbose=0)[0][0])
+    Returns:
+        (probs_churn, probs_riesgo) como arrays (N,); None para el modelo no solicitado
+    """
+    models = models or _serving
+    check_models(churn, risk, models)
 
-        # Determinar nivel de riesgo según bins
-        if probabilidad_churn < 0.33:
-            nivel_riesgo = "Bajo"
-        elif probabilidad_churn < 0.66:
-            nivel_riesgo = "Medio"
-        else:
-            nivel_riesgo = "Alto"
+    # Ambos modelos en una sola llamada, si el fusionado corresponde a estos modelos
+    fused = _fused
+    if churn and risk and fused is not None and fused[1] is models.model1 and fused[2] is models.model2:
+        with metrics.STAGE_DURATION.time(etapa='fusionado'):
+            probs = np.asarray(fused[0].predict_on_batch(input_data))
+        return probs[:, 0], probs[:, 1]
 
-        logger.info(f"Modelo 2 - Risk: {nivel_riesgo} (prob: {probabilidad_churn:.4f})")
+    # predict_on_batch evita que Keras parta el lote en pasos de 32 filas
+    churn_probs = risk_probs = None
+    if churn:
+        with metrics.STAGE_DURATION.time(etapa='model1'):
+            churn_probs = np.asarray(models.model1.predict_on_batch(input_data)).reshape(-1)
+    if risk:
+        with metrics.STAGE_DURATION.time(etapa='model2'):
+            risk_probs = np.asarray(models.model2.predict_on_batch(input_data)).reshape(-1)
 
-        return RiskScoreResponse(
-            probabilidad_churn=round(probabilidad_churn, 4),
-            nivel_riesgo=nivel_riesgo,
-            mensaje=f"Cliente con riesgo {nivel_riesgo.lower()} de churn"
-        )
+    return churn_probs, risk_probs
 
-    except Exception as e:
-        logger.error(f"Error en predicción de risk score: {str(e)}")
-        raise
 
+def models_to_run(churn: bool = True, risk: bool = True, models: ServingModels = None) -> tuple:
+    """
+    Ante un miss del cache se ejecutan todos los modelos cargados, no solo
+    los pedidos, para que la entrada sirva a cualquier endpoint
+    """
+    models = models or _serving
+    return churn or models.model1 is not None, risk or models.model2 is not None
 
-def get_combined_prediction(customer_data: dict) -> CombinedPredictionResponse:
+
+def predict_single(row: np.ndarray, churn: bool = True, risk: bool = True, models: ServingModels = None) -> tuple:
     """
-    Prediccion con los 2 modelos
+    Probabilidades de un cliente ya codificado (35,), pasando por el cache
+
+    Args:
+        models: Modelos con cuyo encoder se codificó la fila (default: los activos)
+
+    Returns:
+        (prob_churn, prob_riesgo); None para el modelo no solicitado
     """
-    if churn_model is None or risk_score_model is None:
-        raise ValueError("Uno o más modelos no están disponibles")
+    models = models or _serving
+    check_models(churn, risk, models)
 
-    try:
-        # Transformar datos UNA SOLA VEZ
-        features = config.transform_to_features(customer_data)
-        input_data = np.array(features).reshape(1, -1)
+    key = prediction_cache.key(row)
+    cached = prediction_cache.get(key, churn, risk, models.generation)
+    if cached is not None:
+        return cached
 
-        logger.info(f"📊 Ejecutando ambos modelos...")
+    run_churn, run_risk = models_to_run(churn, risk, models)
+    churn_probs, risk_probs = predict_probabilities(row.reshape(1, -1), run_churn, run_risk, models)
 
-        # ===== MODELO 1: Predicción de Churn =====
-        churn_prob = float(churn_model.predict(input_data, verbose=0)[0][0])
-        churn_class = int(churn_prob > 0.5)
-        churn_label = "Yes" if churn_class == 1 else "No"
+    churn_prob = float(churn_probs[0]) if run_churn else None
+    risk_prob = float(risk_probs[0]) if run_risk else None
+    prediction_cache.put(key, churn_prob, risk_prob, models.generation)
 
-        # ===== MODELO 2: Score de Riesgo =====
-        risk_prob = float(risk_score_model.predict(input_data, verbose=0)[0][0])
+    return churn_prob, risk_prob
 
-        if risk_prob < 0.33:
-            nivel_riesgo = "Bajo"
-        elif risk_prob < 0.66:
-            nivel_riesgo = "Medio"
-        else:
-            nivel_riesgo = "Alto"
-
-        logger.info(
-            f"Combinado - Churn: {churn_label} ({churn_prob:.4f}) | "
-            f"Risk: {nivel_riesgo} ({risk_prob:.4f})"
-        )
-
-        return CombinedPredictionResponse(
-            churn=ChurnPredictionResponse(
-                prediction=churn_class,
-                probability=round(churn_prob, 4),
-                churn=churn_label,
-                mensaje=f"Cliente {'con riesgo de' if churn_label == 'Yes' else 'sin riesgo de'} churn"
-            ),
-            risk_score=RiskScoreResponse(
-                probabilidad_churn=round(risk_prob, 4),
-                nivel_riesgo=nivel_riesgo,
-                mensaje=f"Cliente con riesgo {nivel_riesgo.lower()} de churn"
+
+def log_prediction(origen: str, prob_churn: float = None, prob_riesgo: float = None, filas: int = 1):
+    """
+    Registra una predicción (muestreada) con sus campos estructurados.
+    No arma el registro si DEBUG está deshabilitado o la muestra lo descarta
+    """
+    if not prediction_logger.isEnabledFor(logging.DEBUG) or not _prediction_sampler():
+        return
+    prediction_logger.debug("Predicción %s", origen, extra={'campos': {
+        'origen': origen,
+        'filas': filas,
+        'prob_churn': prob_churn,
+        'prob_riesgo': prob_riesgo,
+        'muestreo': _prediction_sampler.rate,
+    }})
+
+
+def churn_labels(probs: np.ndarray) -> np.ndarray:
+    """Etiquetas 'Yes'/'No' del Modelo 1 para un array de probabilidades"""
+    return np.where(np.asarray(probs) > CHURN_THRESHOLD, 'Yes', 'No')
+
+
+def risk_levels(probs: np.ndarray) -> np.ndarray:
+    """Niveles 'Bajo'/'Medio'/'Alto' del Modelo 2 para un array de probabilidades"""
+    return np.asarray(RISK_LEVELS)[np.searchsorted(RISK_BINS, probs, side='right')]
+
+
+def build_churn_response(probability: float) -> ChurnPredictionResponse:
+    """
+    Construye la respuesta del Modelo 1 a partir de la probabilidad
+    """
+    # Clasificación binaria (prob > CHURN_THRESHOLD)
+    prediction_class = int(probability > CHURN_THRESHOLD)
+    churn_label = "Yes" if prediction_class == 1 else "No"
+    metrics.CHURN_PREDICTIONS.inc(churn=churn_label)
+
+    return ChurnPredictionResponse(
+        prediction=prediction_class,
+        probability=round(probability, 4),
+        churn=churn_label,
+        mensaje=f"Cliente {'con riesgo de' if churn_label == 'Yes' else 'sin riesgo de'} churn"
+    )
+
+
+def build_risk_response(probabilidad_churn: float) -> RiskScoreResponse:
+    """
+    Construye la respuesta del Modelo 2 a partir de la probabilidad
+    """
+    # Determinar nivel de riesgo según bins
+    if probabilidad_churn < RISK_BINS[0]:
+        nivel_riesgo = RISK_LEVELS[0]
+    elif probabilidad_churn < RISK_BINS[1]:
+        nivel_riesgo = RISK_LEVELS[1]
+    else:
+        nivel_riesgo = RISK_LEVELS[2]
+    metrics.RISK_PREDICTIONS.inc(nivel_riesgo=nivel_riesgo)
+
+    return RiskScoreResponse(
+        probabilidad_churn=round(probabilidad_churn, 4),
+        nivel_riesgo=nivel_riesgo,
+        mensaje=f"Cliente con riesgo {nivel_riesgo.lower()} de churn"
+    )
+
+
+def predict_batch(input_data: np.ndarray, models: ServingModels = None) -> BatchPredictionResponse:
+    """
+    Prediccion con los 2 modelos para un lote ya codificado (N, 35)
+
+    Args:
+        models: Modelos con cuyo encoder se codificó el lote (default: los activos)
+    """
+    models = models or _serving
+    check_models(models=models)
+
+    try:
+        churn_probs, risk_probs = predict_probabilities(input_data, models=models)
+        log_prediction('batch', filas=input_data.shape[0])
+
+        resultados = [
+            CombinedPredictionResponse(
+                churn=build_churn_response(float(churn_prob)),
+                risk_score=build_risk_response(float(risk_prob))
             )
-        )
+            for churn_prob, risk_prob in zip(churn_probs, risk_probs)
+        ]
+
+        return BatchPredictionResponse(total=len(resultados), resultados=resultados)
 
     except Exception as e:
-        logger.error(f"Error en predicción combinada: {str(e)}")
-        raise
\ No newline at end of file
+        logger.error("Error en predicción por lotes: %s", e)
+        raise
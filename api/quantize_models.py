@@ -0,0 +1,222 @@
+"""
+Variantes cuantizadas (float16 e int8) de los modelos para TFLite
+
+- float16: pesos en float16, la mitad del tamaño, cómputo en float32
+- int8: cuantización post-entrenamiento completa (pesos y activaciones),
+  calibrada con data/processed/train-Modelo-1.csv; entrada y salida siguen en
+  float32 para que el resto de la API no cambie
+
+Para cada variante se reporta, contra el modelo Keras en float32 y sobre
+data/processed/test-Modelo-1.csv: AUC, recall, precision, etiquetas que
+cambian (churn Yes/No o nivel de riesgo), latencia, tamaño del artefacto y
+memoria del intérprete (tensores de pesos y activaciones con una fila y con
+un lote). El reporte se guarda en JSON junto a los artefactos.
+
+Los artefactos (model.fp16.tflite, model.int8.tflite) se sirven con
+CHURN_INFERENCE_BACKEND=tflite y CHURN_MODEL_PRECISION=float16|int8.
+
+Ejecutar desde api/: python quantize_models.py [--modelos model2] [--version v2]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import config
+import predict
+from export_models import PARITY_FILE, PROCESSED_DIR, export_tflite, load_processed_features
+from registry import MODEL_NAMES
+from tflite_backend import TFLiteModel
+
+# Ambos modelos comparten el split y las features de preprocesar(); el
+# train-Modelo-2.csv del notebook contiene en realidad el set de test
+CALIBRATION_FILE = 'train-Modelo-1.csv'
+CALIBRATION_SAMPLES = 1000
+
+VARIANTS = ('float32', 'float16', 'int8')
+LATENCY_CALLS = 500
+THROUGHPUT_BATCH = 1024
+
+
+def load_processed_labels(filename: str):
+    """Columna Churn de un CSV de data/processed como 0/1"""
+    path = os.path.join(PROCESSED_DIR, filename)
+    if not os.path.exists(path):
+        return None
+
+    import pandas as pd
+    labels = pd.read_csv(path, usecols=['Churn'])['Churn']
+    # preprocesar() ya la guarda como 0/1; se aceptan también 'Yes'/'No'
+    if labels.dtype == object:
+        labels = labels.map({'No': 0, 'Yes': 1})
+    return labels.to_numpy(dtype=np.int8)
+
+
+def convert(keras_model, variant: str, path: str, calibration: np.ndarray) -> TFLiteModel:
+    """
+    Convierte el modelo a TFLite con la precisión pedida y lo guarda en path
+    """
+    if variant == 'float32':
+        return export_tflite(keras_model, path)
+
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        def representative_dataset():
+            for row in calibration:
+                yield [row.reshape(1, -1)]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    return TFLiteModel.load(path)
+
+
+def labels_for(name: str, probs: np.ndarray) -> np.ndarray:
+    """Etiquetas que devuelve la API para cada modelo"""
+    return predict.churn_labels(probs) if name == 'model1' else predict.risk_levels(probs)
+
+
+def classification_metrics(y_true, probs: np.ndarray) -> dict:
+    from sklearn.metrics import precision_score, recall_score, roc_auc_score
+
+    y_pred = (probs > predict.CHURN_THRESHOLD).astype(np.int8)
+    return {
+        'auc': round(float(roc_auc_score(y_true, probs)), 5),
+        'recall': round(float(recall_score(y_true, y_pred, zero_division=0)), 5),
+        'precision': round(float(precision_score(y_true, y_pred, zero_division=0)), 5),
+    }
+
+
+def measure_latency(model, input_data: np.ndarray) -> dict:
+    """p50 de una fila y throughput en lotes de THROUGHPUT_BATCH filas"""
+    row = input_data[:1]
+    for _ in range(20):
+        model.predict_on_batch(row)
+
+    latencies = []
+    for _ in range(LATENCY_CALLS):
+        start = time.perf_counter()
+        model.predict_on_batch(row)
+        latencies.append(time.perf_counter() - start)
+
+    batch = np.resize(input_data, (THROUGHPUT_BATCH, input_data.shape[1]))
+    model.predict_on_batch(batch)
+    start = time.perf_counter()
+    for _ in range(20):
+        model.predict_on_batch(batch)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'latencia_p50_ms': round(1000 * float(np.median(latencies)), 4),
+        'filas_s': round(20 * THROUGHPUT_BATCH / elapsed, 1),
+    }
+
+
+def measure_memory(model: TFLiteModel) -> dict:
+    """KB de tensores del intérprete con una fila y con THROUGHPUT_BATCH filas"""
+    return {
+        'memoria_fila_kb': round(model.tensor_bytes(1) / 1024, 1),
+        'memoria_lote_kb': round(model.tensor_bytes(THROUGHPUT_BATCH) / 1024, 1),
+    }
+
+
+def quantize_model(name: str, version: str = None) -> dict:
+    """
+    Genera las variantes de un modelo y devuelve el reporte
+    """
+    import tensorflow as tf
+
+    model_version = predict.registry.resolve(name, version)
+    keras_path = model_version.artifact('.keras')
+    if not os.path.exists(keras_path):
+        raise FileNotFoundError(f"{name}: no encontrado en {keras_path}")
+
+    test_data = load_processed_features(PARITY_FILE)
+    y_test = load_processed_labels(PARITY_FILE)
+    calibration = load_processed_features(CALIBRATION_FILE)
+    if test_data is None or y_test is None or calibration is None:
+        raise FileNotFoundError(
+            f"Se necesitan {PARITY_FILE} y {CALIBRATION_FILE} en data/processed "
+            f"(se generan con los notebooks de entrenamiento)"
+        )
+    rng = np.random.default_rng(7)
+    calibration = calibration[rng.permutation(len(calibration))[:CALIBRATION_SAMPLES]]
+
+    keras_model = tf.keras.models.load_model(keras_path)
+    baseline = np.asarray(keras_model.predict_on_batch(test_data)).reshape(-1)
+    baseline_labels = labels_for(name, baseline)
+
+    report = {
+        'modelo': name,
+        'version': model_version.version,
+        'test': PARITY_FILE,
+        'calibracion': CALIBRATION_FILE,
+        'keras_float32': {
+            **classification_metrics(y_test, baseline),
+            'tamaño_kb': round(os.path.getsize(keras_path) / 1024, 1),
+        },
+        'variantes': {},
+    }
+
+    for variant in VARIANTS:
+        path = model_version.artifact(config.PRECISION_SUFFIXES[variant] + '.tflite')
+        model = convert(keras_model, variant, path, calibration)
+        probs = model.predict_on_batch(test_data).reshape(-1)
+
+        metrics = classification_metrics(y_test, probs)
+        report['variantes'][variant] = {
+            'artefacto': os.path.basename(path),
+            **metrics,
+            'delta_auc': round(metrics['auc'] - report['keras_float32']['auc'], 5),
+            'diferencia_max_prob': round(float(np.max(np.abs(probs - baseline))), 6),
+            'etiquetas_cambiadas': int(np.sum(labels_for(name, probs) != baseline_labels)),
+            'tamaño_kb': round(os.path.getsize(path) / 1024, 1),
+            **measure_latency(model, test_data),
+            **measure_memory(model),
+        }
+
+    with open(model_version.artifact('.cuantizacion.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def print_report(report: dict):
+    print(f"\n{report['modelo']} ({report['version']}) - Keras float32: AUC {report['keras_float32']['auc']:.4f}")
+    print(f"{'variante':<10} {'AUC':>8} {'ΔAUC':>9} {'recall':>8} {'precision':>10} "
+          f"{'etiq. cambiadas':>16} {'p50 ms':>8} {'filas/s':>12} {'KB':>8} {'mem. fila KB':>13} {'mem. lote KB':>13}")
+    for variant, r in report['variantes'].items():
+        print(f"{variant:<10} {r['auc']:>8.4f} {r['delta_auc']:>+9.5f} {r['recall']:>8.4f} {r['precision']:>10.4f} "
+              f"{r['etiquetas_cambiadas']:>16} {r['latencia_p50_ms']:>8.3f} {r['filas_s']:>12,.0f} {r['tamaño_kb']:>8.1f} "
+              f"{r['memoria_fila_kb']:>13.1f} {r['memoria_lote_kb']:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera variantes float16/int8 de los modelos y compara su precisión")
+    parser.add_argument('--modelos', nargs='+', choices=MODEL_NAMES, default=list(MODEL_NAMES))
+    parser.add_argument('--version', default=None, help="Versión a cuantizar (default: la más nueva)")
+    args = parser.parse_args()
+
+    ok = True
+    for name in args.modelos:
+        try:
+            print_report(quantize_model(name, args.version))
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            ok = False
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
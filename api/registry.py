@@ -0,0 +1,92 @@
+"""
+Registro versionado de modelos
+
+Estructura en disco:
+
+    models/
+    ├── model1/
+    │   ├── v1/model.keras, model.npz, ...
+    │   └── v2/model.keras, model.npz, ...
+    └── model2/
+        └── v1/...
+
+Si un modelo no tiene carpeta versionada se usan los archivos planos
+históricos (models/model1.keras, models/model1.npz) como versión 'base'.
+"""
+
+import os
+import re
+
+MODEL_NAMES = ('model1', 'model2')
+LEGACY_VERSION = 'base'
+
+
+def _natural_key(version: str) -> list:
+    """Ordena 'v2' antes que 'v10'"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', version)]
+
+
+class ModelVersion:
+    """
+    Una versión concreta de un modelo y sus artefactos en disco
+    """
+
+    def __init__(self, name: str, version: str, directory: str, legacy: bool = False):
+        self.name = name
+        self.version = version
+        self.directory = directory
+        self.legacy = legacy
+
+    def artifact(self, extension: str) -> str:
+        """
+        Ruta de un artefacto de esta versión, p. ej. artifact('.npz')
+        -> models/model1/v2/model.npz (o models/model1.npz en la versión base)
+        """
+        filename = f'{self.name}{extension}' if self.legacy else f'model{extension}'
+        return os.path.join(self.directory, filename)
+
+    def __repr__(self):
+        return f"ModelVersion({self.name!r}, {self.version!r})"
+
+
+class ModelRegistry:
+    """
+    Resuelve las versiones disponibles de cada modelo en model_dir
+    """
+
+    def __init__(self, model_dir: str):
+        self.model_dir = model_dir
+
+    def _check_name(self, name: str):
+        if name not in MODEL_NAMES:
+            raise ValueError(f"Modelo desconocido: {name}")
+
+    def list_versions(self, name: str) -> list:
+        """Versiones disponibles, de la más vieja a la más nueva"""
+        self._check_name(name)
+        versions_dir = os.path.join(self.model_dir, name)
+        if not os.path.isdir(versions_dir):
+            return [LEGACY_VERSION]
+
+        versions = [
+            entry for entry in os.listdir(versions_dir)
+            if os.path.isdir(os.path.join(versions_dir, entry))
+        ]
+        return sorted(versions, key=_natural_key) or [LEGACY_VERSION]
+
+    def resolve(self, name: str, version: str = None) -> ModelVersion:
+        """
+        Devuelve la versión pedida (o la más nueva si version es None)
+
+        Raises:
+            ValueError: Si el modelo o la versión no existen
+        """
+        versions = self.list_versions(name)
+        if version is None:
+            version = versions[-1]
+        elif version not in versions:
+            raise ValueError(f"Versión '{version}' de {name} no encontrada. Disponibles: {versions}")
+
+        if version == LEGACY_VERSION:
+            return ModelVersion(name, version, self.model_dir, legacy=True)
+        return ModelVersion(name, version, os.path.join(self.model_dir, name, version))
@@ -0,0 +1,189 @@
+"""
+Optimización de umbrales por ganancia esperada (ROI de retención)
+
+Modelo de negocio del notebook "Comparacion_modelos y ROI": a cada cliente
+contactado se le ofrece una retención con costo fijo; si era un churner y la
+oferta funciona, se conserva su LTV.
+
+    ganancia(umbral) = churners_contactados * LTV * tasa_exito
+                       - contactados * costo
+
+Con las probabilidades ordenadas, contactados y churners_contactados de
+TODOS los umbrales salen de una suma acumulada (thresholds.cumulative_counts),
+así que la curva completa cuesta O(N log N) y el óptimo es un argmax.
+
+Si no hay etiquetas reales, los churners esperados se estiman con las mismas
+probabilidades (asume un modelo calibrado).
+
+Los niveles de riesgo se derivan de dos acciones con distinto costo:
+'Alto' es el tramo donde conviene la oferta de retención y 'Medio' donde
+solo conviene un seguimiento barato (llamada, email).
+
+Los umbrales devueltos siguen la convención del serving (prob > umbral es
+positivo) y caen a mitad de camino entre dos scores, así que > y >= dan el
+mismo resultado sobre los datos optimizados.
+
+Ejecutar desde api/: python roi.py [--guardar] [--ltv 1000 --costo 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+import config
+from thresholds import cumulative_counts
+
+# Valores del notebook de ROI
+DEFAULT_LTV = 1000.0
+DEFAULT_RETENTION_COST = 200.0
+DEFAULT_SUCCESS_RATE = 1.0
+
+# Seguimiento de bajo costo para el nivel 'Medio'
+DEFAULT_FOLLOWUP_COST = 20.0
+DEFAULT_FOLLOWUP_SUCCESS_RATE = 0.2
+
+
+class ProfitCurve:
+    """
+    Contactados, churners contactados y ganancia para cada umbral distinto
+    (orden decreciente; el primer punto es no contactar a nadie)
+    """
+
+    def __init__(self, probs, y_true=None):
+        probs = np.asarray(probs).reshape(-1)
+        if probs.size == 0:
+            raise ValueError("Se necesita al menos una probabilidad")
+        if np.isnan(probs).any():
+            raise ValueError("Las probabilidades no pueden contener NaN")
+
+        # Acumulado en float64: en float32 la suma pierde precisión con millones de filas
+        weights = np.asarray(probs if y_true is None else y_true, dtype=np.float64)
+        thresholds, churners, contacted = cumulative_counts(probs, weights)
+
+        self.n = probs.size
+        self.thresholds = np.r_[np.inf, thresholds]
+        self.churners = np.r_[0.0, churners]
+        self.contacted = np.r_[0, contacted]
+
+    def profit(self, ltv: float, cost: float, success_rate: float = 1.0) -> np.ndarray:
+        return self.churners * (ltv * success_rate) - self.contacted * cost
+
+    def roi(self, ltv: float, cost: float, success_rate: float = 1.0) -> np.ndarray:
+        """Ganancia sobre costo de campaña, en %, como en el notebook"""
+        spend = self.contacted * cost
+        return np.divide(
+            100 * self.profit(ltv, cost, success_rate), spend,
+            out=np.zeros(self.thresholds.shape), where=spend > 0
+        )
+
+    def cut(self, i: int) -> float:
+        """
+        Umbral de serving para contactar los puntos 0..i: entre el score i y
+        el siguiente más bajo
+        """
+        if i == 0:
+            return 1.0
+        if i == len(self.thresholds) - 1:
+            return float(max(np.nextafter(self.thresholds[i], -np.inf), 0.0))
+        return float((self.thresholds[i] + self.thresholds[i + 1]) / 2)
+
+    def optimum(self, ltv: float, cost: float, success_rate: float = 1.0) -> dict:
+        """Umbral de máxima ganancia; ante empates, el que contacta menos"""
+        profit = self.profit(ltv, cost, success_rate)
+        i = int(np.argmax(profit))
+        spend = float(self.contacted[i] * cost)
+        return {
+            'umbral': round(self.cut(i), 6),
+            'ganancia': round(float(profit[i]), 2),
+            'roi': round(100 * float(profit[i]) / spend, 2) if spend > 0 else 0.0,
+            'contactados': int(self.contacted[i]),
+            'churners_contactados': round(float(self.churners[i]), 2),
+            'costo_campania': round(spend, 2),
+        }
+
+
+def optimize(probs, y_true=None,
+             ltv: float = DEFAULT_LTV,
+             retention_cost: float = DEFAULT_RETENTION_COST,
+             success_rate: float = DEFAULT_SUCCESS_RATE,
+             followup_cost: float = DEFAULT_FOLLOWUP_COST,
+             followup_success_rate: float = DEFAULT_FOLLOWUP_SUCCESS_RATE) -> dict:
+    """
+    Umbral de churn y bins de riesgo que maximizan la ganancia esperada
+
+    Returns:
+        {'umbral_churn', 'bins_riesgo', 'retencion', 'seguimiento', 'clientes'}
+    """
+    curve = ProfitCurve(probs, y_true)
+    retention = curve.optimum(ltv, retention_cost, success_rate)
+    followup = curve.optimum(ltv, followup_cost, followup_success_rate)
+
+    # 'Medio' queda vacío si el seguimiento no conviene por debajo de la oferta
+    high = retention['umbral']
+    low = min(followup['umbral'], high)
+
+    return {
+        'umbral_churn': high,
+        'bins_riesgo': [low, high],
+        'retencion': retention,
+        'seguimiento': followup,
+        'clientes': curve.n,
+    }
+
+
+def save_thresholds(result: dict, path: str = config.THRESHOLDS_FILE, **extra):
+    """Escribe los umbrales en el archivo que lee config.load_thresholds"""
+    data = {
+        'churn_threshold': result['umbral_churn'],
+        'risk_bins': result['bins_riesgo'],
+        **extra,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    import predict
+    from export_models import PARITY_FILE, load_processed_features
+    from quantize_models import load_processed_labels
+
+    parser = argparse.ArgumentParser(description="Umbral y bins de riesgo de máxima ganancia sobre el set de test")
+    parser.add_argument('--ltv', type=float, default=DEFAULT_LTV)
+    parser.add_argument('--costo', type=float, default=DEFAULT_RETENTION_COST, help="Costo de la oferta de retención")
+    parser.add_argument('--tasa-exito', type=float, default=DEFAULT_SUCCESS_RATE)
+    parser.add_argument('--costo-seguimiento', type=float, default=DEFAULT_FOLLOWUP_COST)
+    parser.add_argument('--tasa-exito-seguimiento', type=float, default=DEFAULT_FOLLOWUP_SUCCESS_RATE)
+    parser.add_argument('--guardar', action='store_true', help=f"Escribe los umbrales en {config.THRESHOLDS_FILE}")
+    args = parser.parse_args()
+
+    input_data = load_processed_features(PARITY_FILE)
+    y_test = load_processed_labels(PARITY_FILE)
+    if input_data is None or y_test is None:
+        print(f"❌ No se encontró data/processed/{PARITY_FILE} (se genera con los notebooks de entrenamiento)")
+        sys.exit(1)
+
+    predict.load_models()
+    churn_probs, risk_probs = predict.predict_probabilities(input_data)
+    params = dict(ltv=args.ltv, retention_cost=args.costo, success_rate=args.tasa_exito,
+                  followup_cost=args.costo_seguimiento, followup_success_rate=args.tasa_exito_seguimiento)
+
+    # El umbral de churn se aplica al Modelo 1 y los bins al Modelo 2
+    churn_result = optimize(churn_probs, y_test, **params)
+    risk_result = optimize(risk_probs, y_test, **params)
+    result = {'umbral_churn': churn_result['umbral_churn'], 'bins_riesgo': risk_result['bins_riesgo']}
+
+    print(f"Modelo 1: umbral {churn_result['umbral_churn']:.4f}  ganancia ${churn_result['retencion']['ganancia']:,.2f}  "
+          f"ROI {churn_result['retencion']['roi']:.2f}%  contactados {churn_result['retencion']['contactados']}")
+    print(f"Modelo 2: bins {risk_result['bins_riesgo'][0]:.4f} / {risk_result['bins_riesgo'][1]:.4f}")
+    print(f"Actual: umbral {config.CHURN_THRESHOLD}  bins {list(config.RISK_BINS)}")
+
+    if args.guardar:
+        save_thresholds(result, parametros=params, test=PARITY_FILE)
+        print(f"✅ Umbrales guardados en {os.path.abspath(config.THRESHOLDS_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field, validator
-from typing import Literal
+from pydantic import BaseModel, Field, model_validator, validator
+from typing import List, Literal, Optional
+from typing_extensions import Annotated
 import config
+import roi
 
 #para los campos con descripcion y ejemplo
 class CustomerData(BaseModel):
@@ -121,4 +123,66 @@ class RiskScoreResponse(BaseModel):
 class CombinedPredictionResponse(BaseModel):
     """Respuesta combinada"""
     churn: ChurnPredictionResponse
-    risk_score: RiskScoreResponse
\ No newline at end of file
+    risk_score: RiskScoreResponse
+
+
+class BatchPredictionRequest(BaseModel):
+    """Lote de clientes a evaluar en una sola llamada"""
+    clientes: List[CustomerData] = Field(
+        ...,
+        min_length=1,
+        max_length=config.BATCH_MAX_SIZE,
+        description=f"Clientes en formato CSV original (máximo {config.BATCH_MAX_SIZE})"
+    )
+
+
+class BatchPredictionResponse(BaseModel):
+    """Respuesta por lotes, en el mismo orden de entrada"""
+    total: int = Field(..., description="Cantidad de clientes evaluados")
+    resultados: List[CombinedPredictionResponse]
+
+
+class RoiRequest(BaseModel):
+    """Scores de clientes y parámetros de negocio para optimizar los umbrales"""
+    probabilidades: List[Annotated[float, Field(ge=0, le=1)]] = Field(
+        ...,
+        min_length=1,
+        description="Probabilidad de churn de cada cliente (0.0 - 1.0)"
+    )
+    etiquetas: Optional[List[Literal[0, 1]]] = Field(
+        None,
+        description="Churn real (0/1) de cada cliente; sin etiquetas se usa la probabilidad como churn esperado"
+    )
+    ltv: float = Field(roi.DEFAULT_LTV, gt=0, description="Valor de vida del cliente")
+    costo_retencion: float = Field(roi.DEFAULT_RETENTION_COST, ge=0, description="Costo de la oferta de retención")
+    tasa_exito: float = Field(roi.DEFAULT_SUCCESS_RATE, ge=0, le=1, description="Churners que retiene la oferta")
+    costo_seguimiento: float = Field(roi.DEFAULT_FOLLOWUP_COST, ge=0, description="Costo del seguimiento (nivel Medio)")
+    tasa_exito_seguimiento: float = Field(
+        roi.DEFAULT_FOLLOWUP_SUCCESS_RATE, ge=0, le=1, description="Churners que retiene el seguimiento"
+    )
+
+    @model_validator(mode='after')
+    def check_lengths(self):
+        if self.etiquetas is not None and len(self.etiquetas) != len(self.probabilidades):
+            raise ValueError("etiquetas y probabilidades deben tener el mismo largo")
+        return self
+
+
+class RoiOptimum(BaseModel):
+    """Punto de máxima ganancia para una acción"""
+    umbral: float = Field(..., description="Se contacta a los clientes con probabilidad > umbral")
+    ganancia: float
+    roi: float = Field(..., description="Ganancia sobre costo de campaña (%)")
+    contactados: int
+    churners_contactados: float
+    costo_campania: float
+
+
+class RoiResponse(BaseModel):
+    """Umbrales de máxima ganancia, en el formato de models/umbrales.json"""
+    umbral_churn: float
+    bins_riesgo: List[float] = Field(..., description="[Bajo/Medio, Medio/Alto]")
+    retencion: RoiOptimum
+    seguimiento: RoiOptimum
+    clientes: int
+
@@ -0,0 +1,381 @@
+"""
+Scoring masivo de archivos de clientes (CSV o Parquet)
+
+Lee el archivo por bloques de tamaño fijo, codifica cada bloque con el mismo
+encoder de los modelos cargados (el mismo que usa la API), evalúa ambos modelos
+y escribe el resultado incrementalmente. La memoria se mantiene constante sin
+importar el tamaño del archivo.
+
+Con --workers > 1 el archivo se divide en shards (rangos de bytes alineados a
+líneas en CSV, grupos de row groups en Parquet) que se evalúan en un pool de
+procesos; cada proceso carga los modelos una sola vez. Los resultados se unen
+en el orden de entrada o se dejan como un archivo por shard (--sin-merge).
+
+Los shards de CSV se cortan en el siguiente salto de línea, sin interpretar
+comillas: con --workers > 1 el CSV no puede tener campos entre comillas con
+saltos de línea adentro (el dataset de Telco no los tiene). Para esos
+archivos usar --workers 1 o convertirlos antes a Parquet.
+
+Entrada: layout de WA_Fn-UseC_-Telco-Customer-Churn.csv (o Parquet equivalente)
+Salida:  customerID, prob_churn, churn, nivel_riesgo (CSV o Parquet según extensión)
+
+Ejecutar: python api/score_file.py entrada.csv salida.csv --workers 16 --shard-mb 64
+"""
+
+import argparse
+import io
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import config
+import predict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_SHARD_MB = 64
+ID_COLUMN = 'customerID'
+INPUT_COLUMNS = [ID_COLUMN] + config.NUMERIC_FEATURES + config.CATEGORICAL_FEATURES
+OUTPUT_COLUMNS = [ID_COLUMN, 'prob_churn', 'churn', 'nivel_riesgo']
+
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def iter_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Recorre el archivo en bloques de chunk_size filas, leyendo solo las
+    columnas que usa el modelo
+    """
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        columns = [c for c in INPUT_COLUMNS if c in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(
+            path,
+            chunksize=chunk_size,
+            usecols=lambda column: column in INPUT_COLUMNS,
+            dtype={ID_COLUMN: str}
+        )
+
+
+def plan_shards(path: str, shard_mb: float = DEFAULT_SHARD_MB) -> list:
+    """
+    Divide el archivo en shards de ~shard_mb megabytes
+
+    Returns:
+        Lista de (shard, peso). En CSV el shard es un rango de bytes
+        (inicio, fin) que empieza y termina en un salto de línea; en Parquet es
+        una lista de índices de row groups. El peso (bytes o filas) se usa para
+        estimar el progreso.
+    """
+    shard_bytes = max(1, int(shard_mb * 1024 * 1024))
+
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        metadata = pq.ParquetFile(path).metadata
+        shards, current, current_bytes, current_rows = [], [], 0, 0
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            current.append(i)
+            current_bytes += row_group.total_byte_size
+            current_rows += row_group.num_rows
+            if current_bytes >= shard_bytes:
+                shards.append((current, current_rows))
+                current, current_bytes, current_rows = [], 0, 0
+        if current:
+            shards.append((current, current_rows))
+        return shards
+
+    size = os.path.getsize(path)
+    shards = []
+    with open(path, 'rb') as f:
+        f.readline()  # encabezado
+        start = f.tell()
+        while start < size:
+            end = min(start + shard_bytes, size)
+            if end < size:
+                # Se extiende hasta el final de la línea para no partir filas
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            shards.append(((start, end), end - start))
+            start = end
+    return shards
+
+
+def iter_shard_chunks(path: str, shard, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Igual que iter_chunks pero solo sobre un shard de plan_shards
+    """
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        columns = [c for c in INPUT_COLUMNS if c in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, row_groups=shard, columns=columns):
+            yield batch.to_pandas()
+    else:
+        start, end = shard
+        with open(path, 'rb') as f:
+            header = f.readline()
+            f.seek(start)
+            data = f.read(end - start)
+        yield from pd.read_csv(
+            io.BytesIO(header + data),
+            chunksize=chunk_size,
+            usecols=lambda column: column in INPUT_COLUMNS,
+            dtype={ID_COLUMN: str}
+        )
+
+
+# Filas inválidas que se listan en el error
+MAX_INVALID_REPORTED = 10
+
+
+def parse_total_charges(chunk: pd.DataFrame) -> pd.Series:
+    """
+    TotalCharges como número. En el CSV original viene vacío para clientes
+    con tenure 0, y solo eso se toma como 0.0; cualquier otro valor que no
+    sea un número se rechaza, igual que en la API.
+
+    Raises:
+        ValueError: Con las filas (customerID o índice) que no se pudieron leer
+    """
+    values = chunk['TotalCharges']
+    parsed = pd.to_numeric(values, errors='coerce')
+    missing = parsed.isna()
+    if missing.any():
+        blank = values[missing].isna() | values[missing].astype(str).str.strip().eq('')
+        invalid = blank.index[~blank.to_numpy()]
+        if len(invalid):
+            rows = chunk.loc[invalid, ID_COLUMN] if ID_COLUMN in chunk else invalid.to_series()
+            shown = ', '.join(f"{row} ({values[i]!r})" for i, row in zip(invalid[:MAX_INVALID_REPORTED], rows))
+            raise ValueError(f"TotalCharges no numérico en {len(invalid)} filas: {shown}")
+    return parsed.fillna(0.0)
+
+
+def score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Codifica y evalúa un bloque con ambos modelos
+
+    Raises:
+        ValueError: Si TotalCharges o una categórica traen un valor inválido
+    """
+    chunk = chunk.copy()
+    chunk['TotalCharges'] = parse_total_charges(chunk)
+
+    models = predict.serving()
+    input_data = models.encoder.transform(chunk)
+    churn_probs, risk_probs = predict.predict_probabilities(input_data, models=models)
+
+    customer_ids = chunk[ID_COLUMN].to_numpy() if ID_COLUMN in chunk else chunk.index.to_numpy()
+    return pd.DataFrame({
+        ID_COLUMN: customer_ids,
+        'prob_churn': np.round(churn_probs.astype(np.float64), 4),
+        'churn': predict.churn_labels(churn_probs),
+        'nivel_riesgo': predict.risk_levels(risk_probs),
+    }, columns=OUTPUT_COLUMNS)
+
+
+class ResultWriter:
+    """
+    Escribe los resultados bloque a bloque en CSV o Parquet
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._parquet_writer = None
+        self._header_written = False
+
+    def write(self, result: pd.DataFrame):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(result, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            result.to_csv(self.path, mode='a' if self._header_written else 'w',
+                          header=not self._header_written, index=False)
+            self._header_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def score_file(input_path: str, output_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Evalúa todo el archivo de entrada y escribe los resultados
+
+    Returns:
+        Cantidad de filas evaluadas
+    """
+    predict.check_models()
+
+    total_rows = 0
+    start = time.perf_counter()
+    with ResultWriter(output_path) as writer:
+        for chunk in iter_chunks(input_path, chunk_size):
+            writer.write(score_chunk(chunk))
+            total_rows += len(chunk)
+
+            elapsed = time.perf_counter() - start
+            logger.info(f"{total_rows:,} filas evaluadas ({total_rows / elapsed:,.0f} filas/s)")
+
+    return total_rows
+
+
+def part_path(output_path: str, shard_index: int) -> str:
+    """Archivo de salida de un shard: salida.part-00003.csv"""
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}.part-{shard_index:05d}{ext}"
+
+
+def _init_worker():
+    """Cada proceso del pool carga los modelos una sola vez"""
+    logging.getLogger().setLevel(logging.WARNING)
+    predict.load_models()
+
+
+def _score_shard(input_path: str, output_path: str, shard_index: int, shard, chunk_size: int) -> tuple:
+    rows = 0
+    with ResultWriter(part_path(output_path, shard_index)) as writer:
+        for chunk in iter_shard_chunks(input_path, shard, chunk_size):
+            writer.write(score_chunk(chunk))
+            rows += len(chunk)
+    return shard_index, rows
+
+
+def merge_parts(output_path: str, n_shards: int):
+    """
+    Une los archivos por shard en el orden de entrada y los elimina. Un
+    shard sin filas no deja archivo y se saltea.
+    """
+    parts = [part_path(output_path, i) for i in range(n_shards)]
+    parts = [part for part in parts if os.path.exists(part)]
+
+    if _is_parquet(output_path):
+        import pyarrow.parquet as pq
+
+        writer = None
+        for part in parts:
+            part_file = pq.ParquetFile(part)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, part_file.schema_arrow)
+            for i in range(part_file.num_row_groups):
+                writer.write_table(part_file.read_row_group(i))
+        if writer is not None:
+            writer.close()
+    else:
+        with open(output_path, 'wb') as out:
+            for i, part in enumerate(parts):
+                with open(part, 'rb') as f:
+                    header = f.readline()
+                    if i == 0:
+                        out.write(header)
+                    shutil.copyfileobj(f, out)
+
+    for part in parts:
+        os.remove(part)
+
+
+def score_file_parallel(input_path: str, output_path: str, workers: int,
+                        shard_mb: float = DEFAULT_SHARD_MB,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE, merge: bool = True) -> int:
+    """
+    Evalúa el archivo por shards en un pool de procesos
+
+    Returns:
+        Cantidad de filas evaluadas
+    """
+    shards = plan_shards(input_path, shard_mb)
+    total_weight = sum(weight for _, weight in shards)
+    logger.info(f"{len(shards)} shards, {workers} workers")
+
+    # Cada proceso usa un solo thread de BLAS/TF para no competir por los cores
+    for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ.setdefault(variable, '1')
+
+    total_rows = done_weight = 0
+    start = time.perf_counter()
+    # spawn: TensorFlow no soporta fork una vez inicializado
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(_score_shard, input_path, output_path, i, shard, chunk_size): weight
+            for i, (shard, weight) in enumerate(shards)
+        }
+        for n_done, future in enumerate(as_completed(futures), start=1):
+            _, rows = future.result()
+            total_rows += rows
+            done_weight += futures[future]
+
+            elapsed = time.perf_counter() - start
+            eta = elapsed * (total_weight - done_weight) / done_weight if done_weight else 0.0
+            logger.info(
+                f"Shard {n_done}/{len(shards)} | {total_rows:,} filas "
+                f"({total_rows / elapsed:,.0f} filas/s) | ETA {eta:,.0f}s"
+            )
+
+    if merge:
+        merge_parts(output_path, len(shards))
+
+    return total_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring masivo de clientes con ambos modelos")
+    parser.add_argument('entrada', help="CSV o Parquet con el layout del dataset Telco")
+    parser.add_argument('salida', help="Archivo de salida (.csv o .parquet)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Filas por bloque (default: {DEFAULT_CHUNK_SIZE:,})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Procesos en paralelo (default: 1, sin shards)")
+    parser.add_argument('--shard-mb', type=float, default=DEFAULT_SHARD_MB,
+                        help=f"Tamaño aproximado de cada shard en MB (default: {DEFAULT_SHARD_MB})")
+    parser.add_argument('--sin-merge', action='store_true',
+                        help="Deja un archivo de salida por shard en lugar de unirlos")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not os.path.exists(args.entrada):
+        parser.error(f"Archivo no encontrado: {args.entrada}")
+
+    if args.workers > 1:
+        total_rows = score_file_parallel(
+            args.entrada, args.salida, args.workers,
+            shard_mb=args.shard_mb, chunk_size=args.chunk_size, merge=not args.sin_merge
+        )
+    else:
+        predict.load_models()
+        total_rows = score_file(args.entrada, args.salida, args.chunk_size)
+
+    print(f"✓ {total_rows:,} clientes evaluados -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Motor de inferencia con el intérprete de TensorFlow Lite
+
+Carga el .tflite exportado con export_models.py. Usa tflite_runtime si está
+instalado (unos pocos MB) y si no el intérprete incluido en TensorFlow.
+"""
+
+import threading
+
+import numpy as np
+
+
+def _interpreter_class():
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """
+    Intérprete TFLite con la interfaz de un modelo de Keras
+    (predict / predict_on_batch / input_shape).
+
+    Un intérprete no se puede usar desde varios threads a la vez, así que
+    cada thread del pool de inferencia crea el suyo a partir del mismo
+    modelo en memoria.
+
+    Args:
+        path: Archivo .tflite
+        threads: Threads por intérprete (default 1)
+    """
+
+    def __init__(self, path: str, threads: int = 1):
+        with open(path, 'rb') as f:
+            self._model_content = f.read()
+        self._threads = threads
+        self._local = threading.local()
+        self._Interpreter = _interpreter_class()
+
+        interpreter = self._state()['interpreter']
+        self._n_features = int(interpreter.get_input_details()[0]['shape'][1])
+
+    def _state(self) -> dict:
+        """Intérprete del thread actual (se crea la primera vez)"""
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            interpreter = self._Interpreter(model_content=self._model_content, num_threads=self._threads)
+            interpreter.allocate_tensors()
+            input_details = interpreter.get_input_details()[0]
+            state = self._local.state = {
+                'interpreter': interpreter,
+                'input': input_details['index'],
+                'output': interpreter.get_output_details()[0]['index'],
+                'batch_size': int(input_details['shape'][0]),
+            }
+        return state
+
+    @property
+    def input_shape(self) -> tuple:
+        return (None, self._n_features)
+
+    @classmethod
+    def load(cls, path: str, threads: int = 1) -> 'TFLiteModel':
+        return cls(path, threads)
+
+    def predict_on_batch(self, x) -> np.ndarray:
+        """Forward pass completo; devuelve un array (N, salidas)"""
+        input_data = np.ascontiguousarray(x, dtype=np.float32)
+        state = self._state()
+        interpreter = state['interpreter']
+
+        # El tamaño de lote se ajusta solo cuando cambia
+        if input_data.shape[0] != state['batch_size']:
+            interpreter.resize_tensor_input(state['input'], input_data.shape)
+            interpreter.allocate_tensors()
+            state['batch_size'] = input_data.shape[0]
+
+        interpreter.set_tensor(state['input'], input_data)
+        interpreter.invoke()
+        return interpreter.get_tensor(state['output']).copy()
+
+    def tensor_bytes(self, rows: int = 1) -> int:
+        """
+        Bytes de todos los tensores del intérprete (pesos y activaciones)
+        con un lote de rows filas. Es una cota superior de la memoria en
+        ejecución: el arena de TFLite reutiliza buffers entre activaciones.
+        """
+        self.predict_on_batch(np.zeros((rows, self._n_features), dtype=np.float32))
+        interpreter = self._state()['interpreter']
+        return sum(
+            int(np.prod(tensor['shape'])) * np.dtype(tensor['dtype']).itemsize
+            for tensor in interpreter.get_tensor_details()
+        )
+
+    def predict(self, x, verbose=0, **kwargs) -> np.ndarray:
+        """Compatible con Model.predict de Keras (verbose y demás se ignoran)"""
+        return self.predict_on_batch(x)
@@ -0,0 +1,178 @@
+"""
+Barrido de umbrales de decisión
+
+Con las probabilidades ordenadas de mayor a menor, bajar el umbral solo
+agrega predicciones positivas, así que la matriz de confusión de TODOS los
+umbrales sale de una suma acumulada de las etiquetas (O(N log N) por el
+orden, una sola vez). Sobre esos arreglos se obtienen precision/recall/F1,
+las curvas ROC y PR y el mejor umbral para una métrica, sin volver a evaluar
+el modelo.
+
+Una predicción es positiva si prob >= umbral.
+"""
+
+import numpy as np
+
+METRICS = ('precision', 'recall', 'f1', 'accuracy', 'fpr')
+
+
+def _safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den con 0 donde den == 0 (zero_division=0 de sklearn)"""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros(np.broadcast(num, den).shape), where=den != 0)
+
+
+def cumulative_counts(probs, weights) -> tuple:
+    """
+    Una pasada sobre las probabilidades ordenadas de mayor a menor
+
+    Args:
+        probs: Probabilidades (N,)
+        weights: Peso de cada fila (N,), p. ej. la etiqueta 0/1
+
+    Returns:
+        (umbrales distintos en orden decreciente, suma de weights y cantidad
+        de filas con prob >= cada umbral)
+    """
+    probs = np.asarray(probs).reshape(-1)
+    if probs.dtype.kind != 'f':
+        probs = probs.astype(np.float64)
+    weights = np.asarray(weights).reshape(-1)
+    if weights.shape != probs.shape:
+        raise ValueError("Las etiquetas y las probabilidades deben tener el mismo largo")
+
+    # Orden no estable en el dtype original (float32 ordena ~2x más rápido);
+    # el orden entre empates no importa porque solo se usa el final de cada grupo
+    order = np.argsort(probs)[::-1]
+    probs = probs[order]
+
+    # Último índice de cada probabilidad distinta: con umbral = probs[i]
+    # son positivas las filas 0..i
+    last = np.r_[np.flatnonzero(np.diff(probs)), probs.size - 1] if probs.size else np.array([], dtype=np.int64)
+    return probs[last].astype(np.float64), np.cumsum(weights[order])[last], last + 1
+
+
+class ThresholdSweep:
+    """
+    Matriz de confusión y métricas para cada umbral distinto
+
+    Los arreglos (thresholds, tp, fp, tn, fn y METRICS) están en orden de
+    umbral decreciente; el primer punto es umbral +inf (ningún positivo).
+    """
+
+    def __init__(self, y_true, probs):
+        y_true = np.asarray(y_true).reshape(-1).astype(np.int64)
+        thresholds, tp, predicted = cumulative_counts(probs, y_true)
+        fp = predicted - tp
+
+        self.n = y_true.size
+        self.positives = int(y_true.sum())
+        self.negatives = self.n - self.positives
+        self.thresholds = np.r_[np.inf, thresholds]
+        self.tp = np.r_[0, tp]
+        self.fp = np.r_[0, fp]
+        self.fn = self.positives - self.tp
+        self.tn = self.negatives - self.fp
+
+        self.precision = _safe_divide(self.tp, self.tp + self.fp)
+        self.recall = _safe_divide(self.tp, self.positives)
+        self.f1 = _safe_divide(2 * self.tp, 2 * self.tp + self.fp + self.fn)
+        self.accuracy = _safe_divide(self.tp + self.tn, self.n)
+        self.fpr = _safe_divide(self.fp, self.negatives)
+
+    def index(self, threshold: float) -> int:
+        """Punto del barrido que corresponde a un umbral arbitrario (O(log N))"""
+        # Cantidad de umbrales distintos >= threshold (thresholds es decreciente)
+        return int(np.searchsorted(-self.thresholds, -threshold, side='right')) - 1
+
+    def confusion_matrix(self, threshold: float) -> np.ndarray:
+        """[[tn, fp], [fn, tp]], igual que sklearn.metrics.confusion_matrix"""
+        i = self.index(threshold)
+        return np.array([[self.tn[i], self.fp[i]], [self.fn[i], self.tp[i]]])
+
+    def report(self, threshold: float) -> dict:
+        """
+        Mismo formato que classification_report(..., output_dict=True) para
+        las clases 0 y 1
+        """
+        i = self.index(threshold)
+        tn, fp, fn, tp = (float(v[i]) for v in (self.tn, self.fp, self.fn, self.tp))
+        classes = {
+            '0': (tn, fn, fp, self.negatives),
+            '1': (tp, fp, fn, self.positives),
+        }
+
+        report = {}
+        for label, (hits, false_pos, false_neg, support) in classes.items():
+            report[label] = {
+                'precision': float(_safe_divide(hits, hits + false_pos)),
+                'recall': float(_safe_divide(hits, hits + false_neg)),
+                'f1-score': float(_safe_divide(2 * hits, 2 * hits + false_pos + false_neg)),
+                'support': support,
+            }
+        report['accuracy'] = float(self.accuracy[i])
+
+        scores = ('precision', 'recall', 'f1-score')
+        report['macro avg'] = {
+            **{s: (report['0'][s] + report['1'][s]) / 2 for s in scores},
+            'support': self.n,
+        }
+        report['weighted avg'] = {
+            **{s: float(_safe_divide(report['0'][s] * self.negatives + report['1'][s] * self.positives, self.n))
+               for s in scores},
+            'support': self.n,
+        }
+        return report
+
+    def roc_curve(self) -> tuple:
+        """(fpr, tpr, umbrales), de (0, 0) a (1, 1)"""
+        return self.fpr, self.recall, self.thresholds
+
+    def pr_curve(self) -> tuple:
+        """(precision, recall, umbrales) sin el punto de umbral +inf"""
+        return self.precision[1:], self.recall[1:], self.thresholds[1:]
+
+    def roc_auc(self) -> float:
+        return float(np.trapz(self.recall, self.fpr))
+
+    def average_precision(self) -> float:
+        """Área bajo la curva PR como suma escalonada (average_precision_score)"""
+        return float(np.sum(np.diff(self.recall) * self.precision[1:]))
+
+    def best_threshold(self, metric: str = 'f1', min_recall: float = 0.0) -> tuple:
+        """
+        Umbral que maximiza una métrica, opcionalmente exigiendo un recall
+        mínimo. Ante empates se queda con el umbral más alto.
+
+        Returns:
+            (umbral, valor de la métrica), o (None, None) si ningún umbral
+            alcanza min_recall
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Métrica '{metric}' no soportada; opciones: {', '.join(METRICS)}")
+
+        values = np.where(self.recall >= min_recall, getattr(self, metric), -np.inf)
+        values[0] = -np.inf  # umbral +inf: ningún positivo
+        if values.size < 2 or not np.isfinite(values.max()):
+            return None, None
+
+        best = int(np.argmax(values))
+        return float(self.thresholds[best]), float(values[best])
+
+
+class ThresholdTable:
+    """
+    Reportes y matrices de confusión precalculados para una grilla fija de
+    umbrales (p. ej. los pasos de un slider): cada consulta es O(1)
+    """
+
+    def __init__(self, sweep: ThresholdSweep, step: float = 0.05):
+        self.step = step
+        self.thresholds = np.round(np.arange(0.0, 1.0 + step / 2, step), 10)
+        self._rows = [(sweep.confusion_matrix(t), sweep.report(t)) for t in self.thresholds]
+
+    def __getitem__(self, threshold: float) -> tuple:
+        """(matriz de confusión, reporte) del punto de la grilla más cercano"""
+        i = min(max(int(round(threshold / self.step)), 0), len(self._rows) - 1)
+        return self._rows[i]
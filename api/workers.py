@@ -0,0 +1,108 @@
+"""
+Pool de workers para la inferencia
+
+La inferencia (Keras o NumPy) es CPU-bound y bloquearía el event loop de
+uvicorn, así que se despacha a un pool de threads dedicado con una cola
+acotada. Si la cola está llena la tarea se rechaza de inmediato
+(PoolSaturatedError -> 503 con Retry-After) en lugar de acumular latencia.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PoolSaturatedError(Exception):
+    """La cola de inferencia está llena"""
+
+
+class InferencePool:
+    """
+    ThreadPoolExecutor con cola acotada y estadísticas de espera.
+
+    Args:
+        max_workers: Threads que ejecutan inferencia en paralelo
+        max_queue: Tareas que pueden esperar un worker libre antes de rechazar
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='inferencia')
+        self._lock = threading.Lock()
+
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _track(self, fn, submitted_at: float, *args):
+        wait = time.perf_counter() - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def _on_done(self, future):
+        # Una tarea cancelada antes de empezar (shutdown con cancel_futures o
+        # request abortada) nunca pasa por _track: sale de la cola aquí
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def submit(self, fn, *args):
+        """
+        Encola fn(*args) en el pool
+
+        Returns:
+            concurrent.futures.Future
+
+        Raises:
+            PoolSaturatedError: Si la cola está llena
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise PoolSaturatedError("Servicio saturado, reintente en unos segundos")
+            self._queued += 1
+
+        try:
+            future = self._executor.submit(self._track, fn, time.perf_counter(), *args)
+        except RuntimeError:
+            # Pool ya cerrado
+            with self._lock:
+                self._queued -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    async def run(self, fn, *args):
+        """Ejecuta fn(*args) en el pool sin bloquear el event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                'workers': self.max_workers,
+                'en_ejecucion': self._running,
+                'en_cola': self._queued,
+                'capacidad_cola': self.max_queue,
+                'completadas': self._completed,
+                'rechazadas': self._rejected,
+                'espera_promedio_ms': round(1000 * self._wait_total / started, 3) if started else 0.0,
+                'espera_max_ms': round(1000 * self._wait_max, 3),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
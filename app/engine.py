@@ -0,0 +1,84 @@
+"""
+Motor de scoring compartido por las páginas del dashboard
+
+Es el mismo código que usa la API (api/predict.py y api/config.py): mismos
+modelos, mismo encoder de features y mismos umbrales, así que el dashboard y
+la API siempre dan el mismo resultado para un cliente. Los modelos se cargan
+una sola vez por proceso de Streamlit y se comparten entre sesiones y
+páginas (st.cache_resource).
+"""
+
+import sys
+
+import numpy as np
+import streamlit as st
+
+from rutas import DIR_API, DIR_PROCESADOS
+from src.dataset import cargar_procesado
+
+if DIR_API not in sys.path:
+    sys.path.insert(0, DIR_API)
+
+import config  # noqa: E402
+import predict  # noqa: E402
+from thresholds import ThresholdSweep, ThresholdTable  # noqa: E402
+
+# train-Modelo-2.csv contiene en realidad el set de test (ver notebooks)
+ARCHIVO_TEST = 'train-Modelo-2.csv'
+
+# Paso del slider de umbral de la página de Métricas
+PASO_UMBRAL = 0.05
+
+
+@st.cache_resource(show_spinner="Cargando modelos...")
+def cargar_motor():
+    """Carga ambos modelos (una vez por proceso) y devuelve el módulo predict"""
+    predict.load_models()
+    return predict
+
+
+def opciones(campo: str) -> list:
+    """Valores válidos de una variable categórica, los mismos que acepta la API"""
+    return config.FIELD_DESCRIPTIONS[campo]['valores_validos']
+
+
+def evaluar_cliente(cliente: dict) -> tuple:
+    """
+    Probabilidades de un cliente en formato del CSV original
+
+    Returns:
+        (prob_churn, prob_riesgo)
+    """
+    motor = cargar_motor()
+    modelos = motor.serving()
+    fila = modelos.encoder.transform_row(cliente)
+    return motor.predict_single(fila, models=modelos)
+
+
+@st.cache_resource(show_spinner="Cargando set de test...")
+def cargar_test() -> tuple:
+    """
+    Features (N, 35) en el orden de config.FEATURE_NAMES y etiquetas 0/1 del
+    set de test
+    """
+    # Parquet float32 si se convirtió (python src/dataset.py --procesados)
+    df = cargar_procesado(ARCHIVO_TEST, config.FEATURE_NAMES + ['Churn'], DIR_PROCESADOS)
+    X_test = df[config.FEATURE_NAMES].to_numpy(dtype=np.float32)
+    y_test = df['Churn'].to_numpy()
+    return X_test, y_test
+
+
+@st.cache_resource(show_spinner="Calculando métricas para todos los umbrales...")
+def barrido_test(paso: float = PASO_UMBRAL) -> tuple:
+    """
+    Evalúa el set de test con el Modelo 2 una sola vez y precalcula el
+    barrido de umbrales
+
+    Returns:
+        (ThresholdSweep, ThresholdTable con la grilla del slider)
+    """
+    motor = cargar_motor()
+    X_test, y_test = cargar_test()
+    _, probs = motor.predict_probabilities(X_test, churn=False, risk=True)
+    barrido = ThresholdSweep(y_test, probs)
+    return barrido, ThresholdTable(barrido, paso)
@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
-import joblib
-from tensorflow.keras.models import load_model
+
+from engine import cargar_motor, evaluar_cliente, opciones
 
 st.markdown("""
     <style>
@@ -14,15 +13,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_resource
-def cargar_modelos_y_pipe():
-    mod_bin = load_model(r'models\model1.keras')
-    mod_prob = load_model(r'models\model2.keras')
-    pipe = joblib.load(r'models\Pipe_RiskScore.pkl')
-    return mod_bin, mod_prob, pipe
-
-
-modelo_binario, modelo_proba, preproc_proba = cargar_modelos_y_pipe()
+motor = cargar_motor()
 
 st.header("Predicción Individual de Churn")
 st.markdown("Ingrese los datos del cliente para evaluar su riesgo de abandono.")
@@ -37,68 +28,67 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     st.subheader("Variables Numéricas")
-    tenure = st.number_input("Tenure (Meses)", min_value=0, max_value=100, value=1)
+    tenure = st.number_input("Tenure (Meses)", min_value=0, max_value=72, value=1)
     total_charges = st.number_input("Cargos Totales", min_value=0.0, value=50.0)
 
 with col2:
     st.subheader("Servicios y Binarias")
-    gender = st.selectbox("Género", ["Female", "Male"])
-    phone_service = st.selectbox("PhoneService", ["No", "Yes"])
-    online_security = st.selectbox("OnlineSecurity", ["No", "Yes"])
-    online_backup = st.selectbox("OnlineBackup", ["No", "Yes"])
+    gender = st.selectbox("Género", opciones("gender"))
+    phone_service = st.selectbox("PhoneService", opciones("PhoneService"))
+    online_security = st.selectbox("OnlineSecurity", opciones("OnlineSecurity"))
+    online_backup = st.selectbox("OnlineBackup", opciones("OnlineBackup"))
 
 with col3:
     st.subheader("Contrato y Pagos")
-    device_protection = st.selectbox("DeviceProtection", ["No", "Yes"])
-    tech_support = st.selectbox("TechSupport", ["No", "Yes"])
-    streaming_tv = st.selectbox("StreamingTV", ["No", "Yes"])
-    streaming_movies = st.selectbox("StreamingMovies", ["No", "Yes"])
-    multiple_lines = st.selectbox("MultipleLines", ["No", "Yes", "No phone service"])
-    internet_service = st.selectbox("InternetService", ["DSL", "Fiber optic", "No"])
-    contract = st.selectbox("Contract", ["Month-to-month", "One year", "Two year"])
-    payment_method = st.selectbox("PaymentMethod", ["Electronic check", "Mailed check", "Bank transfer (automatic)", "Credit card (automatic)"])
+    device_protection = st.selectbox("DeviceProtection", opciones("DeviceProtection"))
+    tech_support = st.selectbox("TechSupport", opciones("TechSupport"))
+    streaming_tv = st.selectbox("StreamingTV", opciones("StreamingTV"))
+    streaming_movies = st.selectbox("StreamingMovies", opciones("StreamingMovies"))
+    multiple_lines = st.selectbox("MultipleLines", opciones("MultipleLines"))
+    internet_service = st.selectbox("InternetService", opciones("InternetService"))
+    contract = st.selectbox("Contract", opciones("Contract"))
+    payment_method = st.selectbox("PaymentMethod", opciones("PaymentMethod"))
 
 if st.button("Realizar Predicción"):
-    input_data = pd.DataFrame({
-        'gender': [gender],
-        'tenure': [tenure],
-        'PhoneService': [phone_service],
-        'MultipleLines': [multiple_lines],
-        'InternetService': [internet_service],
-        'OnlineSecurity': [online_security],
-        'OnlineBackup': [online_backup],
-        'DeviceProtection': [device_protection],
-        'TechSupport': [tech_support],
-        'StreamingTV': [streaming_tv],
-        'StreamingMovies': [streaming_movies],
-        'Contract': [contract],
-        'PaymentMethod': [payment_method],
-        'TotalCharges': [total_charges]
-    })
+    cliente = {
+        'gender': gender,
+        'tenure': tenure,
+        'PhoneService': phone_service,
+        'MultipleLines': multiple_lines,
+        'InternetService': internet_service,
+        'OnlineSecurity': online_security,
+        'OnlineBackup': online_backup,
+        'DeviceProtection': device_protection,
+        'TechSupport': tech_support,
+        'StreamingTV': streaming_tv,
+        'StreamingMovies': streaming_movies,
+        'Contract': contract,
+        'PaymentMethod': payment_method,
+        'TotalCharges': total_charges
+    }
 
     try:
-        datos_preprocesados = preproc_proba.transform(input_data)
+        prob_churn, prob_riesgo = evaluar_cliente(cliente)
 
         if tipo_modelo == "Binario (Clasificación)":
-            pred = modelo_binario.predict(datos_preprocesados)
-            clase = (pred > 0.5).astype(int)[0][0]
-            resultado = "CHURN (Abandona)" if clase == 1 else "NO CHURN (Se queda)"
-            color = "red" if clase == 1 else "green"
+            churn = motor.churn_labels(prob_churn) == 'Yes'
+            resultado = "CHURN (Abandona)" if churn else "NO CHURN (Se queda)"
+            color = "red" if churn else "green"
             st.markdown(f"### Resultado: :{color}[{resultado}]")
             
         else:
-            prob = modelo_proba.predict(datos_preprocesados)[0][0]
-            st.markdown(f"### Score de Riesgo: {prob:.2%}")
+            st.markdown(f"### Score de Riesgo: {prob_riesgo:.2%}")
             
-            st.progress(float(prob))
+            st.progress(float(prob_riesgo))
             
-            if prob > 0.7:
-                st.error("Riesgo Crítico: Se recomienda acción inmediata.")
-            elif prob > 0.4:
-                st.warning("Riesgo Moderado: Realizar seguimiento.")
+            # Mismos niveles que /predict/risk_score
+            nivel = motor.risk_levels(prob_riesgo)
+            if nivel == 'Alto':
+                st.error("Riesgo Alto: Se recomienda acción inmediata.")
+            elif nivel == 'Medio':
+                st.warning("Riesgo Medio: Realizar seguimiento.")
             else:
                 st.success("Riesgo Bajo: Cliente estable.")
 
-    except Exception as e:
-        st.error(f"Error en el preprocesamiento: {e}")
-        st.info("Asegúrate de que las columnas del DataFrame coincidan con las que espera el Pipe_RiskScore.pkl")
\ No newline at end of file
+    except ValueError as e:
+        st.error(f"Error en la predicción: {e}")
@@ -3,8 +3,8 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.metrics import classification_report, confusion_matrix
-from tensorflow.keras.models import load_model
+
+from engine import PASO_UMBRAL, barrido_test
 
 st.markdown("""
     <style>
@@ -18,15 +18,8 @@ background: linear-gradient(225deg, #273d51 0.000%, #263e57 3.030%, #24405c 6.06
 """, unsafe_allow_html=True)
 
 
-@st.cache_resource
-def cargar_recursos():
-    df_test = pd.read_csv(r'data\processed\train-Modelo-2.csv')
-    X_test = df_test.drop(columns='Churn')
-    y_test = df_test['Churn']
-    modelo = load_model(r'models\model2.keras')
-    return X_test, y_test, modelo
-
-X_test, y_test, modelo_cargado = cargar_recursos()
+# Probabilidades y métricas de todos los umbrales, calculadas una sola vez
+barrido, tabla_umbrales = barrido_test()
 
 st.header("Evaluación del Modelo y Ajuste de Umbral")
 st.markdown("""
@@ -34,13 +27,9 @@ Ajusta el **umbral de decisión** para observar cómo cambian la Precisión, el
 Esto es crítico para balancear los falsos positivos frente a los falsos negativos.
 """)
 
-umbral = st.slider("Selecciona el Umbral de Decisión (Threshold)", 0.0, 1.0, 0.5, 0.05)
-
-probs = modelo_cargado.predict(X_test).flatten()
-y_pred = (probs >= umbral).astype(int)
+umbral = st.slider("Selecciona el Umbral de Decisión (Threshold)", 0.0, 1.0, 0.5, PASO_UMBRAL)
 
-report = classification_report(y_test, y_pred, output_dict=True)
-cm = confusion_matrix(y_test, y_pred)
+cm, report = tabla_umbrales[umbral]
 
 col1, col2, col3, col4 = st.columns(4)
 
@@ -72,3 +61,41 @@ with col_right:
     st.subheader("Reporte de Clasificación Completo")
     df_report = pd.DataFrame(report).transpose()
     st.dataframe(df_report.style.format(precision=3).background_gradient(cmap='Greens', subset=['precision', 'recall', 'f1-score']))
+
+st.divider()
+
+st.subheader("Curvas ROC y Precision-Recall")
+i = barrido.index(umbral)
+col_roc, col_pr = st.columns([1, 1])
+
+with col_roc:
+    fpr, tpr, _ = barrido.roc_curve()
+    fig_roc, ax_roc = plt.subplots(figsize=(6, 5))
+    ax_roc.plot(fpr, tpr, label=f"AUC = {barrido.roc_auc():.3f}")
+    ax_roc.plot([0, 1], [0, 1], linestyle='--', color='gray')
+    ax_roc.scatter(barrido.fpr[i], barrido.recall[i], color='red', zorder=3, label=f"Umbral {umbral:.2f}")
+    ax_roc.set_xlabel('Tasa de Falsos Positivos')
+    ax_roc.set_ylabel('Recall')
+    ax_roc.legend()
+    st.pyplot(fig_roc)
+
+with col_pr:
+    prec, rec, _ = barrido.pr_curve()
+    fig_pr, ax_pr = plt.subplots(figsize=(6, 5))
+    ax_pr.plot(rec, prec, label=f"AP = {barrido.average_precision():.3f}")
+    ax_pr.scatter(barrido.recall[i], barrido.precision[i], color='red', zorder=3, label=f"Umbral {umbral:.2f}")
+    ax_pr.set_xlabel('Recall')
+    ax_pr.set_ylabel('Precision')
+    ax_pr.legend()
+    st.pyplot(fig_pr)
+
+st.subheader("Umbral Óptimo")
+col_metrica, col_recall = st.columns([1, 1])
+metrica = col_metrica.selectbox("Métrica a maximizar", ['f1', 'precision', 'accuracy'])
+recall_minimo = col_recall.slider("Recall mínimo (Churn)", 0.0, 1.0, 0.0, 0.05)
+
+mejor_umbral, mejor_valor = barrido.best_threshold(metrica, min_recall=recall_minimo)
+if mejor_umbral is None:
+    st.warning("Ningún umbral alcanza el recall mínimo pedido.")
+else:
+    st.metric(f"Mejor umbral por {metrica}", f"{mejor_umbral:.3f}", f"{metrica} = {mejor_valor:.2%}", delta_color="off")
@@ -0,0 +1,20 @@
+"""
+Rutas del proyecto, independientes del sistema operativo y del directorio
+desde el que se lance Streamlit
+"""
+
+import os
+import sys
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DIR_API = os.path.join(RAIZ, 'api')
+DIR_RAW = os.path.join(RAIZ, 'data', 'raw')
+DIR_PROCESADOS = os.path.join(RAIZ, 'data', 'processed')
+DIR_EDA = os.path.join(DIR_PROCESADOS, 'eda')
+DIR_DATASET = os.path.join(DIR_PROCESADOS, 'telco')
+
+DATASET_RAW = os.path.join(DIR_RAW, 'WA_Fn-UseC_-Telco-Customer-Churn.csv')
+
+# Para importar los módulos compartidos de src/ (from src.associations import ...)
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
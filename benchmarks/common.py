@@ -0,0 +1,157 @@
+"""
+Utilidades compartidas por los benchmarks: clientes sintéticos, estadísticas
+de latencia y baselines en JSON para detectar regresiones entre versiones.
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+API_DIR = os.path.join(ROOT_DIR, 'api')
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+
+# Los módulos de la API se importan como en uvicorn (desde api/)
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+import config  # noqa: E402
+
+# Tolerancia por defecto al comparar contra la baseline (20%)
+DEFAULT_TOLERANCE = 0.20
+
+
+def synthetic_records(n_rows: int, seed: int = 7) -> list:
+    """
+    Clientes sintéticos como lista de diccionarios JSON-serializables,
+    generados a partir de FIELD_DESCRIPTIONS
+    """
+    columns = {field: values.tolist() for field, values in config.sample_customers(n_rows, seed).items()}
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def summarize(latencies: list, wall_time: float, n_ops: int, rows_per_op: int = 1) -> dict:
+    """
+    Resume latencias (segundos) en percentiles y throughput
+
+    Args:
+        latencies: Latencia de cada operación
+        wall_time: Tiempo total del benchmark
+        n_ops: Operaciones completadas
+        rows_per_op: Clientes evaluados por operación (tamaño de lote)
+    """
+    latencies_ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'ops_s': round(n_ops / wall_time, 2),
+        'filas_s': round(n_ops * rows_per_op / wall_time, 2),
+    }
+
+
+def time_calls(fn, n_calls: int, rows_per_op: int = 1, warmup: int = 5) -> dict:
+    """
+    Mide n_calls ejecuciones secuenciales de fn()
+    """
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    wall_time = time.perf_counter() - start
+
+    return summarize(latencies, wall_time, n_calls, rows_per_op)
+
+
+def print_results(results: dict):
+    print(f"{'benchmark':<40} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>12} {'filas/s':>14}")
+    for name, r in results.items():
+        print(f"{name:<40} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f} "
+              f"{r['ops_s']:>12,.1f} {r['filas_s']:>14,.1f}")
+
+
+def save_baseline(name: str, results: dict, params: dict) -> str:
+    """Guarda los resultados en benchmarks/baselines/<name>.json"""
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f'{name}.json')
+    payload = {
+        'meta': {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'backend': config.INFERENCE_BACKEND,
+            'parametros': params,
+        },
+        'resultados': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def compare_baseline(name: str, results: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Compara contra benchmarks/baselines/<name>.json
+
+    Returns:
+        Lista de regresiones (texto); vacía si no hay o no existe la baseline
+    """
+    path = os.path.join(BASELINE_DIR, f'{name}.json')
+    if not os.path.exists(path):
+        print(f"Sin baseline en {path}")
+        return []
+
+    with open(path, encoding='utf-8') as f:
+        baseline = json.load(f)['resultados']
+
+    regressions = []
+    for bench, current in results.items():
+        if bench not in baseline:
+            continue
+        base = baseline[bench]
+        if current['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{bench}: p95 {base['p95_ms']:.3f} -> {current['p95_ms']:.3f} ms")
+        if current['ops_s'] < base['ops_s'] * (1 - tolerance):
+            regressions.append(f"{bench}: ops/s {base['ops_s']:,.1f} -> {current['ops_s']:,.1f}")
+    return regressions
+
+
+def add_baseline_arguments(parser):
+    parser.add_argument('--guardar-baseline', action='store_true',
+                        help="Guarda los resultados como nueva baseline")
+    parser.add_argument('--comparar', action='store_true',
+                        help="Compara contra la baseline y termina con error si hay regresiones")
+    parser.add_argument('--tolerancia', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Regresión tolerada al comparar (default: {DEFAULT_TOLERANCE:.0%})")
+
+
+def handle_baseline(name: str, results: dict, params: dict, args) -> int:
+    """
+    Aplica --guardar-baseline / --comparar
+
+    Returns:
+        Código de salida (1 si hay regresiones)
+    """
+    if args.comparar:
+        regressions = compare_baseline(name, results, args.tolerancia)
+        for regression in regressions:
+            print(f"❌ Regresión: {regression}")
+        if regressions:
+            return 1
+        print("✓ Sin regresiones respecto a la baseline")
+
+    if args.guardar_baseline:
+        print(f"✓ Baseline guardada en {save_baseline(name, results, params)}")
+
+    return 0
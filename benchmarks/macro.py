@@ -0,0 +1,131 @@
+"""
+Benchmarks de punta a punta de la API
+
+Envía requests a /predict/churn, /predict/risk_score, /predict/both y
+/predict/batch con un cliente ASGI en proceso (sin red ni uvicorn), con la
+concurrencia indicada. Incluye validación, cache, micro-batching y pool de
+inferencia tal como corren en producción.
+
+/predict/batch tiene su propia cantidad de requests (--requests-batch, default
+200) para que sus percentiles tengan muestras suficientes.
+
+Ejecutar: python benchmarks/macro.py --concurrencia 32 --requests 2000 --comparar
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+import common
+
+import predict
+from main import app, pool
+
+BASELINE_NAME = 'macro'
+SINGLE_ENDPOINTS = ('/predict/churn', '/predict/risk_score', '/predict/both')
+BATCH_ENDPOINT = '/predict/batch'
+DEFAULT_BATCH_REQUESTS = 200
+
+
+async def drive(client: httpx.AsyncClient, path: str, payloads: list, n_requests: int,
+                concurrency: int) -> tuple:
+    """
+    Envía n_requests a path desde `concurrency` clientes simultáneos
+
+    Returns:
+        (latencias, tiempo total, conteo por status)
+    """
+    latencies = []
+    statuses = Counter()
+    next_request = iter(range(n_requests))
+
+    async def worker():
+        for i in next_request:
+            t0 = time.perf_counter()
+            response = await client.post(path, json=payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - t0)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start, statuses
+
+
+async def run(n_requests: int, n_batch_requests: int, concurrency: int, batch_size: int,
+              n_customers: int, seed: int) -> dict:
+    records = common.synthetic_records(max(n_customers, batch_size), seed)
+    singles = records[:n_customers]
+    batches = [
+        {'clientes': records[i:i + batch_size]}
+        for i in range(0, len(records) - batch_size + 1, batch_size)
+    ]
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+        plan = [(path, singles, n_requests, 1) for path in SINGLE_ENDPOINTS]
+        plan.append((BATCH_ENDPOINT, batches, n_batch_requests, batch_size))
+
+        for path, payloads, total, rows in plan:
+            # Cada endpoint arranca con el cache vacío
+            predict.prediction_cache.clear()
+            latencies, wall_time, statuses = await drive(client, path, payloads, total, concurrency)
+
+            name = f'{path}[c={concurrency}]' if rows == 1 else f'{path}[c={concurrency},n={rows}]'
+            results[name] = common.summarize(latencies, wall_time, total, rows)
+            errors = sum(count for status, count in statuses.items() if status != 200)
+            if errors:
+                print(f"❌ {name}: {errors} respuestas con error {dict(statuses)}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de latencia y throughput de la API")
+    parser.add_argument('--requests', type=int, default=2000,
+                        help="Requests por endpoint individual (default: 2000)")
+    parser.add_argument('--requests-batch', type=int, default=DEFAULT_BATCH_REQUESTS,
+                        help=f"Requests a /predict/batch (default: {DEFAULT_BATCH_REQUESTS})")
+    parser.add_argument('--concurrencia', type=int, default=32,
+                        help="Clientes simultáneos (default: 32)")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help="Clientes por request en /predict/batch (default: 500)")
+    parser.add_argument('--clientes', type=int, default=None,
+                        help="Clientes distintos a enviar; menos que --requests ejercita el cache "
+                             "(default: igual a --requests)")
+    parser.add_argument('--seed', type=int, default=7)
+    common.add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # Carga sincrónica: el cliente ASGI no dispara el evento de startup
+    predict.load_models()
+    if not predict.is_ready():
+        sys.exit(f"❌ Modelos no disponibles: {predict.models_info()}")
+
+    n_customers = args.clientes or args.requests
+    try:
+        results = asyncio.run(run(args.requests, args.requests_batch, args.concurrencia, args.batch_size, n_customers, args.seed))
+    finally:
+        pool.shutdown()
+
+    common.print_results(results)
+    params = {
+        'requests': args.requests,
+        'requests_batch': args.requests_batch,
+        'concurrencia': args.concurrencia,
+        'batch_size': args.batch_size,
+        'clientes': n_customers,
+        'seed': args.seed,
+    }
+    sys.exit(common.handle_baseline(BASELINE_NAME, results, params, args))
+
+
+if __name__ == "__main__":
+    main()
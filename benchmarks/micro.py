@@ -0,0 +1,76 @@
+"""
+Benchmarks de funciones internas
+
+Mide por separado cada etapa del camino de una predicción:
+- Validación Pydantic de CustomerData
+- Codificación (config.transform_to_features fila a fila y la versión vectorizada)
+- Forward pass de cada modelo, con una fila y con lotes
+
+Ejecutar: python benchmarks/micro.py --llamadas 2000 --comparar
+"""
+
+import argparse
+import logging
+import sys
+
+import common
+
+import config
+import predict
+from registry import MODEL_NAMES
+from schemas import CustomerData
+
+BASELINE_NAME = 'micro'
+BATCH_SIZES = (1, 256, 4096)
+
+
+def run(n_calls: int, seed: int) -> dict:
+    records = common.synthetic_records(max(BATCH_SIZES), seed)
+    record = records[0]
+    results = {}
+
+    results['validacion_customer_data'] = common.time_calls(lambda: CustomerData(**record), n_calls)
+    results['transform_to_features'] = common.time_calls(lambda: config.transform_to_features(record), n_calls)
+
+    for batch_size in BATCH_SIZES[1:]:
+        columns = config.records_to_columns(records[:batch_size])
+        results[f'transform_to_feature_matrix[{batch_size}]'] = common.time_calls(
+            lambda: config.transform_to_feature_matrix(columns), max(1, n_calls // 10), batch_size
+        )
+
+    predict.load_models()
+    matrix = config.transform_to_feature_matrix(config.records_to_columns(records))
+    for name in MODEL_NAMES:
+        model = predict.get_model(name)
+        if model is None:
+            print(f"❌ {name} no disponible: {predict.model_status[name]['error']}")
+            continue
+        for batch_size in BATCH_SIZES:
+            input_data = matrix[:batch_size]
+            results[f'{name}.predict[{batch_size}]'] = common.time_calls(
+                lambda: model.predict(input_data, verbose=0), max(1, n_calls // 10), batch_size
+            )
+            results[f'{name}.predict_on_batch[{batch_size}]'] = common.time_calls(
+                lambda: model.predict_on_batch(input_data), n_calls, batch_size
+            )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de validación, codificación e inferencia")
+    parser.add_argument('--llamadas', type=int, default=1000, help="Llamadas por benchmark (default: 1000)")
+    parser.add_argument('--seed', type=int, default=7)
+    common.add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = run(args.llamadas, args.seed)
+    common.print_results(results)
+    params = {'llamadas': args.llamadas, 'seed': args.seed}
+    sys.exit(common.handle_baseline(BASELINE_NAME, results, params, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,12 @@ Ejecutar desde raíz: python data/raw/download_data.py
 """
 
 import os
-import pandas as pd
 import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.dataset import DIR_DATASET, cargar_dataset, ingestar
 
 RAW_DIR = "data/raw"
 PROCESSED_DIR = "data/processed"
@@ -68,15 +72,16 @@ def download_from_kaggle():
         return False
 
 def process_churn_data():
-    """Procesa el dataset de churn"""
+    """Convierte el dataset de churn a Parquet tipado (src/dataset.py)"""
     data_path = os.path.join(RAW_DIR, KAGGLE_FILE)
     
     if not os.path.exists(data_path):
         print(f"❌ Archivo no encontrado: {data_path}")
         return None
     
-    print(f"\nCargando datos desde: {data_path}")
-    df = pd.read_csv(data_path)
+    print(f"\nConvirtiendo a Parquet: {data_path}")
+    particion = ingestar(data_path)
+    df = cargar_dataset()
     
     print(f"Dataset cargado: {df.shape[0]} filas, {df.shape[1]} columnas")
     print("\nColumnas del dataset:")
@@ -92,10 +97,8 @@ def process_churn_data():
     print(df['Churn'].value_counts())
     print(f"Tasa de churn: {(df['Churn'] == 'Yes').mean():.2%}")
     
-    # Guardar versión procesada
-    processed_path = os.path.join(PROCESSED_DIR, "telco_churn.csv")
-    df.to_csv(processed_path, index=False)
-    print(f"\n✓ Dataset guardado en: {processed_path}")
+    print(f"\n✓ Dataset guardado en: {particion}")
+    print(f"Se lee con: from src.dataset import cargar_dataset (directorio {DIR_DATASET})")
     
     return df
 
@@ -0,0 +1,138 @@
+"""
+Asociación entre variables categóricas (V de Cramér con corrección de sesgo)
+
+Todas las tablas de contingencia salen de una sola pasada: cada columna se
+codifica a enteros una vez, las filas se convierten (por bloques) en una
+matriz indicadora one-hot y su producto X.T @ X contiene, en el bloque
+(i, j), la tabla cruzada de las columnas i y j, igual que pd.crosstab. Luego
+el estadístico se calcula solo para el triángulo superior (la matriz es
+simétrica).
+
+Los resultados se guardan en memoria con la huella del dataset (hash de las
+columnas usadas) como clave, así que recalcular con los mismos datos es
+inmediato.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Filas por bloque de la matriz indicadora (float32: conteos exactos hasta 2^24)
+FILAS_POR_BLOQUE = 1_000_000
+# Cada conteo de X.T @ X es como mucho FILAS_POR_BLOQUE; por encima de 2^24
+# float32 ya no representa todos los enteros y los conteos dejan de ser exactos
+assert FILAS_POR_BLOQUE < 2 ** 24
+MAX_CACHE = 8
+
+_cache = OrderedDict()
+
+
+def huella_dataset(df: pd.DataFrame) -> str:
+    """Hash del contenido y los nombres de columna de un DataFrame"""
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    h.update('\x1f'.join(map(str, df.columns)).encode())
+    return h.hexdigest()
+
+
+def codificar(df: pd.DataFrame, columnas: list) -> tuple:
+    """
+    Códigos enteros de cada columna (-1 para faltantes) y sus categorías
+    ordenadas, como las filas/columnas de pd.crosstab
+    """
+    codigos, categorias = [], []
+    for col in columnas:
+        c, cats = pd.factorize(df[col], sort=True)
+        codigos.append(c)
+        categorias.append(cats)
+    return codigos, categorias
+
+
+def tablas_contingencia(codigos: list, cardinalidades: list) -> np.ndarray:
+    """
+    Conteos conjuntos de todas las categorías de todas las columnas:
+    bloque (i, j) = tabla cruzada de las columnas i y j
+
+    Las filas con faltante en una columna no suman en sus bloques (mismo
+    descarte por pares que pd.crosstab).
+    """
+    offsets = np.r_[0, np.cumsum(cardinalidades)]
+    total = int(offsets[-1])
+    n = len(codigos[0]) if codigos else 0
+    conteos = np.zeros((total, total), dtype=np.int64)
+
+    for inicio in range(0, n, FILAS_POR_BLOQUE):
+        fin = min(inicio + FILAS_POR_BLOQUE, n)
+        indicadora = np.zeros((fin - inicio, total), dtype=np.float32)
+        for c, offset in zip(codigos, offsets):
+            bloque = c[inicio:fin]
+            filas = np.flatnonzero(bloque >= 0)
+            indicadora[filas, offset + bloque[filas]] = 1
+        conteos += np.rint(indicadora.T @ indicadora).astype(np.int64)
+
+    return conteos
+
+
+def cramers_v_tabla(tabla: np.ndarray) -> float:
+    """
+    V de Cramér con corrección de sesgo sobre una tabla de contingencia.
+    Igual que chi2_contingency: corrección de Yates si la tabla es 2x2.
+    """
+    # pd.crosstab no incluye categorías sin observaciones
+    tabla = tabla[tabla.sum(axis=1) > 0][:, tabla.sum(axis=0) > 0].astype(np.float64)
+    r, k = tabla.shape
+    n = tabla.sum()
+    if r < 2 or k < 2 or n < 2:
+        return np.nan
+
+    esperado = np.outer(tabla.sum(axis=1), tabla.sum(axis=0)) / n
+    if r == 2 and k == 2:
+        diferencia = esperado - tabla
+        tabla = tabla + np.sign(diferencia) * np.minimum(0.5, np.abs(diferencia))
+    chi2 = ((tabla - esperado) ** 2 / esperado).sum()
+
+    phi2corr = max(0, chi2 / n - ((k - 1) * (r - 1)) / (n - 1))
+    rcorr = r - ((r - 1) ** 2) / (n - 1)
+    kcorr = k - ((k - 1) ** 2) / (n - 1)
+    return float(np.sqrt(phi2corr / min((kcorr - 1), (rcorr - 1))))
+
+
+def matriz_cramers_v(df: pd.DataFrame, columnas: list = None) -> pd.DataFrame:
+    """
+    Matriz simétrica de V de Cramér entre columnas categóricas (diagonal 1)
+
+    Args:
+        df: Dataset
+        columnas: Columnas a cruzar (default: todas las de tipo object o
+            category salvo customerID)
+    """
+    if columnas is None:
+        columnas = [
+            c for c in df.select_dtypes(include=['object', 'category']).columns
+            if c != 'customerID'
+        ]
+    columnas = list(columnas)
+
+    clave = (huella_dataset(df[columnas]), tuple(columnas))
+    if clave in _cache:
+        _cache.move_to_end(clave)
+        return _cache[clave].copy()
+
+    codigos, categorias = codificar(df, columnas)
+    cardinalidades = [len(cats) for cats in categorias]
+    conteos = tablas_contingencia(codigos, cardinalidades)
+    offsets = np.r_[0, np.cumsum(cardinalidades)]
+
+    m = len(columnas)
+    valores = np.eye(m)
+    for i in range(m):
+        for j in range(i + 1, m):
+            bloque = conteos[offsets[i]:offsets[i + 1], offsets[j]:offsets[j + 1]]
+            valores[i, j] = valores[j, i] = cramers_v_tabla(bloque)
+
+    resultado = pd.DataFrame(valores, index=columnas, columns=columnas)
+    _cache[clave] = resultado
+    if len(_cache) > MAX_CACHE:
+        _cache.popitem(last=False)
+    return resultado.copy()
@@ -6,14 +6,15 @@ from sklearn.model_selection import train_test_split
 def preprocesar(X, y):
 
     mapping = {'No': 0, 'Yes': 1}
-    y = y.map(mapping)
+    # astype: con el Parquet tipado Churn es category y map devuelve otra category
+    y = y.map(mapping).astype(int)
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=7, stratify=y
     )
 
     num_cols = X_train.select_dtypes(include=['number']).columns.tolist()
-    cat_cols = X_train.select_dtypes(include=['object']).columns.tolist()
+    cat_cols = X_train.select_dtypes(include=['object', 'category']).columns.tolist()
 
     preprocessor = ColumnTransformer(transformers=[
         ('num', StandardScaler(), num_cols),
@@ -0,0 +1,221 @@
+"""
+Dataset de clientes en Parquet tipado
+
+ingestar() convierte el CSV crudo de Telco (y los extractos mensuales con el
+mismo layout) a Parquet particionado por extracto:
+
+    data/processed/telco/extracto=<nombre>/part-00000.parquet
+
+con las categóricas como category (diccionario en Parquet), SeniorCitizen
+int8, tenure int16, cargos float32 y TotalCharges ya limpio (los ' ' del CSV
+quedan como NaN). cargar_dataset() lee solo las columnas pedidas con memory
+map, sin volver a parsear ni convertir nada.
+
+Las matrices de features de data/processed (train/test de los notebooks)
+se convierten con convertir_procesado() y se leen con cargar_procesado().
+
+Ejecutar desde raíz:
+    python src/dataset.py data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv [--extracto 2025-01]
+    python src/dataset.py --procesados
+"""
+
+import argparse
+import glob
+import os
+import shutil
+
+import pandas as pd
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DIR_PROCESADOS = os.path.join(RAIZ, 'data', 'processed')
+DIR_DATASET = os.path.join(DIR_PROCESADOS, 'telco')
+CSV_CRUDO = os.path.join(RAIZ, 'data', 'raw', 'WA_Fn-UseC_-Telco-Customer-Churn.csv')
+
+EXTRACTO_BASE = 'base'
+FILAS_POR_ARCHIVO = 1_000_000
+
+_SI_NO = ['No', 'Yes']
+_SERVICIO_INTERNET = ['No', 'No internet service', 'Yes']
+
+CATEGORIAS = {
+    'gender': ['Female', 'Male'],
+    'Partner': _SI_NO,
+    'Dependents': _SI_NO,
+    'PhoneService': _SI_NO,
+    'MultipleLines': ['No', 'No phone service', 'Yes'],
+    'InternetService': ['DSL', 'Fiber optic', 'No'],
+    'OnlineSecurity': _SERVICIO_INTERNET,
+    'OnlineBackup': _SERVICIO_INTERNET,
+    'DeviceProtection': _SERVICIO_INTERNET,
+    'TechSupport': _SERVICIO_INTERNET,
+    'StreamingTV': _SERVICIO_INTERNET,
+    'StreamingMovies': _SERVICIO_INTERNET,
+    'Contract': ['Month-to-month', 'One year', 'Two year'],
+    'PaperlessBilling': _SI_NO,
+    'PaymentMethod': ['Bank transfer (automatic)', 'Credit card (automatic)', 'Electronic check', 'Mailed check'],
+    'Churn': _SI_NO,
+}
+
+# tenure en int16: int8 llega solo hasta 127 meses
+TIPOS = {
+    'customerID': 'string',
+    'SeniorCitizen': 'int8',
+    'tenure': 'int16',
+    'MonthlyCharges': 'float32',
+    'TotalCharges': 'float32',
+    **{col: pd.CategoricalDtype(categorias) for col, categorias in CATEGORIAS.items()},
+}
+
+# Orden de columnas del CSV original
+COLUMNAS = [
+    'customerID', 'gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure',
+    'PhoneService', 'MultipleLines', 'InternetService', 'OnlineSecurity',
+    'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV',
+    'StreamingMovies', 'Contract', 'PaperlessBilling', 'PaymentMethod',
+    'MonthlyCharges', 'TotalCharges', 'Churn',
+]
+
+
+def tipar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica los tipos compactos a un bloque del CSV crudo
+
+    Raises:
+        ValueError: Si una categórica trae valores fuera de CATEGORIAS
+    """
+    df = df[COLUMNAS].copy()
+    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+    for col, tipo in TIPOS.items():
+        convertida = df[col].astype(tipo)
+        if isinstance(tipo, pd.CategoricalDtype):
+            invalidos = convertida.isna() & df[col].notna()
+            if invalidos.any():
+                valores = sorted(df.loc[invalidos, col].astype(str).unique())[:5]
+                raise ValueError(f"Valores no reconocidos en '{col}': {valores}")
+        df[col] = convertida
+    return df
+
+
+def ingestar(ruta_csv: str = CSV_CRUDO, extracto: str = EXTRACTO_BASE, destino: str = DIR_DATASET) -> str:
+    """
+    Convierte un CSV con el layout de Telco a la partición extracto=<extracto>
+    (se reemplaza si ya existía)
+
+    Returns:
+        Directorio de la partición
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    particion = os.path.join(destino, f'extracto={extracto}')
+    temporal = particion + '.tmp'
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+
+    # Se lee todo como texto y se tipa por bloques: memoria acotada con
+    # extractos grandes
+    lector = pd.read_csv(ruta_csv, dtype=str, keep_default_na=False, chunksize=FILAS_POR_ARCHIVO)
+    for i, bloque in enumerate(lector):
+        tabla = pa.Table.from_pandas(tipar(bloque), preserve_index=False)
+        pq.write_table(tabla, os.path.join(temporal, f'part-{i:05d}.parquet'), compression='zstd')
+
+    shutil.rmtree(particion, ignore_errors=True)
+    os.replace(temporal, particion)
+    return particion
+
+
+def asegurar_dataset(destino: str = DIR_DATASET, ruta_csv: str = CSV_CRUDO) -> str:
+    """Ingesta el CSV crudo si el dataset en Parquet todavía no existe"""
+    if not glob.glob(os.path.join(destino, 'extracto=*', '*.parquet')):
+        if not os.path.exists(ruta_csv):
+            raise FileNotFoundError(
+                f"No hay dataset en {destino} ni CSV crudo en {ruta_csv} (python data/raw/download_data.py)"
+            )
+        ingestar(ruta_csv, EXTRACTO_BASE, destino)
+    return destino
+
+
+def cargar_dataset(columnas: list = None, extractos: list = None, destino: str = DIR_DATASET) -> pd.DataFrame:
+    """
+    Lee el dataset con memory map, solo las columnas pedidas
+
+    Args:
+        columnas: Columnas a leer (default: todas las del CSV original)
+        extractos: Particiones a incluir (default: todas)
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+
+    dataset = ds.dataset(
+        destino,
+        format='parquet',
+        partitioning='hive',
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
+    filtro = ds.field('extracto').isin(extractos) if extractos else None
+    tabla = dataset.to_table(columns=list(columnas or COLUMNAS), filter=filtro)
+    df = tabla.to_pandas()
+
+    # Las categorías quedan siempre completas y en el mismo orden, aunque
+    # un extracto no tenga todos los valores
+    for col in df.columns:
+        if col in TIPOS:
+            df[col] = df[col].astype(TIPOS[col])
+    return df
+
+
+def convertir_procesado(nombre: str, dir_procesados: str = DIR_PROCESADOS) -> str:
+    """
+    Matriz de features de los notebooks (CSV) a Parquet: features float32 y
+    Churn int8
+
+    Returns:
+        Ruta del Parquet generado
+    """
+    ruta_csv = os.path.join(dir_procesados, nombre)
+    df = pd.read_csv(ruta_csv)
+    tipos = {col: 'float32' for col in df.columns if col != 'Churn'}
+    if 'Churn' in df.columns:
+        # preprocesar() la guarda como 0/1; se aceptan también 'Yes'/'No'
+        if df['Churn'].dtype == object:
+            df['Churn'] = df['Churn'].map({'No': 0, 'Yes': 1})
+        tipos['Churn'] = 'int8'
+
+    ruta = os.path.splitext(ruta_csv)[0] + '.parquet'
+    df.astype(tipos).to_parquet(ruta, index=False, compression='zstd')
+    return ruta
+
+
+def cargar_procesado(nombre: str, columnas: list = None, dir_procesados: str = DIR_PROCESADOS) -> pd.DataFrame:
+    """
+    Matriz de features de data/processed: del Parquet (memory map, solo las
+    columnas pedidas) si existe, si no del CSV original
+    """
+    ruta_csv = os.path.join(dir_procesados, nombre)
+    ruta = os.path.splitext(ruta_csv)[0] + '.parquet'
+    if os.path.exists(ruta):
+        import pyarrow.parquet as pq
+        return pq.read_table(ruta, columns=columnas, memory_map=True).to_pandas()
+    return pd.read_csv(ruta_csv, usecols=columnas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte los CSV del proyecto a Parquet tipado")
+    parser.add_argument('csv', nargs='?', default=CSV_CRUDO, help="CSV con el layout de Telco")
+    parser.add_argument('--extracto', default=EXTRACTO_BASE, help="Nombre de la partición (p. ej. 2025-01)")
+    parser.add_argument('--procesados', action='store_true',
+                        help="Convierte en cambio las matrices de features de data/processed/*.csv")
+    args = parser.parse_args()
+
+    if args.procesados:
+        for ruta_csv in sorted(glob.glob(os.path.join(DIR_PROCESADOS, '*.csv'))):
+            print(f"✓ {convertir_procesado(os.path.basename(ruta_csv))}")
+        return
+
+    particion = ingestar(args.csv, args.extracto)
+    df = cargar_dataset(extractos=[args.extracto])
+    print(f"✓ {len(df)} filas en {particion} ({df.memory_usage(deep=True).sum() / 1e6:.1f} MB en memoria)")
+
+
+if __name__ == "__main__":
+    main()
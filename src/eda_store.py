@@ -0,0 +1,264 @@
+"""
+Agregados del análisis exploratorio, precalculados por versión del dataset
+
+La página de Análisis solo grafica resúmenes: conteos por categoría,
+histogramas (con su KDE), estadísticas de boxplot, tablas cruzadas contra
+Churn y matrices de correlación/asociación. construir_agregados() los
+calcula una sola vez a partir del dataset completo y guardar_agregados() los
+escribe en un JSON compacto (unos KB, independiente de la cantidad de
+clientes). El dashboard solo lee ese archivo.
+
+El dataset es el Parquet tipado de src/dataset.py (o un CSV con el layout
+de Telco). Su versión se identifica por nombre, tamaño y fecha de
+modificación de los archivos (no se relee el contenido), más
+VERSION_AGREGADOS, que se incrementa cuando cambia lo que se calcula. Al
+guardar los de una versión nueva se borran los de las anteriores.
+
+Ejecutar desde raíz: python src/eda_store.py [data/processed/telco | ruta/al/dataset.csv]
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.associations import matriz_cramers_v
+from src.dataset import DIR_DATASET, asegurar_dataset, cargar_dataset
+
+VERSION_AGREGADOS = 1
+
+NUM_COLS = ['tenure', 'MonthlyCharges', 'TotalCharges']
+CAT_COLS_ASSOC = ['Partner', 'Dependents', 'InternetService', 'TechSupport', 'OnlineSecurity', 'Contract', 'PaperlessBilling', 'SeniorCitizen']
+
+# Histogramas: mismos 30 bins que sns.histplot; la KDE se evalúa en
+# PUNTOS_KDE puntos a partir de un histograma fino (KDE binned, O(N))
+BINS_HISTOGRAMA = 30
+BINS_KDE = 2048
+PUNTOS_KDE = 200
+
+# Outliers guardados por boxplot (muestra fija si hay más)
+MAX_OUTLIERS = 500
+
+
+def preparar(df: pd.DataFrame) -> pd.DataFrame:
+    """Mismas conversiones que hacía la página de Análisis sobre el CSV crudo"""
+    df = df.copy()
+    # Sin efecto sobre el Parquet tipado (TotalCharges ya viene limpio)
+    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
+    df['Churn_num'] = df['Churn'].map({'Yes': 1, 'No': 0}).astype(float)
+    return df
+
+
+def columnas_categoricas(df: pd.DataFrame) -> list:
+    return [c for c in df.select_dtypes(include=['object', 'category']).columns if c != 'customerID']
+
+
+def histograma(valores: pd.Series) -> dict:
+    """Bins de sns.histplot(bins=30) y la KDE gaussiana (bandwidth de Scott) sobre el rango de los datos"""
+    x = valores.dropna().to_numpy(dtype=np.float64)
+    conteos, bordes = np.histogram(x, bins=BINS_HISTOGRAMA)
+
+    # KDE aproximada: cada bin fino aporta su conteo en su centro
+    bw = x.std(ddof=1) * x.size ** (-1 / 5)
+    finos, bordes_finos = np.histogram(x, bins=BINS_KDE)
+    centros = (bordes_finos[:-1] + bordes_finos[1:]) / 2
+    grilla = np.linspace(x.min(), x.max(), PUNTOS_KDE)
+    z = (grilla[:, None] - centros[None, :]) / bw
+    densidad = (np.exp(-0.5 * z ** 2) @ finos) / (x.size * bw * np.sqrt(2 * np.pi))
+
+    return {
+        'conteos': conteos.tolist(),
+        'bordes': bordes.tolist(),
+        'kde_x': grilla.tolist(),
+        'kde_densidad': densidad.tolist(),
+        'n': int(x.size),
+    }
+
+
+def estadisticas_boxplot(valores: pd.Series) -> dict:
+    """Mismas estadísticas que dibuja sns.boxplot (whis=1.5), para ax.bxp"""
+    from matplotlib.cbook import boxplot_stats
+
+    x = valores.dropna().to_numpy(dtype=np.float64)
+    stats = boxplot_stats(x, whis=1.5)[0]
+    outliers = stats['fliers']
+    if outliers.size > MAX_OUTLIERS:
+        outliers = np.random.default_rng(7).choice(outliers, MAX_OUTLIERS, replace=False)
+    return {
+        'med': float(stats['med']), 'q1': float(stats['q1']), 'q3': float(stats['q3']),
+        'whislo': float(stats['whislo']), 'whishi': float(stats['whishi']),
+        'fliers': outliers.tolist(),
+    }
+
+
+def correlacion_spearman(df: pd.DataFrame) -> pd.DataFrame:
+    """Spearman sobre las variables importantes codificadas (pestaña Correlaciones)"""
+    cols_importantes = [
+        'Churn', 'tenure', 'MonthlyCharges', 'TotalCharges', 'SeniorCitizen',
+        'Partner', 'Dependents', 'InternetService', 'TechSupport',
+        'OnlineSecurity', 'Contract', 'PaperlessBilling'
+    ]
+    df_corr = df[cols_importantes].copy()
+    for col in NUM_COLS:
+        df_corr[col] = pd.to_numeric(df_corr[col], errors='coerce')
+    si_no = ['Churn', 'Partner', 'Dependents', 'TechSupport', 'OnlineSecurity', 'PaperlessBilling']
+    # astype(float): sobre columnas category, map devuelve otra category
+    for col in si_no:
+        df_corr[col] = df_corr[col].map({'Yes': 1, 'No': 0}).astype(float)
+    df_corr['SeniorCitizen'] = pd.to_numeric(df_corr['SeniorCitizen'], errors='coerce')
+    df_corr['Contract'] = df_corr['Contract'].map({'Month-to-month': 0, 'One year': 1, 'Two year': 2}).astype(float)
+    internet_dummies = pd.get_dummies(df_corr['InternetService'], prefix='Internet', drop_first=True)
+    df_corr = pd.concat([df_corr.drop('InternetService', axis=1), internet_dummies], axis=1)
+    return df_corr.dropna().corr(method='spearman')
+
+
+def construir_agregados(df: pd.DataFrame) -> dict:
+    """
+    Todos los resúmenes que grafica la página de Análisis
+
+    Args:
+        df: Dataset con el layout del CSV de Telco (texto o tipado)
+    """
+    df = preparar(df)
+    categoricas = columnas_categoricas(df)
+
+    df_num = df[NUM_COLS + ['Churn_num']].dropna()
+    extra = [c for c in CAT_COLS_ASSOC if c in df.columns and c not in categoricas]
+    cramers = matriz_cramers_v(df, categoricas + extra)
+
+    asociacion_churn = {col: df_num[col].corr(df_num['Churn_num']) for col in NUM_COLS}
+    for col in CAT_COLS_ASSOC:
+        if col in df.columns:
+            asociacion_churn[col] = cramers.loc[col, 'Churn']
+
+    return {
+        'version': VERSION_AGREGADOS,
+        'filas': len(df),
+        'categoricas': categoricas,
+        'conteos': {col: _observadas(df[col].value_counts()) for col in categoricas},
+        'histogramas': {col: histograma(df[col]) for col in NUM_COLS},
+        'boxplots': {
+            col: {churn: estadisticas_boxplot(df.loc[df['Churn'] == churn, col]) for churn in ('No', 'Yes')}
+            for col in NUM_COLS
+        },
+        'crosstabs': {
+            col: _observadas(pd.crosstab(df[col], df['Churn']))
+            for col in categoricas if col != 'Churn'
+        },
+        'spearman': correlacion_spearman(df),
+        'pearson_numericas': df[NUM_COLS].dropna().corr(),
+        'punto_biserial': df_num[NUM_COLS].apply(lambda x: x.corr(df_num['Churn_num'])),
+        'cramers_v': cramers.loc[categoricas, categoricas],
+        'asociacion_churn': pd.Series(asociacion_churn),
+    }
+
+
+def _observadas(conteos):
+    """
+    Sin las categorías que no aparecen: con columnas category, value_counts y
+    crosstab las incluyen con conteo 0 (con texto no existen). Índice y
+    columnas vuelven a ser texto.
+    """
+    filas = conteos.sum(axis=1) > 0 if isinstance(conteos, pd.DataFrame) else conteos > 0
+    conteos = conteos[filas]
+    conteos.index = conteos.index.astype(object)
+    if isinstance(conteos, pd.DataFrame):
+        conteos.columns = conteos.columns.astype(object)
+    return conteos
+
+
+def _a_json(valor):
+    if isinstance(valor, pd.DataFrame):
+        return {'__frame__': valor.to_dict(orient='split')}
+    if isinstance(valor, pd.Series):
+        return {'__serie__': {'index': valor.index.tolist(), 'data': valor.tolist(), 'name': valor.name}}
+    if isinstance(valor, dict):
+        return {k: _a_json(v) for k, v in valor.items()}
+    return valor
+
+
+def _desde_json(valor):
+    if isinstance(valor, dict):
+        if '__frame__' in valor:
+            return pd.DataFrame(**valor['__frame__'])
+        if '__serie__' in valor:
+            return pd.Series(**valor['__serie__'])
+        return {k: _desde_json(v) for k, v in valor.items()}
+    return valor
+
+
+def version_dataset(ruta: str) -> str:
+    """
+    Identificador de la versión de un archivo, o de un directorio de Parquet
+    (todas sus particiones), sin leer su contenido
+    """
+    if os.path.isdir(ruta):
+        archivos = sorted(glob.glob(os.path.join(ruta, '**', '*.parquet'), recursive=True))
+    else:
+        archivos = [ruta]
+
+    partes = []
+    for archivo in archivos:
+        info = os.stat(archivo)
+        partes.append(f"{os.path.relpath(archivo, os.path.dirname(ruta))}:{info.st_size}:{info.st_mtime_ns}")
+    clave = '|'.join(partes) + f":{VERSION_AGREGADOS}"
+    return hashlib.sha1(clave.encode()).hexdigest()[:16]
+
+
+def ruta_agregados(ruta_dataset: str, dir_store: str) -> str:
+    return os.path.join(dir_store, f"agregados-{version_dataset(ruta_dataset)}.json")
+
+
+def guardar_agregados(agregados: dict, ruta: str):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(_a_json(agregados), f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporal, ruta)
+
+
+def podar_agregados(ruta: str):
+    """Borra los agregados de otras versiones en el mismo directorio que ruta"""
+    for anterior in glob.glob(os.path.join(os.path.dirname(ruta), 'agregados-*.json')):
+        if os.path.abspath(anterior) != os.path.abspath(ruta):
+            os.remove(anterior)
+
+
+def leer_agregados(ruta: str) -> dict:
+    with open(ruta, encoding='utf-8') as f:
+        return _desde_json(json.load(f))
+
+
+def leer_dataset(ruta_dataset: str) -> pd.DataFrame:
+    """Dataset completo desde el directorio Parquet o desde un CSV"""
+    if os.path.isdir(ruta_dataset):
+        return cargar_dataset(destino=ruta_dataset)
+    return pd.read_csv(ruta_dataset)
+
+
+def cargar_agregados(ruta_dataset: str, dir_store: str) -> dict:
+    """
+    Agregados de la versión actual del dataset; se construyen y guardan la
+    primera vez (y se borran los de versiones anteriores)
+    """
+    ruta = ruta_agregados(ruta_dataset, dir_store)
+    if not os.path.exists(ruta):
+        guardar_agregados(construir_agregados(leer_dataset(ruta_dataset)), ruta)
+        podar_agregados(ruta)
+    return leer_agregados(ruta)
+
+
+if __name__ == "__main__":
+    raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    dataset = sys.argv[1] if len(sys.argv) > 1 else asegurar_dataset(DIR_DATASET)
+    destino = ruta_agregados(dataset, os.path.join(raiz, 'data', 'processed', 'eda'))
+    guardar_agregados(construir_agregados(leer_dataset(dataset)), destino)
+    podar_agregados(destino)
+    print(f"✓ Agregados guardados en {destino} ({os.path.getsize(destino) / 1024:.1f} KB)")
@@ -0,0 +1,5 @@
+"""python -m src.train model1 (ver entrenar.py)"""
+
+from src.train.entrenar import main
+
+main()
@@ -0,0 +1,352 @@
+"""
+Entrenamiento reproducible de los modelos de churn
+
+Reemplaza las celdas de entrenamiento de notebooks/ANN_Modelo1.ipynb y
+ANN_Modelo2.ipynb. Lee el dataset en Parquet (src/dataset.py), aplica
+preprocesar() (mismo split con random_state=7), separa del train una
+validación estratificada para EarlyStopping, balancea las clases (class
+weights o SMOTE) y entrena la red con un pipeline tf.data (shuffle, batch y
+prefetch). El test se usa solo para las métricas finales. La arquitectura y
+los hiperparámetros salen de un JSON (src/train/configs/<modelo>.json).
+
+Cada corrida queda como una versión nueva del registro de la API:
+
+    models/<modelo>/<version>/
+    ├── model.keras
+    ├── model.encoder.json   (encoder del pipeline ajustado, ver api/encoder.py)
+    └── model.metricas.json  (métricas sobre el test, config y duración de cada etapa)
+
+El encoder cambia con cada entrenamiento y la API solo sirve juntos modelos
+con el mismo encoder: se entrenan ambos sobre los mismos extractos y se ponen
+en servicio juntos, al iniciar la API o con POST /admin/models/reload.
+
+Ejecutar desde raíz:
+    python -m src.train model1 [--version v2] [--extractos base 2025-01]
+    python -m src.train --config ruta/a/config.json
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DIR_API = os.path.join(RAIZ, 'api')
+DIR_MODELOS = os.path.join(RAIZ, 'models')
+DIR_CONFIGS = os.path.join(os.path.dirname(__file__), 'configs')
+
+# src/ para los módulos compartidos y api/ para el formato del encoder
+for ruta in (RAIZ, DIR_API):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from src.data_prep import preprocesar  # noqa: E402
+from src.dataset import COLUMNAS, DIR_DATASET, cargar_dataset  # noqa: E402
+from encoder import ENCODER_ARTIFACT, FeatureEncoder  # noqa: E402
+
+BALANCEOS = ('class_weight', 'smote', 'ninguno')
+
+# Shuffle por elementos con buffer acotado: con decenas de millones de filas
+# no se copia el set de entrenamiento entero en el buffer
+BUFFER_SHUFFLE = 100_000
+
+# Lote para validación y evaluación (no cambia el resultado, solo la velocidad)
+TAMANIO_LOTE_EVALUACION = 8192
+
+
+@contextmanager
+def etapa(nombre: str, duraciones: dict):
+    """Mide una etapa del entrenamiento y la registra en duraciones"""
+    inicio = time.perf_counter()
+    yield
+    duraciones[nombre] = round(time.perf_counter() - inicio, 3)
+    print(f"✓ {nombre}: {duraciones[nombre]:.2f}s")
+
+
+def cargar_config(nombre_o_ruta: str) -> dict:
+    """
+    Config de entrenamiento desde una ruta o por nombre de modelo
+    (src/train/configs/<nombre>.json)
+
+    Raises:
+        ValueError: Si la config no es válida
+    """
+    ruta = nombre_o_ruta if os.path.exists(nombre_o_ruta) else os.path.join(DIR_CONFIGS, f'{nombre_o_ruta}.json')
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f"No existe la config {ruta}")
+    with open(ruta, encoding='utf-8') as f:
+        config = json.load(f)
+
+    if config.get('balanceo') not in BALANCEOS:
+        raise ValueError(f"{ruta}: balanceo debe ser uno de {BALANCEOS}")
+    if len(config.get('dropout', [])) != 2 or not all(0 <= d < 1 for d in config['dropout']):
+        raise ValueError(f"{ruta}: dropout debe tener dos valores en [0, 1)")
+    for clave in ('nombre', 'learning_rate', 'epocas', 'tamanio_lote', 'paciencia', 'fraccion_validacion', 'semilla'):
+        if clave not in config:
+            raise ValueError(f"{ruta}: falta '{clave}'")
+    if not 0 < config['fraccion_validacion'] < 1:
+        raise ValueError(f"{ruta}: fraccion_validacion debe estar en (0, 1)")
+    return config
+
+
+def preparar_datos(config: dict, extractos: list = None, destino: str = DIR_DATASET) -> dict:
+    """
+    Lee solo las columnas que usa el modelo y aplica preprocesar()
+
+    Returns:
+        {'X_train', 'X_test', 'y_train', 'y_test', 'pipeline', 'X_test_crudo'}
+    """
+    excluidas = set(config.get('columnas_excluidas', []))
+    columnas = [c for c in COLUMNAS if c != 'customerID' and c not in excluidas]
+    df = cargar_dataset(columnas, extractos, destino).dropna()
+
+    X = df.drop(columns='Churn')
+    if 'SeniorCitizen' in X.columns:
+        # Los notebooks la tratan como categórica
+        X['SeniorCitizen'] = X['SeniorCitizen'].astype(str)
+    # Numéricas en float64, como salen del CSV: el encoder exportado
+    # reproduce pipeline.transform bit a bit sobre float64
+    numericas = X.select_dtypes(include=['number']).columns
+    X[numericas] = X[numericas].astype(np.float64)
+
+    X_train, X_test, y_train, y_test, pipeline = preprocesar(X, df['Churn'])
+    return {
+        'X_train': X_train.to_numpy(dtype=np.float32),
+        'X_test': X_test.to_numpy(dtype=np.float32),
+        'y_train': y_train.to_numpy(dtype=np.float32),
+        'y_test': y_test.to_numpy(dtype=np.float32),
+        'pipeline': pipeline,
+        'X_test_crudo': X.loc[X_test.index],
+    }
+
+
+def separar_validacion(X: np.ndarray, y: np.ndarray, config: dict) -> tuple:
+    """
+    Separa del train una validación estratificada para EarlyStopping, así las
+    métricas del test no salen del mismo set con que se eligió la época
+
+    Returns:
+        (X_train, X_val, y_train, y_val)
+    """
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(
+        X, y, test_size=config['fraccion_validacion'], random_state=config['semilla'], stratify=y
+    )
+
+
+def balancear(X: np.ndarray, y: np.ndarray, config: dict) -> tuple:
+    """
+    Returns:
+        (X, y, class_weight); class_weight es None salvo con balanceo 'class_weight'
+    """
+    if config['balanceo'] == 'smote':
+        from imblearn.over_sampling import SMOTE
+        X, y = SMOTE(random_state=config['semilla']).fit_resample(X, y)
+        return X.astype(np.float32), y.astype(np.float32), None
+
+    if config['balanceo'] == 'class_weight':
+        from sklearn.utils.class_weight import compute_class_weight
+        clases = np.unique(y)
+        pesos = compute_class_weight(class_weight='balanced', classes=clases, y=y)
+        return X, y, {int(c): float(p) for c, p in zip(clases, pesos)}
+
+    return X, y, None
+
+
+def crear_dataset(X: np.ndarray, y: np.ndarray, tamanio_lote: int, mezclar: bool = False, semilla: int = None):
+    """
+    tf.data a partir de las matrices en memoria: shuffle por época, batch y
+    prefetch para que el armado del lote siguiente se solape con el paso de
+    entrenamiento. Sin cache(): las matrices ya están en memoria y solo
+    duplicaría el set de entrenamiento
+    """
+    import tensorflow as tf
+
+    dataset = tf.data.Dataset.from_tensor_slices((X, y))
+    if mezclar:
+        dataset = dataset.shuffle(min(len(X), BUFFER_SHUFFLE), seed=semilla, reshuffle_each_iteration=True)
+    return dataset.batch(tamanio_lote).prefetch(tf.data.AUTOTUNE)
+
+
+def construir_modelo(n_features: int, config: dict):
+    """
+    MLP de los notebooks: Dense(n) -> Dropout -> Dense(n/2) -> Dropout ->
+    Dense(1, sigmoid). Solo capas Dense y Dropout, como esperan los backends
+    numpy/onnx/tflite y el modelo fusionado de la API.
+    """
+    import tensorflow as tf
+
+    capas = [tf.keras.Input(shape=(n_features,))]
+    for unidades, dropout in zip((n_features, n_features // 2), config['dropout']):
+        capas.append(tf.keras.layers.Dense(units=unidades, activation='relu'))
+        if dropout > 0:
+            capas.append(tf.keras.layers.Dropout(dropout))
+    capas.append(tf.keras.layers.Dense(units=1, activation='sigmoid'))
+
+    # Nombre propio: el modelo fusionado de la API no admite dos 'sequential'
+    modelo = tf.keras.Sequential(capas, name=config['nombre'])
+    modelo.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=config['learning_rate']),
+        loss='binary_crossentropy',
+        metrics=[tf.keras.metrics.Recall(name='recall'), tf.keras.metrics.AUC(name='auc')],
+    )
+    return modelo
+
+
+def evaluar(y_true: np.ndarray, probs: np.ndarray, umbral: float = 0.5) -> dict:
+    """Métricas sobre el test con la misma regla que la API (prob > umbral)"""
+    from sklearn.metrics import (
+        accuracy_score, average_precision_score, confusion_matrix,
+        f1_score, precision_score, recall_score, roc_auc_score,
+    )
+
+    y_pred = (probs > umbral).astype(np.int8)
+    return {
+        'umbral': umbral,
+        'auc': round(float(roc_auc_score(y_true, probs)), 5),
+        'average_precision': round(float(average_precision_score(y_true, probs)), 5),
+        'recall': round(float(recall_score(y_true, y_pred, zero_division=0)), 5),
+        'precision': round(float(precision_score(y_true, y_pred, zero_division=0)), 5),
+        'f1': round(float(f1_score(y_true, y_pred, zero_division=0)), 5),
+        'accuracy': round(float(accuracy_score(y_true, y_pred)), 5),
+        'matriz_confusion': confusion_matrix(y_true, y_pred, labels=[0, 1]).tolist(),
+    }
+
+
+def siguiente_version(nombre: str, dir_modelos: str = DIR_MODELOS) -> str:
+    """v1, v2, ... después de la última versión numerada del modelo"""
+    directorio = os.path.join(dir_modelos, nombre)
+    numeros = [
+        int(m.group(1)) for v in (os.listdir(directorio) if os.path.isdir(directorio) else [])
+        if (m := re.fullmatch(r'v(\d+)', v))
+    ]
+    return f"v{max(numeros, default=0) + 1}"
+
+
+def entrenar(config: dict, version: str = None, extractos: list = None,
+             destino: str = DIR_DATASET, dir_modelos: str = DIR_MODELOS, verbose: int = 2) -> str:
+    """
+    Entrena un modelo según config y guarda modelo, encoder y métricas como
+    una versión nueva del registro
+
+    Returns:
+        Directorio de la versión
+
+    Raises:
+        FileExistsError: Si la versión pedida ya existe
+        RuntimeError: Si el encoder exportado no reproduce el pipeline
+    """
+    import tensorflow as tf
+
+    nombre = config['nombre']
+    version = version or siguiente_version(nombre, dir_modelos)
+    directorio = os.path.join(dir_modelos, nombre, version)
+    if os.path.exists(directorio):
+        raise FileExistsError(f"Ya existe {directorio}")
+
+    tf.keras.utils.set_random_seed(config['semilla'])
+    duraciones = {}
+    print(f"Entrenando {nombre} {version}")
+
+    with etapa('carga_y_preprocesamiento', duraciones):
+        datos = preparar_datos(config, extractos, destino)
+        encoder = FeatureEncoder.from_pipeline(datos['pipeline'])
+        if not np.array_equal(encoder.transform(datos['X_test_crudo']), datos['X_test']):
+            raise RuntimeError("El encoder exportado no reproduce pipeline.transform")
+
+    with etapa('balanceo', duraciones):
+        # Se balancea solo lo que queda para entrenar; la validación conserva la proporción real
+        X_ajuste, X_val, y_ajuste, y_val = separar_validacion(datos['X_train'], datos['y_train'], config)
+        X_train, y_train, class_weight = balancear(X_ajuste, y_ajuste, config)
+        entrenamiento = crear_dataset(X_train, y_train, config['tamanio_lote'], mezclar=True, semilla=config['semilla'])
+        validacion = crear_dataset(X_val, y_val, TAMANIO_LOTE_EVALUACION)
+
+    with etapa('entrenamiento', duraciones):
+        modelo = construir_modelo(X_train.shape[1], config)
+        early_stop = tf.keras.callbacks.EarlyStopping(
+            monitor='val_loss', mode='min', patience=config['paciencia'],
+            restore_best_weights=config.get('restaurar_mejores_pesos', False), verbose=1,
+        )
+        historia = modelo.fit(
+            entrenamiento,
+            epochs=config['epocas'],
+            validation_data=validacion,
+            class_weight=class_weight,
+            callbacks=[early_stop],
+            verbose=verbose,
+        ).history
+
+    with etapa('evaluacion', duraciones):
+        prueba = crear_dataset(datos['X_test'], datos['y_test'], TAMANIO_LOTE_EVALUACION)
+        probs = modelo.predict(prueba, verbose=0).reshape(-1)
+        test = evaluar(datos['y_test'], probs)
+
+    val_loss = historia['val_loss']
+    metricas = {
+        'modelo': nombre,
+        'version': version,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'config': config,
+        'datos': {
+            'extractos': extractos or 'todos',
+            'filas_train': int(len(y_ajuste)),
+            'filas_validacion': int(len(y_val)),
+            'filas_train_balanceado': int(len(y_train)),
+            'filas_test': int(len(datos['y_test'])),
+            'tasa_churn_train': round(float(datos['y_train'].mean()), 5),
+            'class_weight': class_weight,
+        },
+        'entrenamiento': {
+            'epocas': len(val_loss),
+            'mejor_epoca': int(np.argmin(val_loss)) + 1,
+            'mejor_val_loss': round(float(np.min(val_loss)), 5),
+        },
+        'test': test,
+        'duracion_s': duraciones,
+    }
+
+    # Se escribe en un directorio temporal fuera de models/<modelo>/ para
+    # que la API nunca vea una versión a medio guardar
+    temporal = os.path.join(dir_modelos, f'.tmp-{nombre}-{version}')
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    with etapa('guardado', duraciones):
+        modelo.save(os.path.join(temporal, 'model.keras'))
+        encoder.save(os.path.join(temporal, f'model{ENCODER_ARTIFACT}'))
+    # Fuera de la etapa, para que duracion_s ya incluya el guardado
+    with open(os.path.join(temporal, 'model.metricas.json'), 'w', encoding='utf-8') as f:
+        json.dump(metricas, f, indent=2, ensure_ascii=False)
+    os.makedirs(os.path.dirname(directorio), exist_ok=True)
+    os.replace(temporal, directorio)
+
+    print(f"✓ {nombre} {version} en {directorio}: AUC {test['auc']:.4f}, recall {test['recall']:.4f}, "
+          f"{metricas['entrenamiento']['epocas']} épocas, {sum(duraciones.values()):.1f}s en total")
+    return directorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena el Modelo 1 o 2 y lo guarda como versión nueva del registro")
+    parser.add_argument('modelo', nargs='?', help="Nombre de la config en src/train/configs (model1, model2)")
+    parser.add_argument('--config', default=None, help="Ruta a un JSON de configuración")
+    parser.add_argument('--version', default=None, help="Versión a crear (default: la siguiente)")
+    parser.add_argument('--extractos', nargs='+', default=None, help="Particiones del dataset (default: todas)")
+    parser.add_argument('--verbose', type=int, default=2, choices=(0, 1, 2), help="Verbosidad de model.fit")
+    args = parser.parse_args()
+
+    if not args.modelo and not args.config:
+        parser.error("Indicar el modelo o --config")
+
+    config = cargar_config(args.config or args.modelo)
+    entrenar(config, args.version, args.extractos, verbose=args.verbose)
+
+
+if __name__ == "__main__":
+    main()